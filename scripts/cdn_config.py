@@ -6,6 +6,7 @@ import json
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -87,6 +88,149 @@ def write_bytes_atomic(path: Path, data: bytes) -> None:
         temp_path.unlink(missing_ok=True)
 
 
+def link_atomic(src: Path, dest: Path) -> None:
+    """Hard-link *src* into place at *dest*, atomically replacing any file there.
+    A later rewrite of either path goes through os.replace, which swaps the
+    directory entry and never edits the shared inode."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.link")
+    try:
+        os.link(src, tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _fsync_path(path: Path, flags: int = os.O_RDWR) -> None:
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(path: Path) -> None:
+    """Persist renames in *path*. Windows can't open a directory for fsync
+    (NTFS journals the rename itself), so this is best-effort there."""
+    if os.name == "nt":
+        return
+    try:
+        _fsync_path(path, os.O_RDONLY)
+    except OSError:
+        pass
+
+
+class BatchWriter:
+    """Stage many small files, then make them durable and visible together.
+
+    ``write_bytes_atomic`` pays one fsync per file, which dominates when a run
+    writes hundreds of icons. A batch writes every temp file first without
+    syncing, and ``commit()`` then fsyncs them in one parallel pass, renames
+    each into place, and fsyncs every touched directory once. Each destination
+    is still replaced atomically (a crash leaves either the old file or the
+    complete new one, never a torn write), and nothing is renamed until every
+    staged file is on disk, so callers that gate a later step (the mirror's JSON
+    rewrite, a manifest save) on ``commit()`` returning keep the same guarantee
+    they had with per-file writes.
+
+    Used as a context manager it commits on a clean exit and discards the
+    staged files if the block raises. ``write_*`` calls are thread-safe.
+    """
+
+    def __init__(self, fsync_workers: int = 8) -> None:
+        self.fsync_workers = fsync_workers
+        self._staged: dict[Path, Path] = {}
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def __contains__(self, path: Path) -> bool:
+        """True while *path* has staged (not yet committed) content."""
+        return path in self._staged
+
+    def temp_path(self, path: Path, suffix: str = ".tmp") -> Path:
+        """Reserve the temp file that will replace *path* on commit.
+
+        For writers that need a file name (e.g. cv2.imwrite picks the encoder
+        from the suffix). Call ``discard(path)`` if writing it fails."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._counter += 1
+            temp = path.with_name(f".{path.name}.{os.getpid()}.b{self._counter}{suffix}")
+            previous = self._staged.get(path)
+            self._staged[path] = temp
+        if previous is not None:
+            previous.unlink(missing_ok=True)
+        return temp
+
+    def discard(self, path: Path) -> None:
+        with self._lock:
+            temp = self._staged.pop(path, None)
+        if temp is not None:
+            temp.unlink(missing_ok=True)
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        temp = self.temp_path(path)
+        try:
+            temp.write_bytes(data)
+        except BaseException:
+            self.discard(path)
+            raise
+
+    def write_json(self, path: Path, data: Any, **json_kwargs: Any) -> None:
+        temp = self.temp_path(path)
+        try:
+            with temp.open("w", encoding="utf-8", newline="\n") as handle:
+                json.dump(data, handle, **json_kwargs)
+        except BaseException:
+            self.discard(path)
+            raise
+
+    def commit(self) -> int:
+        """fsync all staged files, rename them into place, fsync their
+        directories. Returns the number of files committed."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        if not staged:
+            return 0
+        try:
+            # fsync releases the GIL, so a few threads let the disk see the
+            # whole batch at once instead of one flush per round trip.
+            with ThreadPoolExecutor(max_workers=max(1, self.fsync_workers)) as pool:
+                list(pool.map(_fsync_path, staged.values()))
+        except BaseException:
+            for temp in staged.values():
+                temp.unlink(missing_ok=True)
+            raise
+        try:
+            for path, temp in staged.items():
+                os.replace(temp, path)
+        finally:
+            # Only non-empty after a failed rename; replaced temps are gone.
+            for temp in staged.values():
+                temp.unlink(missing_ok=True)
+        for directory in {path.parent for path in staged}:
+            _fsync_directory(directory)
+        return len(staged)
+
+    def abort(self) -> None:
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        for temp in staged.values():
+            temp.unlink(missing_ok=True)
+
+
 def merge_records_by_id(
     existing: list[dict[str, Any]],
     updates: list[dict[str, Any]],
@@ -0,0 +1,261 @@
+"""
+Sharded layout for the character data: one file per character plus an index.
+
+`Characters.json` holds every character in all 14 languages (moves, chains,
+skill params), and every consumer re-read all of it even to look up one id or
+the English columns. The sharded layout splits it up:
+
+    public/Data/Characters/
+      index.json   {"version": 1, "records": [{id, name, element, weaponType,
+                    legacyId, hash, file}, ...]}  (Characters.json order)
+      <id>.json    one character, the same shape as a Characters.json entry
+
+`name` is the full i18n object; `element` and `weaponType` are English, the
+same columns game_catalog indexes. `hash` is the sha256 (16 hex digits) of the
+record as the sync produced it, before the image mirror rewrote its URLs. An
+incremental sync compares against it and rewrites only the shards whose
+character actually changed, so an unchanged, already-mirrored shard is never
+reset to upstream URLs. The no-fetch re-parse in sync_characters works on
+mirrored records, so it passes the existing hash through (`hashes`) for every
+character it left alone instead of hashing the mirrored URLs.
+
+Layouts (`--layout` on sync_characters, `--character-layout` on sync_encore):
+
+  combined   Characters.json only (the default; the site reads this file)
+  sharded    Characters/index.json + shards only
+  both       both, written from the same records
+
+The layouts are exclusive: writing one removes the output of the other, so a
+reader that finds an index can trust it. Readers go through `load_characters()`,
+`load_character()` or, for the English columns, game_catalog, which builds its
+records from the index and only opens a shard when a record's raw data is used.
+
+Usage:
+    from data_shards import load_character, load_characters, save_characters
+    save_characters(DATA_DIR, characters, "both", json_kwargs)
+    load_character(DATA_DIR, 1205)        # reads Characters/1205.json only
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from cdn_config import merge_records_by_id, write_json_atomic
+from l10n_split import remove_split, save_split
+
+LAYOUTS = ("combined", "sharded", "both")
+DEFAULT_LAYOUT = "combined"
+COMBINED_FILENAME = "Characters.json"
+SHARD_DIRNAME = "Characters"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+
+def layout_argument(parser: argparse.ArgumentParser, flag: str = "--layout") -> None:
+    """The layout flag, shared by every script that writes the character data."""
+    parser.add_argument(
+        flag,
+        choices=LAYOUTS,
+        default=DEFAULT_LAYOUT,
+        help=f"Character output layout: Characters.json, per-character shards + index, or both (default {DEFAULT_LAYOUT})",
+    )
+
+
+def _en(value: Any) -> str:
+    if isinstance(value, dict):
+        return str(value.get("en") or "")
+    return value if isinstance(value, str) else ""
+
+
+def record_hash(record: dict) -> str:
+    canonical = json.dumps(record, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def index_hashes(data_dir: Path) -> dict[str, str]:
+    """id -> index hash of the sharded layout on disk (empty without one)."""
+    return {str(row.get("id")): row["hash"] for row in load_index(data_dir) or [] if row.get("hash")}
+
+
+def index_row(character: dict) -> dict:
+    """The index columns for one character (hash/file are added by the writer)."""
+    return {
+        "id": character.get("id"),
+        "name": character.get("name"),
+        "element": _en((character.get("element") or {}).get("name")),
+        "weaponType": _en((character.get("weapon") or {}).get("name")),
+        "legacyId": str(character.get("legacyId", "") or "").strip(),
+    }
+
+
+def _sort_key(row: dict) -> str:
+    return _en(row.get("name"))
+
+
+# --- Reading ---
+
+def load_index(data_dir: Path) -> list[dict] | None:
+    """Index rows in Characters.json order, or None without a sharded layout."""
+    path = data_dir / SHARD_DIRNAME / INDEX_FILENAME
+    if not path.exists():
+        return None
+    index = json.loads(path.read_bytes())
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        raise ValueError(f"Unsupported character shard index: {path}")
+    return [row for row in index.get("records", []) if isinstance(row, dict)]
+
+
+def shard_path(data_dir: Path, row: dict) -> Path:
+    return data_dir / SHARD_DIRNAME / row["file"]
+
+
+def current_layout(data_dir: Path) -> str | None:
+    """The layout on disk (None when there is no character data yet)."""
+    sharded = (data_dir / SHARD_DIRNAME / INDEX_FILENAME).exists()
+    combined = (data_dir / COMBINED_FILENAME).exists()
+    if sharded and combined:
+        return "both"
+    return "sharded" if sharded else "combined" if combined else None
+
+
+def load_characters(data_dir: Path) -> list[dict]:
+    """Every character, from the shards when the index exists, else Characters.json."""
+    rows = load_index(data_dir)
+    if rows is not None:
+        return [json.loads(shard_path(data_dir, row).read_bytes()) for row in rows]
+    path = data_dir / COMBINED_FILENAME
+    data = json.loads(path.read_bytes())
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array in {path}")
+    return [row for row in data if isinstance(row, dict)]
+
+
+def load_character(data_dir: Path, char_id: int | str) -> dict | None:
+    """One character; with shards only its file is read."""
+    rows = load_index(data_dir)
+    if rows is not None:
+        for row in rows:
+            if str(row.get("id")) == str(char_id):
+                return json.loads(shard_path(data_dir, row).read_bytes())
+        return None
+    if not (data_dir / COMBINED_FILENAME).exists():
+        return None
+    for character in load_characters(data_dir):
+        if str(character.get("id")) == str(char_id):
+            return character
+    return None
+
+
+# --- Writing ---
+
+def write_shards(
+    data_dir: Path,
+    characters: list[dict],
+    json_kwargs: dict,
+    merge: bool = False,
+    hashes: dict[str, str] | None = None,
+) -> tuple[int, int, int]:
+    """Write changed shards, then the index. Returns (written, unchanged, removed).
+
+    With merge, index rows for characters not in *characters* are kept (a
+    single-id sync); otherwise their shards are removed. *hashes* (id -> hash)
+    is recorded instead of the record's own hash for the ids it lists. The
+    index is replaced last, so a reader never sees a row whose shard is missing.
+    """
+    hashes = hashes or {}
+    directory = data_dir / SHARD_DIRNAME
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = {str(row.get("id")): row for row in load_index(data_dir) or []}
+
+    rows: dict[str, dict] = dict(previous) if merge else {}
+    written = unchanged = 0
+    for character in characters:
+        key = str(character.get("id"))
+        row = {**index_row(character), "hash": hashes.get(key) or record_hash(character), "file": f"{key}.json"}
+        old = previous.get(key)
+        if old and old.get("hash") == row["hash"] and (directory / row["file"]).exists():
+            unchanged += 1
+        else:
+            write_json_atomic(directory / row["file"], character, **json_kwargs)
+            written += 1
+        rows[key] = row
+
+    ordered = sorted(rows.values(), key=_sort_key)
+    write_json_atomic(
+        directory / INDEX_FILENAME,
+        {"version": INDEX_VERSION, "records": ordered},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+    removed = 0
+    for key, row in previous.items():
+        if key not in rows:
+            (directory / row["file"]).unlink(missing_ok=True)
+            removed += 1
+    return written, unchanged, removed
+
+
+def remove_shards(data_dir: Path) -> int:
+    """Drop the index and the shards it lists; returns the number of shards."""
+    rows = load_index(data_dir)
+    if rows is None:
+        return 0
+    # Index first: without it readers fall back to Characters.json at once.
+    (data_dir / SHARD_DIRNAME / INDEX_FILENAME).unlink()
+    for row in rows:
+        shard_path(data_dir, row).unlink(missing_ok=True)
+    return len(rows)
+
+
+def save_characters(
+    data_dir: Path,
+    characters: list[dict],
+    layout: str,
+    json_kwargs: dict,
+    merge: bool = False,
+    split_langs: bool = False,
+    hashes: dict[str, str] | None = None,
+) -> None:
+    """Write *characters* in *layout*, merging by id into the existing data
+    when *merge* is set, and remove the other layout's output.
+
+    With *split_langs*, the per-language split of Characters.json
+    (l10n_split.py) is written too; it needs the combined file, so the
+    sharded layout drops it instead. *hashes* goes to write_shards."""
+    if layout in ("combined", "both"):
+        combined = characters
+        if merge and current_layout(data_dir):
+            combined = merge_records_by_id(load_characters(data_dir), characters)
+        combined = sorted(combined, key=_sort_key)
+        path = data_dir / COMBINED_FILENAME
+        write_json_atomic(path, combined, **json_kwargs)
+        print(f"  Saved {COMBINED_FILENAME} [{path.stat().st_size / 1024:.1f}KB] ({len(combined)} characters)")
+        if split_langs:
+            save_split(data_dir, COMBINED_FILENAME, combined, json_kwargs)
+
+    if layout in ("sharded", "both"):
+        if merge and load_index(data_dir) is None and (data_dir / COMBINED_FILENAME).exists():
+            # First sharded write of a single id: seed the index from the combined file.
+            characters = merge_records_by_id(load_characters(data_dir), characters)
+        written, unchanged, removed = write_shards(data_dir, characters, json_kwargs, merge=merge, hashes=hashes)
+        print(
+            f"  Saved {SHARD_DIRNAME}/{INDEX_FILENAME}: {written} shards written, "
+            f"{unchanged} unchanged, {removed} removed"
+        )
+    elif layout == "combined":
+        removed = remove_shards(data_dir)
+        if removed:
+            print(f"  Removed {removed} stale character shards and their index")
+
+    if layout == "sharded":
+        stale = data_dir / COMBINED_FILENAME
+        if stale.exists():
+            stale.unlink()
+            print(f"  Removed stale {COMBINED_FILENAME} (sharded layout)")
+        if remove_split(data_dir, COMBINED_FILENAME):
+            print(f"  Removed the per-language split of {COMBINED_FILENAME} (sharded layout)")
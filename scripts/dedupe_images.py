@@ -0,0 +1,419 @@
+"""
+Find duplicate and near-duplicate images across public/assets/ and
+../backend/Data/, optionally hard-linking the exact ones together.
+
+The mirror only dedupes by normalized path (compute_key) and, with
+--manifest, by identical bytes. The same icon still ends up stored several
+times when upstream serves it under different paths (Wuthery /d/ vs /p/,
+skin variants, the derived Head256 portrait) or re-encodes it, and the
+backend SIFT template sets can hold the same image under two ids.
+
+Every image is decoded once (cv2, in a thread pool) and reduced to a 32x32
+grayscale thumbnail; dHash and pHash are then computed for all thumbnails at
+once with NumPy (one batched DCT for pHash) and compared pairwise in
+blocks. Files are grouped as:
+
+  identical-bytes   same sha256
+  identical-pixels  different bytes, same decoded pixels (e.g. a re-encode
+                    that happened to be lossless, or a PNG/WebP pair)
+  near              different pixels, dHash and pHash both within
+                    --threshold bits (each exact set counted once)
+
+--link hard-links each identical-bytes/identical-pixels set with the same
+file suffix to its smallest member (atomic replace, so a later rewrite of any
+path breaks the link instead of editing the shared file) and updates the
+mirror manifest's sha256/size for relinked keys. Near duplicates are visibly
+different images and are only reported: collapsing them means choosing one
+reference in the data JSONs (or dropping a backend template), which is a
+review decision, not something to do in bulk.
+
+Usage:
+  python scripts/dedupe_images.py                       # Report duplicate groups
+  python scripts/dedupe_images.py --report dupes.json   # Also write the full report as JSON
+  python scripts/dedupe_images.py --threshold 6         # Looser near-duplicate matching
+  python scripts/dedupe_images.py --link                # Hard-link byte/pixel-identical files
+
+Requires:
+  pip install opencv-python numpy
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from cdn_config import link_atomic, write_json_atomic  # noqa: E402
+from sync_backend import BACKEND_DATA  # noqa: E402
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+    np = None
+
+FRONTEND_DIR = SCRIPTS_DIR.parent
+ASSETS_DIR = FRONTEND_DIR / "public" / "assets"
+# The mirror's --variants output: downscaled copies of files scanned anyway,
+# which would otherwise all report as near duplicates of their source.
+VARIANTS_DIR = ASSETS_DIR / "variants"
+
+IMAGE_SUFFIXES = {".webp", ".png", ".jpg", ".jpeg"}
+THUMB_SIZE = 32            # pHash DCT input
+PHASH_SIZE = 8             # low-frequency block kept from the DCT
+DEFAULT_THRESHOLD = 4      # max differing bits (of 64) for both hashes
+DECODE_WORKERS = os.cpu_count() or 4
+# Pairwise comparison runs in row blocks of this many cells (block_rows * N),
+# which bounds the temporary XOR/popcount arrays to a few hundred MB.
+COMPARE_BLOCK_CELLS = 16_000_000
+
+
+# --- Scan + decode ------------------------------------------------------------
+
+def iter_images(roots: list[Path]):
+    variants = VARIANTS_DIR.resolve()
+    for root in roots:
+        for path in sorted(root.rglob("*")):
+            # Dotfiles are the writers' temp files, never assets.
+            if path.suffix.lower() not in IMAGE_SUFFIXES or path.name.startswith(".") or not path.is_file():
+                continue
+            if not path.resolve().is_relative_to(variants):
+                yield path
+
+
+def _to_gray(img):
+    """Grayscale of a decoded image; transparent pixels count as black so an
+    icon and the same art with a different alpha mask do not look equal."""
+    if img.dtype != np.uint8:
+        img = (img / 257).astype(np.uint8)  # 16-bit PNG
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 4:
+        alpha = img[:, :, 3:4].astype(np.float32) / 255
+        img = (img[:, :, :3].astype(np.float32) * alpha).astype(np.uint8)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def decode_image(path: Path) -> dict:
+    """sha256, pixel digest and the two hash thumbnails for one file.
+    cv2 releases the GIL while decoding/resizing, so this runs in threads."""
+    data = path.read_bytes()
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError("could not decode image")
+    pixels = hashlib.sha256(repr(img.shape).encode())
+    pixels.update(img.tobytes())
+    gray = _to_gray(img)
+    stat = path.stat()
+    return {
+        "path": path,
+        "bytes": len(data),
+        "inode": (stat.st_dev, stat.st_ino),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "pixels": pixels.hexdigest(),
+        "shape": img.shape[:2],
+        "thumb": cv2.resize(gray, (THUMB_SIZE, THUMB_SIZE), interpolation=cv2.INTER_AREA),
+        "dthumb": cv2.resize(gray, (PHASH_SIZE + 1, PHASH_SIZE), interpolation=cv2.INTER_AREA),
+    }
+
+
+# --- Batched hashing ----------------------------------------------------------
+
+def _pack_bits(bits) -> "np.ndarray":
+    """(N, 64) bool -> (N,) uint64."""
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def _dct_matrix(n: int) -> "np.ndarray":
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+def dhash_batch(dthumbs) -> "np.ndarray":
+    """Horizontal-gradient hash of (N, 8, 9) thumbnails."""
+    bits = dthumbs[:, :, 1:] > dthumbs[:, :, :-1]
+    return _pack_bits(bits.reshape(len(dthumbs), -1))
+
+
+def phash_batch(thumbs) -> "np.ndarray":
+    """DCT hash of (N, 32, 32) thumbnails: one batched 2-D DCT, then each
+    low-frequency coefficient against that image's median (DC excluded)."""
+    dct = _dct_matrix(THUMB_SIZE)
+    coeffs = dct @ thumbs.astype(np.float32) @ dct.T
+    low = coeffs[:, :PHASH_SIZE, :PHASH_SIZE].reshape(len(thumbs), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack_bits(low > median)
+
+
+def _popcount(values) -> "np.ndarray":
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    as_bytes = values.view(np.uint8).reshape(*values.shape, 8)
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1, dtype=np.uint8)
+
+
+def near_pairs(dhashes, phashes, threshold: int):
+    """Yield (i, j), i < j, whose dHash and pHash both differ by <= threshold bits."""
+    count = len(dhashes)
+    block = max(1, COMPARE_BLOCK_CELLS // max(count, 1))
+    for start in range(0, count, block):
+        stop = min(count, start + block)
+        close = (_popcount(dhashes[start:stop, None] ^ dhashes[None, :]) <= threshold) & (
+            _popcount(phashes[start:stop, None] ^ phashes[None, :]) <= threshold
+        )
+        for i, j in zip(*np.nonzero(close)):
+            i += start
+            if i < j:
+                yield int(i), int(j)
+
+
+# --- Grouping -----------------------------------------------------------------
+
+class _DisjointSet:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _canonical(members: list[dict]) -> dict:
+    return min(members, key=lambda m: (m["bytes"], str(m["path"])))
+
+
+def _reclaimable(members: list[dict]) -> int:
+    """Bytes freed if every member shared the smallest member's inode
+    (files already sharing an inode are counted once)."""
+    sizes = {m["inode"]: m["bytes"] for m in members}
+    return sum(sizes.values()) - min(sizes.values())
+
+
+def group_images(images: list[dict], threshold: int) -> list[dict]:
+    """Exact groups (one per decoded-pixel digest with 2+ files), then near
+    groups joining different exact sets, each represented by its smallest file."""
+    by_pixels: dict[str, list[dict]] = {}
+    for image in images:
+        by_pixels.setdefault(image["pixels"], []).append(image)
+
+    groups = []
+    for members in by_pixels.values():
+        if len(members) < 2:
+            continue
+        kind = "identical-bytes" if len({m["sha256"] for m in members}) == 1 else "identical-pixels"
+        groups.append({"kind": kind, "members": members, "reclaimable": _reclaimable(members)})
+
+    # Near matching runs on one representative per exact set, so a set of
+    # byte-identical copies is not reported a second time as near duplicates.
+    representatives = [_canonical(members) for members in by_pixels.values()]
+    if len(representatives) > 1:
+        sets = _DisjointSet(len(representatives))
+        dhashes = dhash_batch(np.stack([image["dthumb"] for image in representatives]))
+        phashes = phash_batch(np.stack([image["thumb"] for image in representatives]))
+        for i, j in near_pairs(dhashes, phashes, threshold):
+            sets.union(i, j)
+        members_by_root: dict[int, list[dict]] = {}
+        for index, image in enumerate(representatives):
+            members_by_root.setdefault(sets.find(index), []).append(image)
+        for members in members_by_root.values():
+            if len(members) > 1:
+                groups.append({"kind": "near", "members": members, "reclaimable": _reclaimable(members)})
+
+    groups.sort(key=lambda g: (-g["reclaimable"], str(g["members"][0]["path"])))
+    return groups
+
+
+def link_sets(groups: list[dict]) -> list[list[dict]]:
+    """Sets that --link may collapse: the exact groups, split by suffix (the
+    extension has to keep matching the content type)."""
+    sets: dict[tuple[str, str], list[dict]] = {}
+    for group in groups:
+        if group["kind"] == "near":
+            continue
+        for member in group["members"]:
+            sets.setdefault((member["pixels"], member["path"].suffix.lower()), []).append(member)
+    return [members for members in sets.values() if len({m["inode"] for m in members}) > 1]
+
+
+# --- Linking ------------------------------------------------------------------
+
+def link_duplicates(groups: list[dict]) -> tuple[int, int, list[Path]]:
+    """Hard-link every exact set to its canonical member.
+    Returns (files linked, bytes freed, relinked paths)."""
+    linked = freed = 0
+    relinked: list[Path] = []
+    for members in link_sets(groups):
+        canonical = _canonical(members)
+        for member in members:
+            if member["inode"] == canonical["inode"]:
+                continue
+            try:
+                link_atomic(canonical["path"], member["path"])
+            except OSError as error:
+                # EXDEV (frontend and backend on different filesystems) or no
+                # hard-link support: leave the file alone.
+                print(f"  SKIP {member['path']} ({error})")
+                continue
+            linked += 1
+            freed += member["bytes"]
+            relinked.append(member["path"])
+            member.update(inode=canonical["inode"], bytes=canonical["bytes"], sha256=canonical["sha256"])
+    return linked, freed, relinked
+
+
+def update_manifest(relinked: list[Path]) -> int:
+    """Point the mirror manifest's sha256/size at the linked content so its
+    hash index (and the next run's twin dedupe) matches what is on disk."""
+    root = ASSETS_DIR.resolve()
+    keys = {
+        path.resolve().relative_to(root).as_posix(): path
+        for path in relinked
+        if path.resolve().is_relative_to(root)
+    }
+    if not keys:
+        return 0
+    # Imported here: the mirror needs requests/Pillow, which a backend-only scan does not.
+    # MANIFEST_PATH is scripts/.cache/mirror-manifest.json, outside the scanned roots.
+    from mirror_images_to_public import MANIFEST_PATH, MirrorManifest
+
+    if not MANIFEST_PATH.exists():
+        return 0
+    manifest = MirrorManifest.load(MANIFEST_PATH)
+    updated = 0
+    for key, path in keys.items():
+        entry = manifest.get(key)
+        if entry is None:
+            continue
+        data = path.read_bytes()
+        meta = {name: value for name, value in entry.items() if name not in ("sha256", "bytes")}
+        manifest.record(key, meta, hashlib.sha256(data).hexdigest(), len(data))
+        updated += 1
+    if updated:
+        manifest.save(MANIFEST_PATH)
+    return updated
+
+
+# --- Report -------------------------------------------------------------------
+
+def _display(path: Path) -> str:
+    for base in (FRONTEND_DIR, BACKEND_DATA.parent):
+        try:
+            return path.resolve().relative_to(base.resolve()).as_posix()
+        except ValueError:
+            continue
+    return str(path)
+
+
+def report_payload(groups: list[dict], scanned: int, roots: list[Path], threshold: int) -> dict:
+    return {
+        "scanned": scanned,
+        "roots": [_display(root) for root in roots],
+        "threshold": threshold,
+        "groups": [
+            {
+                "kind": group["kind"],
+                "reclaimableBytes": group["reclaimable"],
+                "canonical": _display(_canonical(group["members"])["path"]),
+                "members": [
+                    {
+                        "path": _display(m["path"]),
+                        "bytes": m["bytes"],
+                        "size": list(m["shape"][::-1]),
+                        "sha256": m["sha256"],
+                    }
+                    for m in sorted(group["members"], key=lambda m: str(m["path"]))
+                ],
+            }
+            for group in groups
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report (and optionally hard-link) duplicate mirrored images")
+    parser.add_argument(
+        "--root", type=Path, action="append", default=None,
+        help="Directory to scan (repeatable; default: public/assets and ../backend/Data)",
+    )
+    parser.add_argument(
+        "--threshold", type=int, default=DEFAULT_THRESHOLD,
+        help=f"Max differing hash bits for near duplicates (default {DEFAULT_THRESHOLD}, 0 = hash-equal only)",
+    )
+    parser.add_argument("--report", type=Path, default=None, help="Write the full report as JSON")
+    parser.add_argument("--link", action="store_true", help="Hard-link byte/pixel-identical files")
+    parser.add_argument("--workers", type=int, default=DECODE_WORKERS, help="Decode threads")
+    args = parser.parse_args()
+
+    if cv2 is None or np is None:
+        print("cv2 + numpy are required (pip install opencv-python numpy)")
+        return 1
+    roots = args.root or [root for root in (ASSETS_DIR, BACKEND_DATA) if root.is_dir()]
+    missing = [root for root in roots if not root.is_dir()]
+    if missing or not roots:
+        print(f"Nothing to scan: {', '.join(map(str, missing)) or 'no asset directories found'}")
+        return 1
+
+    paths = list(iter_images(roots))
+    print(f"Scanning {len(paths)} images under {', '.join(_display(root) for root in roots)}")
+    images: list[dict] = []
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for path, future in [(path, pool.submit(decode_image, path)) for path in paths]:
+            try:
+                images.append(future.result())
+            except Exception as error:
+                failed += 1
+                print(f"  FAIL {_display(path)} ({error})")
+    if len(images) < 2:
+        print("Fewer than two decodable images; nothing to compare.")
+        return 1 if failed else 0
+
+    groups = group_images(images, args.threshold)
+    by_kind: dict[str, list[dict]] = {}
+    for group in groups:
+        by_kind.setdefault(group["kind"], []).append(group)
+
+    print(f"\n{len(groups)} duplicate groups ({failed} undecodable files skipped)")
+    for kind in ("identical-bytes", "identical-pixels", "near"):
+        kind_groups = by_kind.get(kind, [])
+        files = sum(len(g["members"]) for g in kind_groups)
+        reclaimable = sum(g["reclaimable"] for g in kind_groups)
+        print(f"  {kind:<17} {len(kind_groups):>5} groups  {files:>6} files  {reclaimable / 1024:>9.1f} KB reclaimable")
+    for group in groups[:20]:
+        print(f"\n  [{group['kind']}] {group['reclaimable'] / 1024:.1f} KB")
+        for member in sorted(group["members"], key=lambda m: str(m["path"])):
+            width_height = "x".join(map(str, member["shape"][::-1]))
+            print(f"    {_display(member['path'])} ({member['bytes'] / 1024:.1f} KB, {width_height})")
+    if len(groups) > 20:
+        print(f"\n  ... {len(groups) - 20} more (see --report)")
+
+    if args.link:
+        linked, freed, relinked = link_duplicates(groups)
+        updated = update_manifest(relinked) if relinked else 0
+        print(f"\nLinked {linked} files, {freed / 1024:.1f} KB freed ({updated} manifest entries updated)")
+
+    if args.report:
+        write_json_atomic(args.report, report_payload(groups, len(images), roots, args.threshold), indent=2)
+        print(f"\nReport: {args.report}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
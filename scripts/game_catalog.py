@@ -0,0 +1,305 @@
+"""
+Typed, indexed view of public/Data shared by the generator scripts.
+
+`sync_lb.py`, `sync_backend.py` and `sync_encore.py` all need the same few
+English columns (name, element, weapon type, legacy id, ...) out of the
+14-language Characters/Weapons/Echoes payloads. `load_catalog()` reads each file
+once per process, projects those columns into `__slots__` records and builds
+id / English-name / legacy-id indexes, so lookups are dict hits instead of
+`.get()` chains and list scans.
+
+The full localized record stays available as `record.raw`.
+
+When the characters are in the sharded layout (data_shards.py), the character
+table is built from `Characters/index.json` alone and a record's raw data is
+read from its shard the first time it is asked for (and kept), so
+English-only consumers never open the shards.
+
+`EchoTable` (what `catalog.echoes` is) also indexes echoes by a separator-
+and case-folded name key and by the number in their icon path, which is how
+sync_echoes and sync_encore attach a "Phantom: ..." skin to its base echo.
+
+`lang="en"` reads the per-language split (l10n_split.py) instead of the
+combined files when it is current: records are joined from the core and the
+English strings only, so their i18n fields hold just `{"en": text}`. sync_lb
+and sync_backend only read English and load the catalog this way.
+
+Usage:
+    from game_catalog import load_catalog
+    catalog = load_catalog(lang="en")
+    catalog.characters.get(1205).element      # "Spectro"
+    catalog.weapons.by_name["Emerald of Genesis"].legacy_id
+    catalog.echoes.skin_base("Phantom: Nightmare Crownless")   # "Nightmare: Crownless"
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar
+
+from data_shards import load_index, shard_path
+from l10n_split import load_records
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DATA_DIR = SCRIPTS_DIR.parent / "public" / "Data"
+
+
+def en_text(value: Any, default: str = "") -> str:
+    """English string of an i18n dict (or the value itself when already a string)."""
+    if isinstance(value, dict):
+        text = value.get("en")
+        return str(text) if text else default
+    if isinstance(value, str):
+        return value or default
+    return default
+
+
+def _nested_en(record: dict, *path: str) -> str:
+    value: Any = record
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return en_text(value)
+
+
+@dataclass(slots=True)
+class _Record:
+    id: int | str
+    name: str
+    legacy_id: str
+    _raw: dict | Path = field(repr=False)
+
+    @property
+    def key(self) -> str:
+        return "" if self.id is None else str(self.id)
+
+    @property
+    def raw(self) -> dict:
+        """Full localized record (read from its shard on first access when sharded)."""
+        if isinstance(self._raw, Path):
+            self._raw = json.loads(self._raw.read_bytes())
+        return self._raw
+
+    def i18n(self, field_name: str) -> Any:
+        """All-language value of a localized field, e.g. record.i18n("name")."""
+        return self.raw.get(field_name)
+
+
+@dataclass(slots=True)
+class CharacterRecord(_Record):
+    element: str = ""
+    weapon_type: str = ""
+
+
+@dataclass(slots=True)
+class WeaponRecord(_Record):
+    type: str = ""
+    rarity: int = 0
+
+
+@dataclass(slots=True)
+class EchoRecord(_Record):
+    cost: int = 0
+    fetter_ids: tuple[int, ...] = ()
+    icon: str = ""
+
+
+R = TypeVar("R", bound=_Record)
+
+
+class RecordTable(Generic[R]):
+    """Records in file order plus id / English-name / legacy-id indexes.
+
+    Name and legacy-id indexes keep the last record for a duplicated key, the
+    same as the `{name: record}` dicts they replace.
+    """
+
+    __slots__ = ("records", "by_id", "by_name", "by_legacy_id")
+
+    def __init__(self, records: Iterable[R]) -> None:
+        self.records: list[R] = list(records)
+        self.by_id: dict[str, R] = {}
+        self.by_name: dict[str, R] = {}
+        self.by_legacy_id: dict[str, R] = {}
+        for record in self.records:
+            self.by_id[record.key] = record
+            self.by_name[record.name] = record
+            if record.legacy_id:
+                self.by_legacy_id[record.legacy_id] = record
+
+    def __iter__(self) -> Iterator[R]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, record_id: int | str) -> R | None:
+        return self.by_id.get(str(record_id))
+
+
+PHANTOM_SKIN_PREFIX = "Phantom: "
+
+# ": " and " - " separators, and runs of whitespace, fold to one space.
+_ECHO_NAME_SEPARATOR_RE = re.compile(r"\s*(?::|\s-\s)\s*|\s+")
+# Base echoes use IconMonsterGoods or IconMonsterHead art, sometimes with a
+# letter prefix (YZ_) or a variant suffix (_0); skins use IconMonsterGoods_SG_<n>.
+_ECHO_ICON_NUMBER_RE = re.compile(r"T_IconMonster(?:Goods|Head)_(?:[A-Z]+_)?(\d+)(?:_\d+)?_UI")
+_SKIN_ICON_NUMBER_RE = re.compile(r"T_IconMonsterGoods_SG_(\d+)_UI")
+
+
+def echo_name_key(name: str) -> str:
+    """*name* with case and separators folded: "Nightmare Crownless",
+    "Nightmare: Crownless" and "nightmare:  crownless" share a key, as do
+    "Twin Nova - Collapsar Blade" and "Twin Nova: Collapsar Blade"."""
+    return _ECHO_NAME_SEPARATOR_RE.sub(" ", name).strip().casefold()
+
+
+class EchoTable(RecordTable[EchoRecord]):
+    """Echo records plus the indexes that resolve a phantom skin to its base.
+
+    Both extra indexes are built over `by_name` (one record per English name)
+    and drop keys that more than one record shares, so a lookup never picks
+    between two echoes."""
+
+    __slots__ = ("by_name_key", "by_icon_number")
+
+    def __init__(self, records: Iterable[EchoRecord]) -> None:
+        super().__init__(records)
+        self.by_name_key = _unique_index(self.by_name.values(), lambda record: echo_name_key(record.name))
+        self.by_icon_number = _unique_index(self.by_name.values(), _echo_icon_number)
+
+    def skin_base(self, skin_name: str, skin_icon: str = "") -> EchoRecord | None:
+        """The base echo of a "Phantom: <name>" skin: by exact English name,
+        then by name key, then by the number in the skin's SG icon."""
+        base_name = skin_name[len(PHANTOM_SKIN_PREFIX):] if skin_name.startswith(PHANTOM_SKIN_PREFIX) else skin_name
+        base = self.by_name.get(base_name) or self.by_name_key.get(echo_name_key(base_name))
+        if base is None and skin_icon:
+            match = _SKIN_ICON_NUMBER_RE.search(skin_icon)
+            if match:
+                base = self.by_icon_number.get(match.group(1))
+        return base
+
+
+def _echo_icon_number(record: EchoRecord) -> str:
+    match = _ECHO_ICON_NUMBER_RE.search(record.icon)
+    return match.group(1) if match else ""
+
+
+def _unique_index(records: Iterable[R], key_of: Callable[[R], str]) -> dict[str, R]:
+    index: dict[str, R] = {}
+    shared: set[str] = set()
+    for record in records:
+        key = key_of(record)
+        if not key or key in shared:
+            continue
+        if key in index:
+            del index[key]
+            shared.add(key)
+            continue
+        index[key] = record
+    return index
+
+
+def character_record(char: dict) -> CharacterRecord:
+    return CharacterRecord(
+        id=char.get("id"),
+        name=_nested_en(char, "name"),
+        legacy_id=str(char.get("legacyId", "") or "").strip(),
+        _raw=char,
+        element=_nested_en(char, "element", "name"),
+        weapon_type=_nested_en(char, "weapon", "name"),
+    )
+
+
+def character_index_record(row: dict, shard: Path) -> CharacterRecord:
+    """A record from a data_shards index row; the raw record stays in *shard*."""
+    return CharacterRecord(
+        id=row.get("id"),
+        name=en_text(row.get("name")),
+        legacy_id=str(row.get("legacyId", "") or "").strip(),
+        _raw=shard,
+        element=str(row.get("element") or ""),
+        weapon_type=str(row.get("weaponType") or ""),
+    )
+
+
+def weapon_record(weapon: dict) -> WeaponRecord:
+    rarity = weapon.get("rarity")
+    return WeaponRecord(
+        id=weapon.get("id"),
+        name=_nested_en(weapon, "name"),
+        legacy_id=str(weapon.get("legacyId", "") or "").strip(),
+        _raw=weapon,
+        type=_nested_en(weapon, "type", "name"),
+        rarity=(rarity.get("id", 0) if isinstance(rarity, dict) else 0) or 0,
+    )
+
+
+def echo_record(echo: dict) -> EchoRecord:
+    fetters = echo.get("fetter") if isinstance(echo.get("fetter"), list) else []
+    return EchoRecord(
+        id=echo.get("id"),
+        name=_nested_en(echo, "name"),
+        legacy_id=str(echo.get("legacyId", "") or "").strip(),
+        _raw=echo,
+        cost=int(echo.get("cost", 0) or 0),
+        fetter_ids=tuple(f for f in fetters if isinstance(f, int)),
+        icon=echo.get("icon") if isinstance(echo.get("icon"), str) else "",
+    )
+
+
+class GameCatalog:
+    """Lazily loaded Characters/Weapons/Echoes tables for one data directory."""
+
+    __slots__ = ("data_dir", "lang", "_characters", "_weapons", "_echoes")
+
+    def __init__(self, data_dir: Path = DATA_DIR, lang: str | None = None) -> None:
+        self.data_dir = data_dir
+        self.lang = lang
+        self._characters: RecordTable[CharacterRecord] | None = None
+        self._weapons: RecordTable[WeaponRecord] | None = None
+        self._echoes: EchoTable | None = None
+
+    def _load(self, filename: str) -> list[dict]:
+        return load_records(self.data_dir, filename, self.lang)
+
+    @property
+    def characters(self) -> RecordTable[CharacterRecord]:
+        if self._characters is None:
+            rows = load_index(self.data_dir)
+            if rows is not None:
+                self._characters = RecordTable(
+                    character_index_record(row, shard_path(self.data_dir, row)) for row in rows
+                )
+            else:
+                self._characters = RecordTable(
+                    character_record(row) for row in self._load("Characters.json")
+                )
+        return self._characters
+
+    @property
+    def weapons(self) -> RecordTable[WeaponRecord]:
+        if self._weapons is None:
+            self._weapons = RecordTable(
+                weapon_record(row) for row in self._load("Weapons.json")
+            )
+        return self._weapons
+
+    @property
+    def echoes(self) -> EchoTable:
+        if self._echoes is None:
+            self._echoes = EchoTable(
+                echo_record(row) for row in self._load("Echoes.json")
+            )
+        return self._echoes
+
+
+@lru_cache(maxsize=None)
+def load_catalog(data_dir: Path = DATA_DIR, lang: str | None = None) -> GameCatalog:
+    """Return the process-wide catalog for *data_dir* (tables load on first use).
+
+    With *lang*, raw records carry only that language when the split is current."""
+    return GameCatalog(data_dir, lang)
@@ -0,0 +1,276 @@
+"""
+Per-language split of the localized public/Data files.
+
+Characters.json, Weapons.json, Echoes.json and Fetters.json embed every text
+field as a 14-language dict, so a reader that wants one language still
+downloads and parses all 14. The split writes, next to the combined file:
+
+    public/Data/i18n/
+      <Name>.core.json     {"version": 1, "source": <sha256>, "langs": [...],
+                            "records": [...]}   records with every i18n dict
+                                                replaced by null
+      <lang>/<Name>.json   {"version": 1, "source": <sha256>, "lang": "en",
+                            "strings": {"<record id>": {"<JSON pointer>": text}}}
+
+`<Name>` is the combined file's stem. Pointers are RFC 6901, relative to the
+record (e.g. "/chains/0/description"). An i18n dict is a dict that has an "en"
+key, only language keys and only string values; everything else stays in the
+core. Joining the core with every language file, in the core's `langs` order,
+gives back the combined records exactly; joining it with one gives `{lang: text}` dicts in the same
+places, which is what `en`-only readers (sync_lb, sync_backend via
+game_catalog) use.
+
+`source` is the sha256 of the combined file the split was derived from.
+The combined file stays canonical: a split whose source no longer matches (a
+sync or image mirror ran without refreshing it) is ignored by
+`load_records()`, which then parses the combined file.
+
+Usage:
+    python l10n_split.py                  # re-derive the split for every combined file present
+    python l10n_split.py Weapons.json     # just one
+    python l10n_split.py --pretty
+
+    from l10n_split import load_records, write_split
+    write_split(DATA_DIR, "Weapons.json", weapons, json_kwargs)
+    load_records(DATA_DIR, "Weapons.json", lang="en")
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from cdn_config import write_json_atomic
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DATA_DIR = SCRIPTS_DIR.parent / "public" / "Data"
+
+LANGS = ("de", "en", "es", "fr", "id", "ja", "ko", "pt", "ru", "th", "vi", "uk", "zh-Hans", "zh-Hant")
+SPLIT_FILES = ("Characters.json", "Weapons.json", "Echoes.json", "Fetters.json")
+SPLIT_DIRNAME = "i18n"
+SPLIT_VERSION = 1
+
+_LANG_SET = frozenset(LANGS)
+
+
+def split_argument(parser: argparse.ArgumentParser) -> None:
+    """The split flag, shared by every script that writes a localized file."""
+    parser.add_argument(
+        "--split-langs",
+        action="store_true",
+        help=f"Also write the per-language split under public/Data/{SPLIT_DIRNAME}/ (core + one strings file per language)",
+    )
+
+
+def _is_i18n(value: dict) -> bool:
+    return (
+        "en" in value
+        and _LANG_SET.issuperset(value)
+        and all(type(text) is str for text in value.values())
+    )
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def core_path(data_dir: Path, filename: str) -> Path:
+    return data_dir / SPLIT_DIRNAME / f"{Path(filename).stem}.core.json"
+
+
+def strings_path(data_dir: Path, filename: str, lang: str) -> Path:
+    return data_dir / SPLIT_DIRNAME / lang / filename
+
+
+def _source_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+# --- Split / join ---
+
+def split_records(records: list[dict]) -> tuple[list[dict], dict[str, dict[str, dict[str, str]]]]:
+    """(core records, {lang: {record id: {pointer: text}}}).
+
+    Records are keyed by `str(record["id"])`, which must be unique."""
+    strings: dict[str, dict[str, dict[str, str]]] = {}
+
+    def strip(value: Any, pointer: str, key: str) -> Any:
+        cls = type(value)
+        if cls is dict:
+            if _is_i18n(value):
+                for lang, text in value.items():
+                    strings.setdefault(lang, {}).setdefault(key, {})[pointer] = text
+                return None
+            return {k: strip(v, f"{pointer}/{_escape(k)}", key) for k, v in value.items()}
+        if cls is list:
+            return [strip(v, f"{pointer}/{i}", key) for i, v in enumerate(value)]
+        return value
+
+    core: list[dict] = []
+    seen: set[str] = set()
+    for record in records:
+        key = str(record.get("id"))
+        if record.get("id") is None or key in seen:
+            raise ValueError(f"Cannot split records without a unique id (id={record.get('id')!r})")
+        seen.add(key)
+        core.append(strip(record, "", key))
+    return core, strings
+
+
+def join_records(core: list[dict], strings_by_lang: dict[str, dict[str, dict[str, str]]]) -> list[dict]:
+    """Put the strings of every language in *strings_by_lang* back into *core*,
+    in place (the inverse of `split_records`). Returns *core*."""
+    by_id = {str(record.get("id")): record for record in core}
+    for lang, strings in strings_by_lang.items():
+        for key, fields in strings.items():
+            record = by_id.get(key)
+            if record is None:
+                continue
+            for pointer, text in fields.items():
+                *parents, last = pointer.split("/")[1:]
+                target: Any = record
+                for token in parents:
+                    target = target[int(token)] if type(target) is list else target[_unescape(token)]
+                slot = int(last) if type(target) is list else _unescape(last)
+                if target[slot] is None:
+                    target[slot] = {}
+                target[slot][lang] = text
+    return core
+
+
+# --- Writing ---
+
+def write_split(
+    data_dir: Path,
+    filename: str,
+    records: list[dict] | None = None,
+    json_kwargs: dict | None = None,
+) -> tuple[int, dict[str, int]]:
+    """Derive the split of *filename* (already written) from *records*, or
+    from the file itself when None. Returns (core bytes, {lang: bytes}).
+
+    The language files go first and the core last; a reader checks both
+    against the combined file, so a half-written split is just stale."""
+    json_kwargs = json_kwargs or {"separators": (",", ":"), "ensure_ascii": False}
+    raw = (data_dir / filename).read_bytes()
+    if records is None:
+        records = json.loads(raw)
+    source = _source_hash(raw)
+    core, strings = split_records(records)
+
+    sizes: dict[str, int] = {}
+    for lang in LANGS:
+        path = strings_path(data_dir, filename, lang)
+        if lang not in strings:
+            path.unlink(missing_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(
+            path,
+            {"version": SPLIT_VERSION, "source": source, "lang": lang, "strings": strings[lang]},
+            **json_kwargs,
+        )
+        sizes[lang] = path.stat().st_size
+
+    path = core_path(data_dir, filename)
+    write_json_atomic(
+        path,
+        {"version": SPLIT_VERSION, "source": source, "langs": list(strings), "records": core},
+        **json_kwargs,
+    )
+    return path.stat().st_size, sizes
+
+
+def report_split(filename: str, combined_size: int, core_size: int, sizes: dict[str, int]) -> None:
+    if not sizes:
+        return
+    largest = max(sizes.values())
+    print(
+        f"  Split {filename}: core {core_size / 1024:.1f}KB + {len(sizes)} languages "
+        f"(en {sizes.get('en', 0) / 1024:.1f}KB, largest {largest / 1024:.1f}KB); "
+        f"one language is {(core_size + sizes.get('en', largest)) / max(combined_size, 1):.0%} of {combined_size / 1024:.1f}KB"
+    )
+
+
+def save_split(data_dir: Path, filename: str, records: list[dict] | None, json_kwargs: dict) -> None:
+    """`write_split` plus the size report the sync scripts print."""
+    core_size, sizes = write_split(data_dir, filename, records, json_kwargs)
+    report_split(filename, (data_dir / filename).stat().st_size, core_size, sizes)
+
+
+def has_split(data_dir: Path, filename: str) -> bool:
+    return core_path(data_dir, filename).exists()
+
+
+def remove_split(data_dir: Path, filename: str) -> bool:
+    """Drop the split of *filename* (core first); True when there was one."""
+    path = core_path(data_dir, filename)
+    if not path.exists():
+        return False
+    path.unlink()
+    for lang in LANGS:
+        strings_path(data_dir, filename, lang).unlink(missing_ok=True)
+    return True
+
+
+# --- Reading ---
+
+def _load_split(data_dir: Path, filename: str, lang: str) -> list[dict] | None:
+    core_file = core_path(data_dir, filename)
+    strings_file = strings_path(data_dir, filename, lang)
+    combined = data_dir / filename
+    if not (core_file.exists() and strings_file.exists() and combined.exists()):
+        return None
+    source = _source_hash(combined.read_bytes())
+    core = json.loads(core_file.read_bytes())
+    strings = json.loads(strings_file.read_bytes())
+    for doc in (core, strings):
+        if not isinstance(doc, dict) or doc.get("version") != SPLIT_VERSION or doc.get("source") != source:
+            return None
+    return join_records(core.get("records", []), {lang: strings.get("strings", {})})
+
+
+def load_records(data_dir: Path, filename: str, lang: str | None = None) -> list[dict]:
+    """Records of a combined file. With *lang*, from the split when it is
+    current (i18n fields hold only `{lang: text}`); otherwise the combined
+    file with every language."""
+    if lang is not None:
+        records = _load_split(data_dir, filename, lang)
+        if records is not None:
+            return records
+    path = data_dir / filename
+    data = json.loads(path.read_bytes())
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array in {path}")
+    return [row for row in data if isinstance(row, dict)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write the per-language split of the localized public/Data files")
+    parser.add_argument("files", nargs="*", help=f"Combined files to split (default: {', '.join(SPLIT_FILES)})")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON")
+    args = parser.parse_args()
+
+    json_kwargs = (
+        {"indent": 2, "ensure_ascii": False}
+        if args.pretty
+        else {"separators": (",", ":"), "ensure_ascii": False}
+    )
+    names = args.files or [name for name in SPLIT_FILES if (args.data_dir / name).exists()]
+    for name in names:
+        if not (args.data_dir / name).exists():
+            parser.error(f"{args.data_dir / name} does not exist")
+        save_split(args.data_dir, name, None, json_kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
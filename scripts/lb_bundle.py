@@ -0,0 +1,369 @@
+"""
+Compact binary bundle of the numeric LB calc tables.
+
+`sync_lb.py` writes this next to the JSON outputs so the calc service can mmap
+the dense tables instead of parsing JSON. The JSON files stay canonical; the
+bundle only carries the parts that are hot and numeric:
+
+- level_curve.json / character_curve.json  -> f64 column arrays per curve
+- weapon_bases.json                         -> name/legacyId/type/rarity/main_stat,
+                                               ATK, base_main, params_r1/params_r5
+                                               and the passive bonus matrix
+
+Layout (little-endian, every section and f64 array 8-byte aligned):
+
+    header   "WWLB" u16 version, u16 section_count, u32 total_size, u32 0
+    index    section_count x (4s tag, u32 offset, u32 length)
+    STRS     u32 n, u32[n + 1] byte offsets, utf-8 blob      (interned strings)
+    CURV     u32 n_tables, u32[n_tables] table offsets, then per table:
+             u32 name, u32 n_keys, u32 n_cols, u32[n_cols] col names,
+             u32[n_keys] keys, pad, f64[n_cols * n_keys] column-major values
+             (a single column named "" is a scalar curve such as ATK_CURVE)
+    WPNS     u32 n_weapons, u32[n_weapons] record offsets, then per record:
+             u32 id, u32 name, u32 legacyId, u32 type, u32 rarity, u32 main_stat,
+             f64 ATK, f64 base_main, u32 n_r1, u32 n_r5, u32[n_r1], u32[n_r5],
+             u32 n_bonus, n_bonus x (u32 stat, u32 n_ranks, pad, f64[n_ranks])
+
+Every string (curve keys, stat names, params) is stored once in STRS and
+referenced by index. Offsets inside CURV/WPNS are relative to the section start.
+
+Usage:
+    python lb_bundle.py --verify              # Check calc_data.bin against the JSON outputs
+    python lb_bundle.py --verify --dir PATH   # Same, for another data directory
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+from pathlib import Path
+from typing import Any
+
+BUNDLE_MAGIC = b"WWLB"
+BUNDLE_VERSION = 1
+BUNDLE_FILENAME = "calc_data.bin"
+
+_HEADER = struct.Struct("<4sHHII")
+_INDEX_ENTRY = struct.Struct("<4sII")
+_SCALAR_COLUMN = ""
+
+# Weapon fields carried by the bundle; the verifier compares exactly these.
+WEAPON_STRING_FIELDS = ("name", "legacyId", "type", "rarity", "main_stat")
+WEAPON_NUMBER_FIELDS = ("ATK", "base_main")
+WEAPON_PARAM_FIELDS = ("params_r1", "params_r5")
+
+
+class _Buffer:
+    """Append-only byte buffer with alignment helpers."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def tell(self) -> int:
+        return len(self.data)
+
+    def align(self, size: int = 8) -> None:
+        self.data.extend(b"\0" * (-len(self.data) % size))
+
+    def u32(self, *values: int) -> None:
+        self.data.extend(struct.pack(f"<{len(values)}I", *values))
+
+    def f64(self, *values: float) -> None:
+        self.align()
+        self.data.extend(struct.pack(f"<{len(values)}d", *values))
+
+    def patch_u32(self, offset: int, value: int) -> None:
+        struct.pack_into("<I", self.data, offset, value)
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self.index: dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        sid = self.index.get(value)
+        if sid is None:
+            sid = len(self.strings)
+            self.strings.append(value)
+            self.index[value] = sid
+        return sid
+
+    def encode(self) -> bytes:
+        buf = _Buffer()
+        blobs = [s.encode("utf-8") for s in self.strings]
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        buf.u32(len(blobs), *offsets)
+        buf.data.extend(b"".join(blobs))
+        return bytes(buf.data)
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _curve_tables(level_curve: dict, character_curve: dict) -> list[tuple[str, list[str], list[str], list[list[float]]]]:
+    """Normalize both curve files into (name, keys, columns, values_by_column)."""
+    tables = []
+    for source in (level_curve, character_curve):
+        for name, curve in source.items():
+            keys = list(curve)
+            first = curve[keys[0]] if keys else None
+            if isinstance(first, dict):
+                columns = list(first)
+                values = [[float(curve[k][c]) for k in keys] for c in columns]
+            else:
+                columns = [_SCALAR_COLUMN]
+                values = [[float(curve[k]) for k in keys]]
+            tables.append((name, keys, columns, values))
+    return tables
+
+
+def _encode_curves(tables: list, strings: _StringTable) -> bytes:
+    buf = _Buffer()
+    buf.u32(len(tables))
+    offsets_at = buf.tell()
+    buf.u32(*([0] * len(tables)))
+    for i, (name, keys, columns, values) in enumerate(tables):
+        buf.align()
+        buf.patch_u32(offsets_at + 4 * i, buf.tell())
+        buf.u32(strings.intern(name), len(keys), len(columns))
+        buf.u32(*(strings.intern(c) for c in columns))
+        buf.u32(*(strings.intern(k) for k in keys))
+        buf.f64(*(v for column in values for v in column))
+    return bytes(buf.data)
+
+
+def _encode_weapons(weapon_bases: dict[str, dict], strings: _StringTable) -> bytes:
+    buf = _Buffer()
+    buf.u32(len(weapon_bases))
+    offsets_at = buf.tell()
+    buf.u32(*([0] * len(weapon_bases)))
+    for i, (wid, weapon) in enumerate(weapon_bases.items()):
+        buf.align()
+        buf.patch_u32(offsets_at + 4 * i, buf.tell())
+        buf.u32(int(wid), *(strings.intern(str(weapon.get(f, ""))) for f in WEAPON_STRING_FIELDS))
+        buf.f64(*(float(weapon.get(f, 0)) for f in WEAPON_NUMBER_FIELDS))
+        r1 = weapon.get("params_r1") or []
+        r5 = weapon.get("params_r5") or []
+        buf.u32(len(r1), len(r5))
+        buf.u32(*(strings.intern(p) for p in r1))
+        buf.u32(*(strings.intern(p) for p in r5))
+        bonuses = weapon.get("passive_bonuses") or {}
+        buf.u32(len(bonuses))
+        for stat, ranks in bonuses.items():
+            buf.u32(strings.intern(stat), len(ranks))
+            buf.f64(*ranks)
+    return bytes(buf.data)
+
+
+def encode_bundle(
+    weapon_bases: dict[str, dict],
+    level_curve: dict,
+    character_curve: dict,
+) -> bytes:
+    """Encode the numeric LB tables into a versioned binary bundle."""
+    strings = _StringTable()
+    # Encode payload sections first so STRS holds every interned string.
+    curv = _encode_curves(_curve_tables(level_curve, character_curve), strings)
+    wpns = _encode_weapons(weapon_bases, strings)
+    sections = [(b"STRS", strings.encode()), (b"CURV", curv), (b"WPNS", wpns)]
+
+    out = _Buffer()
+    out.data.extend(b"\0" * (_HEADER.size + _INDEX_ENTRY.size * len(sections)))
+    index = []
+    for tag, payload in sections:
+        out.align()
+        index.append((tag, out.tell(), len(payload)))
+        out.data.extend(payload)
+
+    _HEADER.pack_into(out.data, 0, BUNDLE_MAGIC, BUNDLE_VERSION, len(sections), len(out.data), 0)
+    for i, entry in enumerate(index):
+        _INDEX_ENTRY.pack_into(out.data, _HEADER.size + _INDEX_ENTRY.size * i, *entry)
+    return bytes(out.data)
+
+
+# ---------------------------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------------------------
+
+class _Reader:
+    def __init__(self, data: memoryview, pos: int = 0) -> None:
+        self.data = data
+        self.pos = pos
+
+    def u32(self, count: int = 1) -> tuple[int, ...]:
+        values = struct.unpack_from(f"<{count}I", self.data, self.pos)
+        self.pos += 4 * count
+        return values
+
+    def f64(self, count: int = 1) -> tuple[float, ...]:
+        self.pos += -self.pos % 8
+        values = struct.unpack_from(f"<{count}d", self.data, self.pos)
+        self.pos += 8 * count
+        return values
+
+
+def read_sections(data: bytes | memoryview) -> dict[str, memoryview]:
+    """Validate the header and return each section as a zero-copy view."""
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise ValueError("bundle is truncated")
+    magic, version, count, total, _ = _HEADER.unpack_from(view, 0)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError(f"bad bundle magic {magic!r}")
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"unsupported bundle version {version} (expected {BUNDLE_VERSION})")
+    if total != len(view):
+        raise ValueError(f"bundle size mismatch: header says {total}, got {len(view)}")
+    sections = {}
+    for i in range(count):
+        tag, offset, length = _INDEX_ENTRY.unpack_from(view, _HEADER.size + _INDEX_ENTRY.size * i)
+        sections[tag.decode("ascii")] = view[offset:offset + length]
+    return sections
+
+
+def _decode_strings(view: memoryview) -> list[str]:
+    reader = _Reader(view)
+    (count,) = reader.u32()
+    offsets = reader.u32(count + 1)
+    base = reader.pos
+    return [bytes(view[base + offsets[i]:base + offsets[i + 1]]).decode("utf-8") for i in range(count)]
+
+
+def _decode_curves(view: memoryview, strings: list[str]) -> dict[str, dict]:
+    reader = _Reader(view)
+    (count,) = reader.u32()
+    out: dict[str, dict] = {}
+    for offset in reader.u32(count):
+        table = _Reader(view, offset)
+        name_sid, n_keys, n_cols = table.u32(3)
+        columns = [strings[s] for s in table.u32(n_cols)]
+        keys = [strings[s] for s in table.u32(n_keys)]
+        values = table.f64(n_cols * n_keys)
+        if columns == [_SCALAR_COLUMN]:
+            curve: dict[str, Any] = dict(zip(keys, values))
+        else:
+            curve = {
+                key: {col: values[c * n_keys + k] for c, col in enumerate(columns)}
+                for k, key in enumerate(keys)
+            }
+        out[strings[name_sid]] = curve
+    return out
+
+
+def _decode_weapons(view: memoryview, strings: list[str]) -> dict[str, dict]:
+    reader = _Reader(view)
+    (count,) = reader.u32()
+    out: dict[str, dict] = {}
+    for offset in reader.u32(count):
+        rec = _Reader(view, offset)
+        wid, *string_sids = rec.u32(1 + len(WEAPON_STRING_FIELDS))
+        weapon: dict[str, Any] = {f: strings[s] for f, s in zip(WEAPON_STRING_FIELDS, string_sids)}
+        weapon.update(zip(WEAPON_NUMBER_FIELDS, rec.f64(len(WEAPON_NUMBER_FIELDS))))
+        n_r1, n_r5 = rec.u32(2)
+        weapon["params_r1"] = [strings[s] for s in rec.u32(n_r1)]
+        weapon["params_r5"] = [strings[s] for s in rec.u32(n_r5)]
+        (n_bonus,) = rec.u32()
+        bonuses: dict[str, list[float]] = {}
+        for _ in range(n_bonus):
+            stat_sid, n_ranks = rec.u32(2)
+            bonuses[strings[stat_sid]] = list(rec.f64(n_ranks))
+        weapon["passive_bonuses"] = bonuses
+        out[str(wid)] = weapon
+    return out
+
+
+def decode_bundle(data: bytes | memoryview) -> dict[str, Any]:
+    """Decode a bundle back into {"curves": {...}, "weapons": {...}}."""
+    sections = read_sections(data)
+    strings = _decode_strings(sections["STRS"])
+    return {
+        "curves": _decode_curves(sections["CURV"], strings),
+        "weapons": _decode_weapons(sections["WPNS"], strings),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Round-trip verification
+# ---------------------------------------------------------------------------
+
+def verify_bundle(
+    data: bytes,
+    weapon_bases: dict[str, dict],
+    level_curve: dict,
+    character_curve: dict,
+) -> list[str]:
+    """Compare a bundle against the JSON-side data. Returns mismatch messages."""
+    try:
+        decoded = decode_bundle(data)
+    except (ValueError, KeyError, struct.error) as exc:
+        return [f"bundle could not be decoded: {exc}"]
+
+    errors: list[str] = []
+    expected_curves = {**level_curve, **character_curve}
+    if set(decoded["curves"]) != set(expected_curves):
+        errors.append(f"curve tables differ: {sorted(decoded['curves'])} vs {sorted(expected_curves)}")
+    for name, curve in expected_curves.items():
+        if decoded["curves"].get(name) != curve:
+            errors.append(f"curve {name} differs")
+
+    weapons = decoded["weapons"]
+    # JSON outputs are written with sort_keys, so compare ids as sets.
+    if set(weapons) != set(weapon_bases):
+        errors.append(f"weapon ids differ ({len(weapons)} in bundle, {len(weapon_bases)} in JSON)")
+    for wid, weapon in weapon_bases.items():
+        got = weapons.get(wid)
+        if got is None:
+            continue
+        for field in WEAPON_STRING_FIELDS + WEAPON_NUMBER_FIELDS + WEAPON_PARAM_FIELDS:
+            if got[field] != weapon.get(field, "" if field in WEAPON_STRING_FIELDS else []):
+                errors.append(f"weapon {wid} {field}: {got[field]!r} != {weapon.get(field)!r}")
+        if got["passive_bonuses"] != (weapon.get("passive_bonuses") or {}):
+            errors.append(f"weapon {wid} passive_bonuses differ")
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or verify the LB calc binary bundle")
+    parser.add_argument("--verify", action="store_true", help="Round-trip check the bundle against the JSON outputs")
+    parser.add_argument("--dir", type=Path, default=None, help="LB calc data directory (default: sync_lb output dir)")
+    args = parser.parse_args()
+
+    if args.dir is None:
+        from sync_lb import DATA_OUTPUT_DIR
+        args.dir = DATA_OUTPUT_DIR
+
+    bundle_path = args.dir / BUNDLE_FILENAME
+    if not bundle_path.exists():
+        print(f"ERROR: Missing bundle: {bundle_path}")
+        return 1
+    data = bundle_path.read_bytes()
+    sections = read_sections(data)
+    print(f"{bundle_path}: v{BUNDLE_VERSION}, {len(data)} bytes")
+    for tag, view in sections.items():
+        print(f"  {tag}: {len(view)} bytes")
+
+    if not args.verify:
+        return 0
+
+    def load(name: str) -> Any:
+        return json.loads((args.dir / name).read_text(encoding="utf-8"))
+
+    errors = verify_bundle(
+        data,
+        load("weapon_bases.json"),
+        load("level_curve.json"),
+        load("character_curve.json"),
+    )
+    for error in errors:
+        print(f"  - {error}")
+    print("Bundle matches JSON outputs" if not errors else f"{len(errors)} mismatches")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+"""
+Shared legacy-ID index for weapons and echoes.
+
+The site's old sequential ids live in lib/data/legacyWeapons.json and
+legacyEchoes.json ([{id, name}]). sync_weapons, sync_encore and sync_lb each
+used to load them, build their own normalized-name index with their own
+`_normalize_name` (sync_weapons without the echo wording aliases), and report
+misses their own way, if at all.
+
+`load_legacy_index()` returns one process-wide `LegacyIdIndex`. Per kind
+("weapons", "echoes") it holds:
+
+  names   normalized name -> [legacy ids]   (catalog order, de-duplicated)
+  icons   icon number -> legacy id          (the number in T_IconWeapon<n>_UI /
+                                             T_IconMonsterGoods_<n>_UI, which
+                                             is the legacy id itself)
+
+The built sections are persisted to scripts/.cache/legacy-index.json
+(git-ignored) together with the sha256 of the catalog each came from, so a
+run only re-normalizes a catalog whose bytes changed (or after
+NORMALIZER_VERSION is bumped). Rebuilt sections are written by `save()`, which
+the sync scripts call on real runs only; a --dry-run leaves the file alone.
+`python legacy_ids.py` rebuilds the file and prints the catalog collisions.
+
+Every lookup is recorded: `report()` prints the ambiguous and unresolved
+names (and icon numbers missing from the catalog) of the run in one place.
+
+Usage:
+    from legacy_ids import load_legacy_index
+    legacy = load_legacy_index()
+    legacy.resolve("weapons", "Emerald of Genesis")   # unique id or None
+    legacy.candidates("echoes", "Baby Roseshroom")    # every matching id
+    legacy.report()
+    legacy.save()                                     # persist rebuilt sections
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from cdn_config import write_json_atomic
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+LEGACY_DATA_DIR = SCRIPTS_DIR.parent / "lib" / "data"
+CATALOGS = {
+    "weapons": LEGACY_DATA_DIR / "legacyWeapons.json",
+    "echoes": LEGACY_DATA_DIR / "legacyEchoes.json",
+}
+KIND_LABELS = {"weapons": "weapon", "echoes": "echo"}
+INDEX_PATH = SCRIPTS_DIR / ".cache" / "legacy-index.json"
+INDEX_VERSION = 1
+# Bump when normalize_name() changes so persisted sections are rebuilt.
+NORMALIZER_VERSION = 1
+
+ICON_ID_PATTERNS = {
+    "weapons": re.compile(r"T_IconWeapon(\d+)_UI"),
+    "echoes": re.compile(r"T_IconMonsterGoods_(\d+)_UI"),
+}
+
+NAME_TOKEN_ALIASES = {
+    "baby": "young",      # Baby Roseshroom (current) vs Young Roseshroom (legacy)
+    "reminiscence": "",   # Reminiscence prefixes are absent in some legacy labels
+}
+
+_NAME_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name: str) -> str:
+    # Normalize diacritics ("Jué" -> "Jue"), punctuation, and known wording drift.
+    folded = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    normalized_tokens: list[str] = []
+    for token in _NAME_TOKEN_RE.findall(ascii_name.lower()):
+        # Treat possessive "'s" punctuation splits as noise.
+        if token == "s":
+            continue
+        token = NAME_TOKEN_ALIASES.get(token, token)
+        if token == "":
+            continue
+        # Smooth common singular/plural diffs across legacy catalogs.
+        if token.isalpha() and len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        normalized_tokens.append(token)
+    return "".join(normalized_tokens)
+
+
+def _load_catalog(kind: str) -> tuple[bytes, list[dict]]:
+    path = CATALOGS[kind]
+    label = f"legacy {KIND_LABELS[kind]}"
+    if not path.exists():
+        raise FileNotFoundError(f"Missing required {label} catalog: {path}")
+    raw = path.read_bytes()
+    try:
+        payload = json.loads(raw)
+    except Exception as exc:
+        raise ValueError(f"Failed to load {label} catalog {path}: {exc}") from exc
+    if not isinstance(payload, list):
+        raise ValueError(f"{label} catalog must be a JSON array: {path}")
+    for i, entry in enumerate(payload):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{label} catalog entry at index {i} is not an object: {path}")
+    return raw, payload
+
+
+def build_section(catalog: list[dict]) -> dict:
+    """{"names": {normalized name: [ids]}, "icons": {icon number: id}} of one catalog."""
+    names: dict[str, list[str]] = {}
+    icons: dict[str, str] = {}
+    for entry in catalog:
+        legacy_id = str(entry.get("id", "") or "").strip()
+        if not legacy_id:
+            continue
+        if legacy_id.isdigit():
+            icons.setdefault(legacy_id, legacy_id)
+        key = normalize_name(str(entry.get("name", "") or "").strip())
+        if not key:
+            continue
+        bucket = names.setdefault(key, [])
+        if legacy_id not in bucket:
+            bucket.append(legacy_id)
+    return {"names": names, "icons": icons}
+
+
+class LegacyIdIndex:
+    """Name / icon-number lookups per kind, plus the misses of this run."""
+
+    def __init__(self, path: Path = INDEX_PATH, rebuild: bool = False) -> None:
+        self.path = path
+        self._sections: dict[str, dict] = {}
+        self._persisted: dict[str, dict] = {}
+        self.dirty = False
+        if path.exists() and not rebuild:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(payload, dict) and payload.get("version") == INDEX_VERSION:
+                self._persisted = payload.get("kinds") or {}
+        # kind -> {name: ids} / {name} / {icon number}
+        self.ambiguous: dict[str, dict[str, list[str]]] = {kind: {} for kind in CATALOGS}
+        self.unresolved: dict[str, set[str]] = {kind: set() for kind in CATALOGS}
+        self.unknown_icons: dict[str, set[str]] = {kind: set() for kind in CATALOGS}
+
+    def section(self, kind: str) -> dict:
+        """The built section of *kind*, rebuilt when its catalog or the
+        normalizer changed (and then written by the next save()). Raises like
+        a catalog load."""
+        section = self._sections.get(kind)
+        if section is not None:
+            return section
+        raw, catalog = _load_catalog(kind)
+        source = hashlib.sha256(raw).hexdigest()
+        stored = self._persisted.get(kind)
+        if (
+            isinstance(stored, dict)
+            and stored.get("source") == source
+            and stored.get("normalizer") == NORMALIZER_VERSION
+        ):
+            section = {"names": stored.get("names") or {}, "icons": stored.get("icons") or {}}
+        else:
+            section = build_section(catalog)
+            self._persisted[kind] = {"source": source, "normalizer": NORMALIZER_VERSION, **section}
+            self.dirty = True
+        self._sections[kind] = section
+        return section
+
+    def save(self) -> None:
+        if self.dirty:
+            write_json_atomic(
+                self.path,
+                {"version": INDEX_VERSION, "kinds": self._persisted},
+                ensure_ascii=False,
+                sort_keys=True,
+                indent=1,
+            )
+            self.dirty = False
+
+    def candidates(self, kind: str, name: str) -> list[str]:
+        """Every legacy id whose normalized name matches *name*."""
+        key = normalize_name(name) if name else ""
+        if not key:
+            return []
+        matches = self.section(kind)["names"].get(key, [])
+        if not matches:
+            self.unresolved[kind].add(name)
+        elif len(matches) > 1:
+            self.ambiguous[kind][name] = list(matches)
+        return list(matches)
+
+    def resolve(self, kind: str, name: str) -> str | None:
+        """The legacy id for *name* when exactly one matches."""
+        matches = self.candidates(kind, name)
+        return matches[0] if len(matches) == 1 else None
+
+    def icon_id(self, kind: str, icon: str) -> str | None:
+        """The legacy id encoded in an icon path. The number is returned even
+        when the catalog lacks it (newer than the catalog); such numbers are
+        reported."""
+        match = ICON_ID_PATTERNS[kind].search(icon or "")
+        if not match:
+            return None
+        number = match.group(1)
+        if number not in self.section(kind)["icons"]:
+            self.unknown_icons[kind].add(number)
+        return number
+
+    def report(self, max_rows: int = 20) -> None:
+        """Print this run's ambiguous / unresolved names and unknown icon numbers."""
+        for kind in CATALOGS:
+            rows = [
+                *(f"ambiguous {name!r}: [{', '.join(ids)}]" for name, ids in sorted(self.ambiguous[kind].items())),
+                *(f"unresolved {name!r}" for name in sorted(self.unresolved[kind])),
+                *(f"icon number {number} not in the catalog" for number in sorted(self.unknown_icons[kind], key=int)),
+            ]
+            if not rows:
+                continue
+            print(
+                f"Legacy {KIND_LABELS[kind]} IDs: {len(self.ambiguous[kind])} ambiguous, "
+                f"{len(self.unresolved[kind])} unresolved (kept their CDN id), "
+                f"{len(self.unknown_icons[kind])} unknown icon numbers"
+            )
+            for row in rows[:max_rows]:
+                print(f"  - {row}")
+            if len(rows) > max_rows:
+                print(f"  ... and {len(rows) - max_rows} more")
+
+
+@lru_cache(maxsize=None)
+def load_legacy_index(path: Path = INDEX_PATH) -> LegacyIdIndex:
+    """The process-wide legacy-ID index (sections build on first use)."""
+    return LegacyIdIndex(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the persisted legacy-ID index")
+    parser.parse_args()
+    index = LegacyIdIndex(rebuild=True)
+    for kind in CATALOGS:
+        section = index.section(kind)
+        collisions = {key: ids for key, ids in section["names"].items() if len(ids) > 1}
+        print(f"{kind}: {len(section['names'])} names, {len(section['icons'])} icon numbers, {len(collisions)} colliding names")
+        for key, ids in sorted(collisions.items()):
+            print(f"  - {key}: [{', '.join(ids)}]")
+    index.save()
+    print(f"Wrote {index.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,267 @@
+"""
+Shared, cached loader for the Wuthery LocalizationIndex files.
+
+sync_fetters reads PhantomFetters.json, PhantomFetterGroups.json and
+ConfigDBParsed/PhantomFetter.json, stat_translations reads PropertyIndexs.json,
+and sync_encore rebuilds the fetters from the same three files. Each used to
+fetch them one after another with its own session, on every run.
+
+`load_localization_index()` returns one process-wide `LocalizationIndex`:
+
+  - `prefetch(names)` fetches the files a script needs concurrently.
+  - Every body is kept in scripts/.cache/LocalizationIndex/ with its ETag /
+    Last-Modified, so a later run asks the CDN with a conditional request and
+    a 304 costs no body. A body whose sha256 no longer matches is fetched
+    again unconditionally.
+  - sync_all exports SYNC_ALL_STARTED; an entry checked after that is used
+    without asking the CDN again, so a full sync_all run downloads (or
+    revalidates) each file once, whichever script reads it first.
+  - `rows(name)` is the parsed list, `by_id(name)` the rows keyed by int Id,
+    both parsed once per process.
+  - Fetched bodies and validators are held until `save()`, which the sync
+    scripts call on real runs only; a --dry-run leaves the cache untouched.
+
+Usage:
+    python localization_index.py            # Fetch / revalidate every file and print what changed
+    python localization_index.py --refresh  # Ignore the cached validators
+
+    from localization_index import load_localization_index
+    index = load_localization_index()
+    index.prefetch(["PhantomFetters", "PhantomFetterGroups"])
+    index.by_id("PhantomFetters")[1]
+    index.save()                                  # real runs only
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+from cdn_config import (
+    CDN_BASE,
+    DEFAULT_FETCH_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF_SECONDS,
+    write_bytes_atomic,
+    write_json_atomic,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CACHE_DIR = SCRIPTS_DIR / ".cache" / "LocalizationIndex"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Set by sync_all.py to the run's start time (epoch seconds).
+RUN_STARTED_ENV = "SYNC_ALL_STARTED"
+
+LOCALIZATION_INDEX_URL = f"{CDN_BASE}/d/GameData/Grouped/LocalizationIndex"
+INDEX_FILES = {
+    "PhantomFetters": f"{LOCALIZATION_INDEX_URL}/PhantomFetters.json",
+    "PhantomFetterGroups": f"{LOCALIZATION_INDEX_URL}/PhantomFetterGroups.json",
+    "PhantomFetter": f"{CDN_BASE}/d/GameData/ConfigDBParsed/PhantomFetter.json",
+    "PropertyIndexs": f"{LOCALIZATION_INDEX_URL}/PropertyIndexs.json",
+}
+FETTER_FILES = ("PhantomFetters", "PhantomFetterGroups", "PhantomFetter")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _run_started() -> float | None:
+    value = os.environ.get(RUN_STARTED_ENV)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _conditional_get(session: Any, url: str, validators: dict | None) -> tuple[bytes | None, dict]:
+    """(body, validators) with the same bounded retries as
+    request_json_with_retry; (None, validators) when the CDN answered 304."""
+    headers = {}
+    if validators and validators.get("url") == url:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("lastModified"):
+            headers["If-Modified-Since"] = validators["lastModified"]
+    last_error: Exception | None = None
+    for attempt in range(DEFAULT_FETCH_ATTEMPTS):
+        try:
+            response = session.get(url, timeout=30, headers=headers)
+            if response.status_code == 304:
+                return None, dict(validators or {})
+            response.raise_for_status()
+            body = response.content
+            json.loads(body)  # A truncated or HTML body is retried like a failed request.
+            return body, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "lastModified": response.headers.get("Last-Modified"),
+            }
+        except Exception as error:  # Network/HTTP/JSON failures are all retryable here.
+            last_error = error
+            if attempt + 1 < DEFAULT_FETCH_ATTEMPTS:
+                time.sleep(DEFAULT_RETRY_BACKOFF_SECONDS * (attempt + 1))
+    raise RuntimeError(
+        f"Failed to fetch JSON after {DEFAULT_FETCH_ATTEMPTS} attempts: {url}"
+    ) from last_error
+
+
+class LocalizationIndex:
+    """The LocalizationIndex files of one cache directory, fetched at most once
+    per process and revalidated against the CDN at most once per sync_all run."""
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        session: Any = None,
+        refresh: bool = False,
+        fresh_after: float | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self._session = session
+        self.refresh = refresh
+        self.fresh_after = fresh_after
+        self.entries: dict[str, dict] = {}
+        manifest = cache_dir / MANIFEST_FILENAME
+        if manifest.exists() and not refresh:
+            payload = json.loads(manifest.read_text(encoding="utf-8"))
+            if isinstance(payload, dict) and payload.get("version") == MANIFEST_VERSION:
+                self.entries = payload.get("files") or {}
+        self._rows: dict[str, list] = {}
+        self._by_id: dict[str, dict[int, dict]] = {}
+        self._lock = threading.Lock()
+        # name -> "fetched" / "unchanged" / "cached", for the summary line.
+        self.outcomes: dict[str, str] = {}
+        # Bodies fetched this run, written to the cache by save().
+        self._fetched: dict[str, bytes] = {}
+        self.dirty = False
+
+    @property
+    def session(self) -> Any:
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _body_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.json"
+
+    def _cached_body(self, name: str, entry: dict | None) -> bytes | None:
+        """The body of *name* when it still matches its manifest entry."""
+        if not isinstance(entry, dict):
+            return None
+        body = self._fetched.get(name)
+        if body is None:
+            path = self._body_path(name)
+            if not path.exists():
+                return None
+            body = path.read_bytes()
+        return body if _sha256(body) == entry.get("sha256") else None
+
+    def _load(self, name: str) -> bytes:
+        url = INDEX_FILES[name]
+        entry = self.entries.get(name)
+        body = self._cached_body(name, entry)
+        if (
+            body is not None
+            and self.fresh_after is not None
+            and entry.get("url") == url
+            and float(entry.get("checked") or 0) >= self.fresh_after
+        ):
+            self.outcomes[name] = "cached"
+            return body
+        fetched, validators = _conditional_get(self.session, url, entry if body is not None else None)
+        if fetched is None:
+            self.outcomes[name] = "unchanged"
+        else:
+            body = fetched
+            self.outcomes[name] = "fetched"
+        with self._lock:
+            if fetched is not None:
+                self._fetched[name] = body
+            self.entries[name] = {**validators, "sha256": _sha256(body), "bytes": len(body), "checked": time.time()}
+            self.dirty = True
+        return body
+
+    def prefetch(self, names: Iterable[str], workers: int | None = None) -> None:
+        """Load every file in *names* not loaded yet, concurrently."""
+        pending = [name for name in dict.fromkeys(names) if name not in self._rows]
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=workers or len(pending)) as pool:
+            bodies = dict(zip(pending, pool.map(self._load, pending)))
+        for name in pending:
+            rows = json.loads(bodies[name])
+            if not isinstance(rows, list):
+                raise ValueError(f"Unexpected {name} payload; expected a list")
+            self._rows[name] = rows
+        print(
+            "LocalizationIndex: "
+            + ", ".join(f"{name}.json {self.outcomes[name]}" for name in pending)
+        )
+
+    def save(self) -> None:
+        """Write the bodies fetched since the last save, then the manifest."""
+        if not self.dirty:
+            return
+        for name, body in self._fetched.items():
+            write_bytes_atomic(self._body_path(name), body)
+        self._fetched.clear()
+        write_json_atomic(
+            self.cache_dir / MANIFEST_FILENAME,
+            {"version": MANIFEST_VERSION, "files": self.entries},
+            sort_keys=True,
+            indent=1,
+        )
+        self.dirty = False
+
+    def rows(self, name: str) -> list:
+        """The parsed list of *name* (loaded on first use)."""
+        if name not in self._rows:
+            self.prefetch([name])
+        return self._rows[name]
+
+    def by_id(self, name: str) -> dict[int, dict]:
+        """The rows of *name* keyed by their int Id (rows without one are skipped)."""
+        index = self._by_id.get(name)
+        if index is None:
+            index = {}
+            for row in self.rows(name):
+                try:
+                    index[int(row["Id"])] = row
+                except (TypeError, KeyError, ValueError):
+                    continue
+            self._by_id[name] = index
+        return index
+
+
+@lru_cache(maxsize=None)
+def load_localization_index(cache_dir: Path = CACHE_DIR) -> LocalizationIndex:
+    """The process-wide index; inside a sync_all run, entries checked during
+    the run are not revalidated."""
+    return LocalizationIndex(cache_dir, fresh_after=_run_started())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fetch or revalidate the cached Wuthery LocalizationIndex files")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached validators and fetch every file")
+    args = parser.parse_args()
+    index = LocalizationIndex(refresh=args.refresh)
+    index.prefetch(INDEX_FILES)
+    index.save()
+    for name in INDEX_FILES:
+        print(f"  {name}: {len(index.rows(name))} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,32 +1,71 @@
 """
 Maintenance helper: copy supported R2 images to JPEG q90 keys.
 
+Objects are listed page by page and fed to the workers as the pages arrive,
+so a run starts converting immediately and never holds the whole bucket
+listing. Each worker thread keeps one boto3 client, JPEG conversion runs in a
+process pool (PIL encoding in threads is GIL-bound), and uploads go through
+boto3's managed transfer (multipart above MULTIPART_THRESHOLD).
+
+Every finished key is appended to a progress journal in the backup directory,
+so an interrupted run resumes where it stopped: keys already in the journal
+are skipped without another GET. Preview and --apply keep separate journals;
+--restart ignores (and truncates) the current one.
+
+Storage is pluggable: R2 via boto3 (default), or --local-bucket DIR, a plain
+directory standing in for the bucket (keys are paths below it, optional
+--latency-ms per request), so the resumable/streaming behavior can be checked
+without touching production. --benchmark N builds a synthetic local bucket of
+N PNG/JPEG/WebP cards and reports objects/s, MB/s and conversion CPU time for
+each --bench-workers count, which is how WORKERS should be sized.
+
 Usage:
   python scripts/migrate_r2_png_to_jpg.py             # Safe preview: local download/conversion only
   python scripts/migrate_r2_png_to_jpg.py --apply     # Upload JPEG copies; originals are preserved
+  python scripts/migrate_r2_png_to_jpg.py --apply --restart   # Ignore the journal and start over
+  python scripts/migrate_r2_png_to_jpg.py --apply --local-bucket ../r2-sample --latency-ms 40
+  python scripts/migrate_r2_png_to_jpg.py --benchmark 400 --bench-workers 8,16,40 --latency-ms 40
 
 Requires:
-  pip install boto3 python-dotenv Pillow
+  pip install boto3 python-dotenv Pillow   (boto3/python-dotenv only for R2)
 """
 
 from __future__ import annotations
 
 import argparse
 import io
+import json
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
 
-import boto3
-from dotenv import load_dotenv
 from PIL import Image
 
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+except ImportError:
+    boto3 = None
+    TransferConfig = None
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
 SCRIPTS_DIR = Path(__file__).resolve().parent
 FRONTEND_DIR = SCRIPTS_DIR.parent        # wuwabuilds/
 REPO_ROOT = FRONTEND_DIR.parent          # Wuwabuilds/ (sibling of wuwabuilds, backend, lb)
 LOCAL_DIR = REPO_ROOT / "r2-backup"
 
-load_dotenv(FRONTEND_DIR / ".env")
+if load_dotenv is not None:
+    load_dotenv(FRONTEND_DIR / ".env")
 
 BUCKET = os.environ.get("R2_BUCKET_NAME")
 ACCOUNT_ID = os.environ.get("CLOUDFLARE_ACCOUNT_ID")
@@ -34,13 +73,22 @@ ACCESS_KEY = os.environ.get("R2_ACCESS_KEY_ID")
 SECRET_KEY = os.environ.get("R2_SECRET_ACCESS_KEY")
 
 WORKERS = 40
+CONVERT_WORKERS = os.cpu_count() or 1
 JPEG_QUALITY = 90
 SUPPORTED_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+JOURNAL_FSYNC_EVERY = 100
+LIST_PAGE_SIZE = 1000  # list_objects_v2's page size, mirrored by LocalStorage
 
+# Synthetic benchmark cards: roughly the size of an uploaded build card.
+BENCH_CARD_SIZE = (1280, 720)
+BENCH_DISTINCT_CARDS = 12
+BENCH_FORMATS = (("png", "PNG"), ("jpg", "JPEG"), ("webp", "WEBP"))
 
-def local_path_for_key(key: str) -> Path:
-    """Resolve an object key below LOCAL_DIR, rejecting path traversal."""
-    root = LOCAL_DIR.resolve()
+
+def local_path_for_key(key: str, root: Path = LOCAL_DIR) -> Path:
+    """Resolve an object key below *root*, rejecting path traversal."""
+    root = root.resolve()
     candidate = (root / key).resolve()
     if not candidate.is_relative_to(root):
         raise ValueError(f"Unsafe object key escapes the backup directory: {key!r}")
@@ -56,6 +104,8 @@ def jpeg_key_for(key: str) -> str:
 
 
 def get_s3_client():
+    if boto3 is None:
+        raise RuntimeError("boto3 is required for R2 storage (pip install boto3), or use --local-bucket")
     missing = [
         name
         for name, value in (
@@ -88,192 +138,484 @@ def to_jpeg(data: bytes) -> bytes:
     return buf.getvalue()
 
 
-def list_all_keys(s3) -> list[str]:
-    keys: list[str] = []
-    continuation_token = None
-    while True:
-        kwargs: dict = {"Bucket": BUCKET}
-        if continuation_token:
-            kwargs["ContinuationToken"] = continuation_token
-        resp = s3.list_objects_v2(**kwargs)
-        for obj in resp.get("Contents", []):
-            keys.append(obj["Key"])
-        continuation_token = resp.get("NextContinuationToken")
-        if not continuation_token:
-            break
-    return keys
-
-
-def download_object(key: str) -> dict:
-    """Download-only mode: save raw bytes as-is, always overwrite."""
-    local_path = local_path_for_key(key)
-    local_path.parent.mkdir(parents=True, exist_ok=True)
+def convert_timed(data: bytes) -> tuple[bytes, float]:
+    """to_jpeg in a pool process, plus the CPU seconds it took there."""
+    start = time.process_time()
+    jpeg_data = to_jpeg(data)
+    return jpeg_data, time.process_time() - start
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+#
+# Both expose the five operations the migration needs. Methods are called from
+# the worker threads concurrently.
+
+class R2Storage:
+    """The R2 bucket via boto3, one client per worker thread."""
+
+    label = "R2"
+
+    def __init__(self) -> None:
+        get_s3_client()  # Fail fast on missing boto3/credentials.
+        self._thread_state = threading.local()
+        self._transfer = TransferConfig(multipart_threshold=MULTIPART_THRESHOLD, use_threads=False)
+
+    def _client(self):
+        """Built on first use in each thread and reused for every object that
+        thread handles (a client per object was most of the per-object cost)."""
+        client = getattr(self._thread_state, "s3", None)
+        if client is None:
+            client = self._thread_state.s3 = get_s3_client()
+        return client
+
+    def iter_keys(self) -> Iterator[str]:
+        """Yield object keys one list_objects_v2 page at a time."""
+        s3 = self._client()
+        continuation_token = None
+        while True:
+            kwargs: dict = {"Bucket": BUCKET, "MaxKeys": LIST_PAGE_SIZE}
+            if continuation_token:
+                kwargs["ContinuationToken"] = continuation_token
+            resp = s3.list_objects_v2(**kwargs)
+            for obj in resp.get("Contents", []):
+                yield obj["Key"]
+            continuation_token = resp.get("NextContinuationToken")
+            if not continuation_token:
+                break
+
+    def exists(self, key: str) -> bool:
+        s3 = self._client()
+        try:
+            s3.head_object(Bucket=BUCKET, Key=key)
+        except s3.exceptions.ClientError as error:
+            if error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def get(self, key: str) -> bytes:
+        return self._client().get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        # Managed transfer: multipart above MULTIPART_THRESHOLD, single PUT below.
+        self._client().upload_fileobj(
+            io.BytesIO(data),
+            BUCKET,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self._transfer,
+        )
 
-    s3 = get_s3_client()
-    data = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
-    local_path.write_bytes(data)
+    def download(self, key: str, handle: BinaryIO) -> None:
+        self._client().download_fileobj(BUCKET, key, handle, Config=self._transfer)
 
-    return {"key": key, "kb": len(data) / 1024}
 
+class LocalStorage:
+    """A directory standing in for the bucket (keys are POSIX paths below it).
 
-def process_object(key: str, dry_run: bool) -> dict:
-    if not is_supported_image_key(key):
-        return {
-            "key": key,
-            "new_key": key,
-            "status": "unsupported",
-            "original_kb": 0.0,
-            "final_kb": 0.0,
-        }
+    *latency* seconds are slept per request so worker counts can be sized
+    against a realistic round trip instead of local-disk speed."""
+
+    def __init__(self, root: Path, latency: float = 0.0) -> None:
+        if not root.is_dir():
+            raise RuntimeError(f"Local bucket directory not found: {root}")
+        self.root = root
+        self.latency = latency
+        self.label = f"local:{root}"
+
+    def _request(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def iter_keys(self) -> Iterator[str]:
+        keys = sorted(
+            path.relative_to(self.root).as_posix()
+            for path in self.root.rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        )
+        for start in range(0, len(keys), LIST_PAGE_SIZE):
+            self._request()
+            yield from keys[start:start + LIST_PAGE_SIZE]
+
+    def exists(self, key: str) -> bool:
+        self._request()
+        return local_path_for_key(key, self.root).is_file()
+
+    def get(self, key: str) -> bytes:
+        self._request()
+        return local_path_for_key(key, self.root).read_bytes()
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self._request()
+        path = local_path_for_key(key, self.root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{threading.get_ident()}.part")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    def download(self, key: str, handle: BinaryIO) -> None:
+        self._request()
+        with local_path_for_key(key, self.root).open("rb") as source:
+            shutil.copyfileobj(source, handle)
+
+
+# ---------------------------------------------------------------------------
+# Streaming worker pool + progress journal
+# ---------------------------------------------------------------------------
+
+def stream_map(
+    items: Iterable[str],
+    fn: Callable[[str], dict],
+    handle: Callable[[str, dict | None, BaseException | None], None],
+    workers: int,
+) -> None:
+    """Run fn over items as they are produced, at most 2x workers in flight.
+
+    handle(item, result, error) is called under a lock, in completion order.
+    Nothing beyond the in-flight window is buffered, so a paged listing is
+    consumed only as fast as the workers drain it."""
+    slots = threading.BoundedSemaphore(2 * workers)
+    lock = threading.Lock()
+
+    def done(item: str, future: Future) -> None:
+        try:
+            error = future.exception()
+            with lock:
+                handle(item, None if error else future.result(), error)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            slots.acquire()
+            pool.submit(fn, item).add_done_callback(lambda f, item=item: done(item, f))
+
+
+class ProgressJournal:
+    """Append-only JSONL of finished keys, so a re-run skips them.
+
+    One line per key is flushed as it completes (a killed process loses at
+    most the line being written, which is dropped on load) and fsynced every
+    JOURNAL_FSYNC_EVERY lines."""
+
+    def __init__(self, path: Path, restart: bool = False) -> None:
+        self.path = path
+        self.done: set[str] = set()
+        if path.exists() and not restart:
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    self.done.add(json.loads(line)["key"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn last line from an interrupted write.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = path.open("w" if restart else "a", encoding="utf-8")
+        self._unsynced = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def record(self, result: dict) -> None:
+        self._handle.write(json.dumps(result, separators=(",", ":")) + "\n")
+        self._handle.flush()
+        self.done.add(result["key"])
+        self._unsynced += 1
+        if self._unsynced >= JOURNAL_FSYNC_EVERY:
+            os.fsync(self._handle.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+
+
+def journal_path(local_dir: Path, dry_run: bool) -> Path:
+    return local_dir / (".migrate-journal.preview.jsonl" if dry_run else ".migrate-journal.jsonl")
+
+
+# ---------------------------------------------------------------------------
+# Per-object work
+# ---------------------------------------------------------------------------
+
+def download_object(key: str, storage, local_dir: Path = LOCAL_DIR) -> dict:
+    """Download-only mode: stream the object to disk as-is, always overwrite."""
+    local_path = local_path_for_key(key, local_dir)
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = local_path.with_name(f".{local_path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    try:
+        with temp_path.open("wb") as handle:
+            storage.download(key, handle)
+        os.replace(temp_path, local_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+    return {"key": key, "kb": local_path.stat().st_size / 1024}
+
+
+def process_object(
+    key: str,
+    dry_run: bool,
+    convert_pool: ProcessPoolExecutor,
+    storage,
+    local_dir: Path = LOCAL_DIR,
+) -> dict:
     new_key = jpeg_key_for(key)
-    local_path = local_path_for_key(new_key)
+    local_path = local_path_for_key(new_key, local_dir)
+    result = {
+        "key": key,
+        "new_key": new_key,
+        "status": "",
+        "original_kb": 0.0,
+        "final_kb": 0.0,
+        "convert_cpu_s": 0.0,
+    }
 
     # Skip entirely if already processed locally
     if key.endswith(".jpg") and local_path.exists():
         size_kb = local_path.stat().st_size / 1024
-        return {
-            "key": key,
-            "new_key": new_key,
-            "status": "skipped",
-            "original_kb": size_kb,
-            "final_kb": size_kb,
-        }
-
-    # Each thread gets its own client (not thread-safe)
-    s3 = get_s3_client()
+        return {**result, "status": "skipped", "original_kb": size_kb, "final_kb": size_kb}
 
-    data = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
-    original_kb = len(data) / 1024
+    # An existing .jpg target is never overwritten. Checked per object because
+    # the listing is streamed (there is no up-front key set to look it up in).
+    if new_key != key and storage.exists(new_key):
+        return {**result, "status": "conflict"}
 
+    data = storage.get(key)
     already_jpeg = is_jpeg(data)
-    jpeg_data = data if already_jpeg else to_jpeg(data)
-    final_kb = len(jpeg_data) / 1024
+    if already_jpeg:
+        jpeg_data, cpu_s = data, 0.0
+    else:
+        # The thread waits on the process pool without holding the GIL, so the
+        # other workers keep downloading/uploading while cores encode.
+        jpeg_data, cpu_s = convert_pool.submit(convert_timed, data).result()
+    result.update(original_kb=len(data) / 1024, final_kb=len(jpeg_data) / 1024, convert_cpu_s=round(cpu_s, 4))
 
     # Save locally
+    local_path.parent.mkdir(parents=True, exist_ok=True)
     local_path.write_bytes(jpeg_data)
 
     if key.endswith(".jpg") and already_jpeg:
-        return {
-            "key": key,
-            "new_key": new_key,
-            "status": "already_jpg",
-            "original_kb": original_kb,
-            "final_kb": final_kb,
-        }
+        return {**result, "status": "already_jpg"}
 
     if not dry_run:
-        s3.put_object(
-            Bucket=BUCKET,
-            Key=new_key,
-            Body=jpeg_data,
-            ContentType="image/jpeg",
-        )
+        storage.put(new_key, jpeg_data, "image/jpeg")
         # Preserve the original. Deleting/rewriting keys requires a coordinated
         # reference migration for reports and database rows and is intentionally
         # outside this maintenance helper.
 
-    return {
-        "key": key,
-        "new_key": new_key,
-        "status": "migrated",
-        "original_kb": original_kb,
-        "final_kb": final_kb,
+    return {**result, "status": "migrated"}
+
+
+# ---------------------------------------------------------------------------
+# Modes
+# ---------------------------------------------------------------------------
+
+def download_all(storage, workers: int = WORKERS, local_dir: Path = LOCAL_DIR):
+    """Download every object as-is to *local_dir*, always overwriting."""
+    local_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Saving all files from {storage.label} to: {local_dir}")
+    print(f"Workers: {workers}\n=== DOWNLOAD ONLY ===\n")
+
+    totals = {"count": 0, "kb": 0.0, "failed": 0}
+
+    def handle(key: str, result: dict | None, error: BaseException | None) -> None:
+        totals["count"] += 1
+        if error is not None:
+            totals["failed"] += 1
+            print(f"  [{totals['count']}] FAIL {key} ({error})")
+            return
+        totals["kb"] += result["kb"]
+        print(f"  [{totals['count']}] {result['key']} ({result['kb']:.0f} KB)")
+
+    stream_map(storage.iter_keys(), lambda key: download_object(key, storage, local_dir), handle, workers)
+    print(f"\nDone! {totals['count']} files, {totals['kb'] / 1024:.1f} MB → {local_dir} ({totals['failed']} failed)")
+    return 1 if totals["failed"] else 0
+
+
+def run_migration(
+    storage,
+    dry_run: bool,
+    restart: bool = False,
+    workers: int = WORKERS,
+    convert_workers: int = CONVERT_WORKERS,
+    local_dir: Path = LOCAL_DIR,
+    verbose: bool = True,
+) -> dict:
+    """Migrate every listed image once; returns counters for the summary."""
+    local_dir.mkdir(parents=True, exist_ok=True)
+    journal = ProgressJournal(journal_path(local_dir, dry_run), restart=restart)
+    if journal.done and verbose:
+        print(f"Resuming: {len(journal.done)} keys already finished in {journal.path.name}\n")
+
+    stats = {
+        "listed": 0, "excluded": 0, "resumed": 0,
+        "migrated": 0, "already_jpg": 0, "skipped": 0, "conflict": 0, "failed": 0,
+        "original_mb": 0.0, "final_mb": 0.0, "convert_cpu_s": 0.0,
+        "journal": journal.path,
     }
 
-
-def download_all():
-    """Download every R2 object as-is to LOCAL_DIR, always overwriting."""
-    LOCAL_DIR.mkdir(parents=True, exist_ok=True)
-    print(f"Saving all files to: {LOCAL_DIR}")
-    print(f"Workers: {WORKERS}\n=== DOWNLOAD ONLY ===\n")
-
-    s3 = get_s3_client()
-    keys = list_all_keys(s3)
-    print(f"Found {len(keys)} objects in '{BUCKET}'\n")
-
-    total_kb = 0.0
-    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-        futures = {pool.submit(download_object, key): key for key in keys}
-        for i, future in enumerate(as_completed(futures), 1):
-            result = future.result()
-            total_kb += result["kb"]
-            print(f"  [{i}/{len(keys)}] {result['key']} ({result['kb']:.0f} KB)")
-
-    print(f"\nDone! {len(keys)} files, {total_kb / 1024:.1f} MB → {LOCAL_DIR}")
-
-
-def migrate(dry_run: bool):
-    LOCAL_DIR.mkdir(parents=True, exist_ok=True)
-    print(f"Saving all files to: {LOCAL_DIR}")
-    print(f"Workers: {WORKERS}")
+    def candidates() -> Iterator[str]:
+        for key in storage.iter_keys():
+            stats["listed"] += 1
+            if not is_supported_image_key(key):
+                stats["excluded"] += 1
+            elif key in journal:
+                stats["resumed"] += 1
+            else:
+                yield key
+
+    def handle(key: str, result: dict | None, error: BaseException | None) -> None:
+        i = sum(stats[s] for s in ("migrated", "already_jpg", "skipped", "conflict", "failed")) + 1
+        if error is not None:
+            # Not journaled, so the next run retries it.
+            stats["failed"] += 1
+            print(f"  [{i}] FAIL {key} ({error})")
+            return
+        status = result["status"]
+        stats[status] += 1
+        stats["original_mb"] += result["original_kb"] / 1024
+        stats["final_mb"] += result["final_kb"] / 1024
+        stats["convert_cpu_s"] += result["convert_cpu_s"]
+        journal.record(result)
+        if not verbose:
+            return
+        if status == "skipped":
+            print(f"  [{i}] SKIP {result['key']} (cached locally)")
+        elif status == "conflict":
+            print(f"  [{i}] KEEP {result['key']} (existing {result['new_key']} preserved)")
+        elif status == "already_jpg":
+            print(f"  [{i}] OK   {result['key']} ({result['original_kb']:.0f} KB, already jpeg bytes)")
+        else:
+            print(
+                f"  [{i}] CONV {result['key']} -> {result['new_key']} "
+                f"({result['original_kb']:.0f} KB -> {result['final_kb']:.0f} KB)"
+            )
+
+    with ProcessPoolExecutor(max_workers=convert_workers) as convert_pool:
+        try:
+            stream_map(
+                candidates(),
+                lambda key: process_object(key, dry_run, convert_pool, storage, local_dir),
+                handle,
+                workers,
+            )
+        finally:
+            journal.close()
+    return stats
+
+
+def migrate(
+    storage,
+    dry_run: bool,
+    restart: bool = False,
+    workers: int = WORKERS,
+    convert_workers: int = CONVERT_WORKERS,
+    local_dir: Path = LOCAL_DIR,
+):
+    print(f"Saving all files from {storage.label} to: {local_dir}")
+    print(f"Workers: {workers} transfer threads, {convert_workers} conversion processes")
     print("=== DRY RUN ===\n" if dry_run else "=== LIVE RUN ===\n")
 
-    s3 = get_s3_client()
-    all_keys = list_all_keys(s3)
-    supported_keys = [key for key in all_keys if is_supported_image_key(key)]
-    key_set = set(all_keys)
-    conflicts = [
-        key
-        for key in supported_keys
-        if jpeg_key_for(key) != key and jpeg_key_for(key) in key_set
-    ]
-    keys = [key for key in supported_keys if key not in set(conflicts)]
-    print(
-        f"Found {len(keys)} supported images in '{BUCKET}' "
-        f"({len(all_keys) - len(supported_keys)} non-image objects excluded, "
-        f"{len(conflicts)} target-key conflicts skipped)\n"
-    )
-    if conflicts:
-        print("Conflicting source keys (existing .jpg target preserved):")
-        for key in conflicts:
-            print(f"  {key} -> {jpeg_key_for(key)}")
-
-    migrated = 0
-    already_jpg = 0
-    skipped = 0
-    total_original_mb = 0.0
-    total_final_mb = 0.0
-
-    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-        futures = {
-            pool.submit(process_object, key, dry_run): key for key in keys
-        }
-
-        for i, future in enumerate(as_completed(futures), 1):
-            result = future.result()
-            total_original_mb += result["original_kb"] / 1024
-            total_final_mb += result["final_kb"] / 1024
-
-            if result["status"] == "skipped":
-                skipped += 1
-                print(
-                    f"  [{i}/{len(keys)}] SKIP {result['key']} (cached locally)"
-                )
-            elif result["status"] == "already_jpg":
-                already_jpg += 1
-                print(
-                    f"  [{i}/{len(keys)}] OK   {result['key']} "
-                    f"({result['original_kb']:.0f} KB, already jpeg bytes)"
-                )
-            else:
-                migrated += 1
-                print(
-                    f"  [{i}/{len(keys)}] CONV {result['key']} -> {result['new_key']} "
-                    f"({result['original_kb']:.0f} KB -> {result['final_kb']:.0f} KB)"
-                )
+    stats = run_migration(storage, dry_run, restart, workers, convert_workers, local_dir)
 
     print(f"""
 Done!
-  Total objects:    {len(keys)}
-  Migrated:         {migrated}
-  Already .jpg:     {already_jpg}
-  Skipped (cached): {skipped}
-  Size before:      {total_original_mb:.1f} MB
-  Size after:       {total_final_mb:.1f} MB
-  Saved:            {total_original_mb - total_final_mb:.1f} MB
-  Local backup:     {LOCAL_DIR}
+  Objects listed:   {stats['listed']} ({stats['excluded']} non-image objects excluded)
+  Resumed:          {stats['resumed']} (finished in an earlier run)
+  Migrated:         {stats['migrated']}
+  Already .jpg:     {stats['already_jpg']}
+  Skipped (cached): {stats['skipped']}
+  Target conflicts: {stats['conflict']} (existing .jpg preserved)
+  Failed:           {stats['failed']} (retried on the next run)
+  Size before:      {stats['original_mb']:.1f} MB
+  Size after:       {stats['final_mb']:.1f} MB
+  Saved:            {stats['original_mb'] - stats['final_mb']:.1f} MB
+  Conversion CPU:   {stats['convert_cpu_s']:.1f} s
+  Local backup:     {local_dir}
+  Journal:          {stats['journal']}
   {"(dry run, R2 was not modified)" if dry_run else ""}
 """)
+    return 1 if stats["failed"] else 0
+
+
+# ---------------------------------------------------------------------------
+# Benchmark (--benchmark)
+# ---------------------------------------------------------------------------
+
+def _synthetic_card(rng: random.Random) -> Image.Image:
+    """Gradient + noise + flat panels: compresses roughly like a build card
+    screenshot, unlike pure noise (incompressible) or flat color (trivial)."""
+    width, height = BENCH_CARD_SIZE
+    noise = Image.effect_noise((width, height), rng.uniform(20, 60))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (noise, gradient, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    for _ in range(6):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        img.paste(color, (x, y, min(width, x + rng.randrange(80, 400)), min(height, y + rng.randrange(40, 200))))
+    return img
+
+
+def generate_synthetic_bucket(root: Path, count: int, seed: int = 0) -> int:
+    """Write *count* cards cycling PNG/JPEG/WebP below *root*; returns bytes written."""
+    rng = random.Random(seed)
+    # Encoding is the slow part of generation; a handful of distinct cards per
+    # format, reused under different keys, is enough for throughput numbers.
+    encoded: dict[str, list[bytes]] = {suffix: [] for suffix, _ in BENCH_FORMATS}
+    for _ in range(min(count, BENCH_DISTINCT_CARDS)):
+        card = _synthetic_card(rng)
+        for suffix, fmt in BENCH_FORMATS:
+            buf = io.BytesIO()
+            card.save(buf, fmt, **({"quality": 95} if fmt != "PNG" else {}))
+            encoded[suffix].append(buf.getvalue())
+    total = 0
+    for i in range(count):
+        suffix = BENCH_FORMATS[i % len(BENCH_FORMATS)][0]
+        data = encoded[suffix][(i // len(BENCH_FORMATS)) % len(encoded[suffix])]
+        path = root / "cards" / f"{i // 1000:03d}" / f"card-{i:06d}.{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        total += len(data)
+    return total
+
+
+def benchmark(count: int, worker_counts: list[int], convert_workers: int, latency: float) -> int:
+    print(
+        f"Benchmark: {count} synthetic cards {BENCH_CARD_SIZE[0]}x{BENCH_CARD_SIZE[1]} (PNG/JPEG/WebP), "
+        f"{convert_workers} conversion processes, {latency * 1000:.0f} ms simulated request latency\n"
+    )
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="r2-bench-") as tmp:
+        source = Path(tmp) / "bucket"
+        source_mb = generate_synthetic_bucket(source, count) / 1e6
+        print(f"Generated {source_mb:.1f} MB\n")
+        for workers in worker_counts:
+            # Fresh bucket + backup per run: the previous run's .jpg targets
+            # would otherwise turn every object into a conflict.
+            bucket = Path(tmp) / f"bucket-{workers}"
+            shutil.copytree(source, bucket)
+            storage = LocalStorage(bucket, latency)
+            start = time.perf_counter()
+            stats = run_migration(
+                storage,
+                dry_run=False,
+                restart=True,
+                workers=workers,
+                convert_workers=convert_workers,
+                local_dir=Path(tmp) / f"backup-{workers}",
+                verbose=False,
+            )
+            elapsed = time.perf_counter() - start
+            done = stats["listed"] - stats["excluded"] - stats["failed"]
+            rows.append((workers, done, stats["failed"], elapsed, done / elapsed, stats["original_mb"] * 1.048576 / elapsed, stats["convert_cpu_s"]))
+            shutil.rmtree(bucket)
+
+    print(f"{'workers':>8} {'objects':>8} {'failed':>7} {'wall s':>8} {'obj/s':>8} {'MB/s':>8} {'conv CPU s':>11}")
+    for workers, done, failed, elapsed, rate, mb_rate, cpu_s in rows:
+        print(f"{workers:>8} {done:>8} {failed:>7} {elapsed:>8.2f} {rate:>8.1f} {mb_rate:>8.2f} {cpu_s:>11.2f}")
+    return 1 if any(row[2] for row in rows) else 0
 
 
 if __name__ == "__main__":
@@ -287,10 +629,36 @@ if __name__ == "__main__":
     parser.add_argument(
         "--download-only", action="store_true", help="Download raw files as-is, always overwrite"
     )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the progress journal and process every key again"
+    )
+    parser.add_argument(
+        "--local-bucket", type=Path, default=None, help="Use a local directory as the bucket instead of R2"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Simulated per-request latency for --local-bucket/--benchmark"
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Transfer threads (default {WORKERS})")
+    parser.add_argument(
+        "--convert-workers", type=int, default=CONVERT_WORKERS, help="JPEG conversion processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--benchmark", type=int, default=None, metavar="N", help="Benchmark against a synthetic local bucket of N cards"
+    )
+    parser.add_argument(
+        "--bench-workers", default="8,16,40", help="Comma-separated transfer thread counts to benchmark"
+    )
     args = parser.parse_args()
     if args.apply and args.dry_run:
         parser.error("--apply and --dry-run are mutually exclusive")
+    latency = args.latency_ms / 1000
+    if args.benchmark is not None:
+        try:
+            worker_counts = [int(v) for v in args.bench_workers.split(",") if v.strip()]
+        except ValueError:
+            parser.error("--bench-workers must be comma-separated integers")
+        raise SystemExit(benchmark(args.benchmark, worker_counts, args.convert_workers, latency))
+    storage = LocalStorage(args.local_bucket, latency) if args.local_bucket else R2Storage()
     if args.download_only:
-        download_all()
-    else:
-        migrate(dry_run=not args.apply)
+        raise SystemExit(download_all(storage, args.workers))
+    raise SystemExit(migrate(storage, not args.apply, args.restart, args.workers, args.convert_workers))
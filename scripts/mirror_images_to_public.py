@@ -17,16 +17,37 @@ Everything lands as .webp:
   - A Wuthery URL that keeps failing after retries falls back to Encore's
     mirror of the same path (GameData/UIResources <-> Game/Aki/UI/UIResources).
 
-No manifest needed: a file already present under public/assets/ *is*
-"already mirrored," so re-runs (including after a fresh sync pass
+By default there is no manifest: a file already present under public/assets/
+*is* "already mirrored," so re-runs (including after a fresh sync pass
 reintroduces upstream URLs) only download what's missing. The JSON rewrite
 only happens once EVERY reference resolves to a file on disk — a partial
 mirror (failed downloads, --limit) never rewrites.
 
+--manifest keeps scripts/.cache/mirror-manifest.json instead: per key, the
+upstream URL it came from, the upstream ETag/Last-Modified/length, and the
+sha256 + size of the stored WebP. "Already mirrored" is then answered from
+that one file rather than a stat() per reference, --refresh revalidates every
+entry with conditional requests (a 304 costs no body, a changed upstream is
+re-mirrored), and a new key whose bytes match an existing entry is hard-linked
+to it instead of written again. Keys already on disk but not yet in the
+manifest are adopted (hashed locally, no network) on the first run.
+
+scripts/.cache/mirror-ref-index.json (git-ignored, never deployed) records,
+per data file, its sha256 and the JSON-pointer location of every image ref.
+An unchanged file is not parsed again, and the rewrite patches only the refs
+that change, skipping files that hold no upstream refs.
+
+A rewritten file that has a per-language split under public/Data/i18n/
+(l10n_split.py) gets its split re-derived, so the split keeps matching it.
+
 Usage:
   py mirror_images_to_public.py             # Preview: counts + pending list, no network
   py mirror_images_to_public.py --apply     # Download missing + rewrite JSON when complete
   py mirror_images_to_public.py --apply --limit 20   # Partial fetch (rewrite deferred until complete)
+  py mirror_images_to_public.py --apply --manifest   # Track mirrored keys in the manifest
+  py mirror_images_to_public.py --apply --refresh    # Manifest + re-fetch entries whose upstream changed
+  py mirror_images_to_public.py --apply --variants   # Also write width variants + ImageVariants.json, check budgets
+  py mirror_images_to_public.py --apply --encoder-preset balanced   # Faster PNG -> WebP encode (see webp_encoding.py)
 
 Requires:
   pip install requests Pillow
@@ -35,12 +56,16 @@ Requires:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import io
 import json
+import os
+import queue
 import re
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -50,18 +75,36 @@ from PIL import Image
 SCRIPTS_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPTS_DIR))
 
-from cdn_config import CDN_BASE, write_bytes_atomic, write_json_atomic  # noqa: E402
+from cdn_config import CDN_BASE, BatchWriter, link_atomic, write_bytes_atomic, write_json_atomic  # noqa: E402
+from data_shards import COMBINED_FILENAME, SHARD_DIRNAME, load_index  # noqa: E402
+from l10n_split import has_split, save_split  # noqa: E402
+from webp_encoding import DEFAULT_PRESET, encode_webp, preset_argument  # noqa: E402
 
 FRONTEND_DIR = SCRIPTS_DIR.parent
 DATA_DIR = FRONTEND_DIR / "public" / "Data"
 ASSETS_DIR = FRONTEND_DIR / "public" / "assets"
 PUBLIC_PATH_PREFIX = "/assets"
+# Mirror bookkeeping stays out of public/, which is deployed as-is.
+CACHE_DIR = SCRIPTS_DIR / ".cache"
+MANIFEST_PATH = CACHE_DIR / "mirror-manifest.json"
+MANIFEST_VERSION = 1
 
 ENCORE_RESOURCE_BASE = "https://api.encore.moe/resource/Data"
 WEBP_QUALITY = 90
 
 TARGET_FILES = ["Characters.json", "Weapons.json", "Echoes.json", "Fetters.json", "Stats.json"]
 
+
+def target_files() -> list[str]:
+    """TARGET_FILES as laid out on disk. With sharded characters (data_shards.py)
+    every shard is its own target, so a re-sync that rewrote one character costs
+    one shard's parse, and Characters.json is only a target when it exists too."""
+    rows = load_index(DATA_DIR)
+    if rows is None:
+        return list(TARGET_FILES)
+    names = [name for name in TARGET_FILES if name != COMBINED_FILENAME or (DATA_DIR / name).exists()]
+    return names + [f"{SHARD_DIRNAME}/{row['file']}" for row in rows]
+
 # UI-chrome images referenced directly from code rather than the data JSONs.
 # The code references (globals.css, components/forte/*, lib/paths.ts) point at
 # the /assets/... path these produce; keep both sides in sync when adding one.
@@ -97,28 +140,30 @@ def is_image_ref(value: str) -> bool:
     return bool(_ABSOLUTE_HOST_RE.match(value) or _RELATIVE_WUTHERY_RE.match(value))
 
 
-def collect_image_refs(obj: Any, found: set[str], found_local: set[str]) -> None:
+def iter_image_refs(obj: Any, pointer: str = ""):
+    """Yield (json_pointer, ref) for every upstream or /assets/ image ref in obj."""
     if isinstance(obj, str):
-        if is_image_ref(obj):
-            found.add(obj)
-        elif _LOCAL_ASSET_RE.match(obj):
-            found_local.add(obj)
+        if is_image_ref(obj) or _LOCAL_ASSET_RE.match(obj):
+            yield pointer, obj
     elif isinstance(obj, dict):
-        for value in obj.values():
-            collect_image_refs(value, found, found_local)
+        for key, value in obj.items():
+            yield from iter_image_refs(value, f"{pointer}/{str(key).replace('~', '~0').replace('/', '~1')}")
     elif isinstance(obj, list):
-        for value in obj:
-            collect_image_refs(value, found, found_local)
+        for index, value in enumerate(obj):
+            yield from iter_image_refs(value, f"{pointer}/{index}")
 
 
-def rewrite_image_refs(obj: Any, mapping: dict[str, str]) -> Any:
-    if isinstance(obj, str):
-        return mapping.get(obj, obj)
-    if isinstance(obj, dict):
-        return {k: rewrite_image_refs(v, mapping) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [rewrite_image_refs(v, mapping) for v in obj]
-    return obj
+def set_at_pointer(doc: Any, pointer: str, expected: str, value: str) -> None:
+    """Replace the string at an RFC 6901 pointer in place, checking it still
+    holds *expected* (a stale index must fail loudly, never patch blindly)."""
+    parent = doc
+    tokens = [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]]
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    last: int | str = int(tokens[-1]) if isinstance(parent, list) else tokens[-1]
+    if parent[last] != expected:
+        raise ValueError(f"Ref index out of date at {pointer}: {parent[last]!r} != {expected!r}")
+    parent[last] = value
 
 
 def resolve_absolute(url: str) -> str:
@@ -195,7 +240,13 @@ def _is_webp(data: bytes) -> bool:
     return data[:4] == b"RIFF" and data[8:12] == b"WEBP"
 
 
-def to_webp(data: bytes) -> bytes:
+def _looks_like_image(data: bytes) -> bool:
+    """Cheap signature check run on the fetch thread, so an HTML error body is
+    retried / sent to the Encore fallback without waiting for the encoder."""
+    return _is_webp(data) or data[:8] == b"\x89PNG\r\n\x1a\n" or data[:3] == b"\xff\xd8\xff"
+
+
+def to_webp(data: bytes, preset: str = DEFAULT_PRESET) -> bytes:
     """Pass WebP through untouched (no generational loss on Encore files);
     decode-and-encode anything else at quality 90. Doubles as integrity
     validation — a truncated download or an HTML error body never decodes."""
@@ -204,16 +255,39 @@ def to_webp(data: bytes) -> bytes:
     img = Image.open(io.BytesIO(data))
     if img.mode not in ("RGB", "RGBA"):
         img = img.convert("RGBA")
-    out = io.BytesIO()
-    img.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
-    return out.getvalue()
+    return encode_webp(img, WEBP_QUALITY, preset)
+
 
+def _upstream_meta(resp: requests.Response, url: str) -> dict:
+    length = resp.headers.get("Content-Length")
+    return {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "lastModified": resp.headers.get("Last-Modified"),
+        "length": int(length) if length and length.isdigit() else len(resp.content),
+    }
 
-def fetch_webp(session: requests.Session, absolute: str) -> bytes:
+
+def fetch_source(session: requests.Session, absolute: str, validators: dict | None = None) -> tuple[bytes | None, dict]:
+    """Return (source_bytes, upstream_meta). With *validators* (a manifest entry)
+    the request is conditional, and (None, meta) means the upstream is
+    unchanged (304). Validators only apply to the URL they were recorded for,
+    so an entry last served by the Encore fallback revalidates unconditionally
+    against Wuthery first."""
     def do_get(url: str):
-        resp = session.get(url, timeout=30)
+        headers = {}
+        if validators and validators.get("url") == url:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("lastModified"):
+                headers["If-Modified-Since"] = validators["lastModified"]
+        resp = session.get(url, timeout=30, headers=headers)
+        if resp.status_code == 304:
+            return None, {**validators, "url": url}
         resp.raise_for_status()
-        return to_webp(resp.content)
+        if not _looks_like_image(resp.content):
+            raise ValueError(f"Not an image response ({resp.headers.get('Content-Type')})")
+        return resp.content, _upstream_meta(resp, url)
 
     try:
         return _with_retry(lambda: do_get(absolute))
@@ -224,32 +298,459 @@ def fetch_webp(session: requests.Session, absolute: str) -> bytes:
         return _with_retry(lambda: do_get(fallback))
 
 
-def mirror_one(session: requests.Session, original_url: str, absolute: str, local_path: Path) -> dict:
-    data = fetch_webp(session, absolute)
-    write_bytes_atomic(local_path, data)
-    return {"url": original_url, "path": str(local_path), "bytes": len(data)}
+# --- Optional manifest (--manifest / --refresh) --------------------------------
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class MirrorManifest:
+    """key -> {url, etag, lastModified, length, sha256, bytes} for every
+    mirrored file, plus a sha256 -> key index used to dedupe identical
+    content across keys. Only main() mutates it (from worker results), so it
+    needs no locking; workers only read the hash index."""
+
+    def __init__(self, entries: dict[str, dict] | None = None) -> None:
+        self.entries: dict[str, dict] = dict(entries or {})
+        self._index_hashes()
+
+    def _index_hashes(self) -> None:
+        self._by_hash: dict[str, str] = {}
+        for key, entry in self.entries.items():
+            self._by_hash.setdefault(entry.get("sha256", ""), key)
+
+    def drop_missing(self) -> int:
+        """Forget entries whose file is gone from disk (deleted, `git clean`,
+        a failed link), so they are fetched again and never used as a twin."""
+        missing = [key for key in self.entries if not local_path_for_key(key).exists()]
+        for key in missing:
+            del self.entries[key]
+        if missing:
+            self._index_hashes()
+        return len(missing)
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH) -> "MirrorManifest":
+        if not path.exists():
+            return cls()
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict) or payload.get("version") != MANIFEST_VERSION:
+            # Unknown layout: start over; existing files are re-adopted from disk.
+            print(f"  Ignoring manifest with unexpected format: {path}")
+            return cls()
+        return cls(payload.get("entries") or {})
+
+    def save(self, path: Path = MANIFEST_PATH) -> None:
+        write_json_atomic(
+            path,
+            {"version": MANIFEST_VERSION, "entries": self.entries},
+            sort_keys=True,
+            indent=1,
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def key_for_hash(self, sha256: str) -> str | None:
+        return self._by_hash.get(sha256)
+
+    def record(self, key: str, meta: dict, sha256: str, size: int) -> None:
+        self.entries[key] = {**meta, "sha256": sha256, "bytes": size}
+        self._by_hash.setdefault(sha256, key)
+
+    def adopt(self, key: str, path: Path, upstream: str) -> None:
+        """Record a file mirrored before the manifest existed (no network:
+        upstream validators stay empty, so the first --refresh fetches it)."""
+        data = path.read_bytes()
+        self.record(key, {"url": upstream, "etag": None, "lastModified": None, "length": None}, _sha256(data), len(data))
+
+
+# --- Ref index -------------------------------------------------------------------
+#
+# Every run needs the set of image refs in the five data files, and the final
+# rewrite used to rebuild a full copy of each one (including the 14-language
+# Characters.json) and re-serialize it even when nothing changed. The index
+# stores, per file, the sha256 of its bytes and the JSON-pointer location of
+# every ref. A file whose bytes still match is not parsed at all; the rewrite
+# patches only the pointers whose ref maps to a new value, and a file with no
+# upstream refs left is not rewritten.
+
+REF_INDEX_PATH = CACHE_DIR / "mirror-ref-index.json"
+REF_INDEX_VERSION = 1
+
+
+class RefIndex:
+    """file name -> {sha256, refs: [[pointer, ref], ...]}."""
+
+    def __init__(self, files: dict[str, dict] | None = None) -> None:
+        self.files: dict[str, dict] = dict(files or {})
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path = REF_INDEX_PATH) -> "RefIndex":
+        if not path.exists():
+            return cls()
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict) or payload.get("version") != REF_INDEX_VERSION:
+            return cls()  # Unknown layout: every file is re-indexed from its JSON.
+        return cls(payload.get("files") or {})
+
+    def save(self, path: Path = REF_INDEX_PATH) -> None:
+        if self.dirty:
+            write_json_atomic(path, {"version": REF_INDEX_VERSION, "files": self.files}, separators=(",", ":"))
+            self.dirty = False
+
+    def refs_for(self, name: str, raw: bytes) -> list[tuple[str, str]] | None:
+        """The indexed refs of *name*, or None when its bytes changed since."""
+        entry = self.files.get(name)
+        if not isinstance(entry, dict) or entry.get("sha256") != _sha256(raw):
+            return None
+        return [(pointer, ref) for pointer, ref in entry.get("refs") or []]
+
+    def update(self, name: str, raw: bytes, refs: list[tuple[str, str]]) -> None:
+        self.files[name] = {"sha256": _sha256(raw), "refs": [list(pair) for pair in refs]}
+        self.dirty = True
+
+    def prune(self, names: list[str]) -> None:
+        """Forget files that are no longer targets (e.g. removed character shards)."""
+        stale = set(self.files) - set(names)
+        for name in stale:
+            del self.files[name]
+        self.dirty = self.dirty or bool(stale)
+
+
+def store_webp(
+    data: bytes,
+    meta: dict,
+    local_path: Path,
+    manifest: MirrorManifest | None = None,
+    validators: dict | None = None,
+    batch: BatchWriter | None = None,
+) -> dict:
+    """Writer stage: dedupe against the manifest, then write atomically
+    (staged in *batch* when given, durable once the batch commits)."""
+    sha = _sha256(data)
+    result = {"path": str(local_path), "bytes": len(data), "sha256": sha, "meta": meta, "status": "written"}
+    if validators and validators.get("sha256") == sha and local_path.exists():
+        # New validators, same bytes (e.g. an upstream re-upload): nothing to write.
+        result["status"] = "unchanged"
+        return result
+    twin_key = manifest.key_for_hash(sha) if manifest is not None else None
+    if twin_key is not None:
+        twin_path = local_path_for_key(twin_key)
+        # A twin staged in this batch still has its old bytes on disk.
+        if twin_path != local_path and twin_path.exists() and (batch is None or twin_path not in batch):
+            try:
+                link_atomic(twin_path, local_path)
+                result["status"] = "linked"
+                return result
+            except OSError:
+                pass  # No hard links on this filesystem; fall back to a copy.
+    if batch is not None:
+        batch.write_bytes(local_path, data)
+    else:
+        write_bytes_atomic(local_path, data)
+    return result
+
+
+# --- Responsive variants (--variants) --------------------------------------------
+#
+# Grids show splashes, heads and weapon/echo icons far below their native size,
+# so the browser downloads the full file and throws most of it away. With
+# --variants every mirrored file in a class below gets downscaled copies at
+# public/assets/variants/w<width>/<key> (never upscaled), and
+# public/Data/ImageVariants.json maps each /assets/ ref to its widths plus a
+# ready-made srcSet string. Variants are derived from the mirrored file, so
+# they are regenerated only when missing or older than it.
+#
+# Each class also has a page-weight budget: the sum over every asset in the
+# class of its smallest file, i.e. what a grid of the whole class costs. A
+# class over budget fails the run (after everything is written).
+
+VARIANTS_DIR = ASSETS_DIR / "variants"
+VARIANTS_MANIFEST_PATH = DATA_DIR / "ImageVariants.json"
+VARIANTS_MANIFEST_VERSION = 1
+
+# (class, key prefix, widths, budget KB). First matching prefix wins.
+VARIANT_CLASSES = [
+    ("splash", "UIResources/Common/Image/IconRolePile/", (256, 512), 4096),
+    ("head", "UIResources/Common/Image/IconRoleHead", (64, 128), 1536),
+    ("weapon", "UIResources/Common/Image/IconWeapon", (64, 128), 2560),
+    ("echo", "UIResources/Common/Image/IconMonsterHead/", (64, 128), 2048),
+    ("background", "UIResources/Common/Image/BgCg/", (640, 1280), 512),
+]
+
+
+def variant_class(key: str) -> tuple[str, str, tuple[int, ...], int] | None:
+    for image_class in VARIANT_CLASSES:
+        if key.startswith(image_class[1]):
+            return image_class
+    return None
+
+
+def variant_path(key: str, width: int) -> Path:
+    return VARIANTS_DIR / f"w{width}" / key
+
+
+def resize_variants(
+    data: bytes, widths: tuple[int, ...], preset: str = DEFAULT_PRESET
+) -> tuple[tuple[int, int], dict[int, bytes]]:
+    """((native_w, native_h), {width: webp_bytes}) for every width below the
+    native one, from one decode. Runs in the encode process pool."""
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    variants: dict[int, bytes] = {}
+    for width in widths:
+        if width >= img.width:
+            continue
+        height = max(1, round(img.height * width / img.width))
+        variants[width] = encode_webp(img.resize((width, height), Image.Resampling.LANCZOS), WEBP_QUALITY, preset)
+    return img.size, variants
+
+
+def _variants_stale(key: str, widths: tuple[int, ...], known: dict | None) -> bool:
+    """True unless the manifest knows the native size and every variant is at
+    least as new as the mirrored file."""
+    if not isinstance(known, dict) or not isinstance(known.get("width"), int):
+        return True
+    mtime = local_path_for_key(key).stat().st_mtime
+    for width in widths:
+        if width >= known["width"]:
+            continue
+        path = variant_path(key, width)
+        if not path.exists() or path.stat().st_mtime < mtime:
+            return True
+    return False
+
+
+def build_variants(
+    keys: set[str], encode_workers: int, budgets: dict[str, int], preset: str = DEFAULT_PRESET
+) -> bool:
+    """Generate missing/stale variants for *keys*, write the srcset manifest
+    and print the per-class budget report. Returns True when every variant
+    was produced and every class is within budget."""
+    previous: dict[str, dict] = {}
+    if VARIANTS_MANIFEST_PATH.exists():
+        payload = json.loads(VARIANTS_MANIFEST_PATH.read_text(encoding="utf-8"))
+        if isinstance(payload, dict) and payload.get("version") == VARIANTS_MANIFEST_VERSION:
+            previous = payload.get("images") or {}
+
+    sizes: dict[str, tuple[int, int]] = {}
+    work: list[tuple[str, tuple[int, ...]]] = []
+    for key in sorted(keys):
+        image_class = variant_class(key)
+        if image_class is None or not local_path_for_key(key).exists():
+            continue
+        known = previous.get(f"{PUBLIC_PATH_PREFIX}/{key}")
+        if _variants_stale(key, image_class[2], known):
+            work.append((key, image_class[2]))
+        else:
+            sizes[key] = (known["width"], known["height"])
+
+    failed = 0
+    if work:
+        print(f"\nVariants: generating for {len(work)} images")
+        with BatchWriter() as batch, ProcessPoolExecutor(max_workers=encode_workers) as pool:
+            futures = [
+                (key, pool.submit(resize_variants, local_path_for_key(key).read_bytes(), widths, preset))
+                for key, widths in work
+            ]
+            for key, future in futures:
+                try:
+                    sizes[key], variants = future.result()
+                except Exception as error:
+                    failed += 1
+                    print(f"  FAIL variants {key} ({error})")
+                    continue
+                for width, data in variants.items():
+                    batch.write_bytes(variant_path(key, width), data)
+
+    images: dict[str, dict] = {}
+    usage: dict[str, dict] = {}
+    for key, (width, height) in sorted(sizes.items()):
+        name, _, widths, _ = variant_class(key)
+        ref = f"{PUBLIC_PATH_PREFIX}/{key}"
+        variants = [
+            {"width": w, "src": f"{PUBLIC_PATH_PREFIX}/{variant_path(key, w).relative_to(ASSETS_DIR).as_posix()}"}
+            for w in widths
+            if w < width
+        ]
+        images[ref] = {
+            "class": name,
+            "width": width,
+            "height": height,
+            "variants": variants,
+            "srcSet": ", ".join([f"{v['src']} {v['width']}w" for v in variants] + [f"{ref} {width}w"]),
+        }
+        # An asset's grid cost is its smallest file: the first variant, or the
+        # native file when that is already narrower than every variant width.
+        native = local_path_for_key(key)
+        smallest = variant_path(key, variants[0]["width"]) if variants else native
+        class_usage = usage.setdefault(name, {"assets": 0, "native": 0, "grid": 0})
+        class_usage["assets"] += 1
+        class_usage["native"] += native.stat().st_size
+        class_usage["grid"] += smallest.stat().st_size
+
+    write_json_atomic(
+        VARIANTS_MANIFEST_PATH,
+        {"version": VARIANTS_MANIFEST_VERSION, "images": images},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+
+    within_budget = True
+    print(f"\nVariant budgets ({len(images)} images in {VARIANTS_MANIFEST_PATH.name}, {failed} failed)")
+    print(f"  {'class':<11} {'assets':>6} {'native KB':>10} {'grid KB':>9} {'budget KB':>10}")
+    for name, _, _, _ in VARIANT_CLASSES:
+        class_usage = usage.get(name)
+        if class_usage is None:
+            continue
+        grid_kb = class_usage["grid"] / 1024
+        over = grid_kb > budgets[name]
+        within_budget = within_budget and not over
+        print(
+            f"  {name:<11} {class_usage['assets']:>6} {class_usage['native'] / 1024:>10.0f} "
+            f"{grid_kb:>9.0f} {budgets[name]:>10}{'  OVER BUDGET' if over else ''}"
+        )
+    return within_budget and not failed
+
+
+# --- Fetch -> encode -> write pipeline ------------------------------------------
+#
+# Fetching is network-bound and capped for Wuthery's sake; PNG -> WebP at
+# method=6 is CPU-bound and, in threads, serialized on the GIL. Running both in
+# one thread per item made a slow encode hold a network slot. Here fetch
+# threads only download, hand non-WebP bodies to a process pool sized to the
+# CPU, and the calling thread is the single writer. A semaphore bounds how many
+# items are between "fetch started" and "written" so downloaded bodies can't
+# pile up in memory when encoding is the bottleneck.
+
+def _finished(value: Any = None, error: BaseException | None = None) -> Future:
+    future: Future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+    return future
+
+
+def run_pipeline(
+    jobs: list[tuple[str, str, str, dict | None]],
+    session: requests.Session,
+    fetch_workers: int,
+    encode_workers: int,
+    encoder_preset: str = DEFAULT_PRESET,
+):
+    """Fetch and encode *jobs* ((label, absolute, key, validators)) concurrently.
+
+    Yields (job, webp_bytes | None, meta, error) in completion order on the
+    calling thread; None bytes means the upstream answered 304. The consumer
+    does the writing, so nothing shared is touched from another thread."""
+    done: queue.Queue = queue.Queue()
+    in_flight = threading.BoundedSemaphore(max(1, fetch_workers + 2 * encode_workers))
+    stop = threading.Event()
+
+    def fetch(job, encode_pool: ProcessPoolExecutor) -> None:
+        while not in_flight.acquire(timeout=0.5):
+            if stop.is_set():
+                return
+        try:
+            raw, meta = fetch_source(session, job[1], job[3])
+            if raw is None or _is_webp(raw):
+                encoded = _finished(raw)
+            else:
+                encoded = encode_pool.submit(to_webp, raw, encoder_preset)
+        except Exception as error:
+            done.put((job, _finished(error=error), None))
+            return
+        encoded.add_done_callback(lambda f: done.put((job, f, meta)))
+
+    encode_pool = ProcessPoolExecutor(max_workers=encode_workers)
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+    try:
+        for job in jobs:
+            fetch_pool.submit(fetch, job, encode_pool)
+        for _ in range(len(jobs)):
+            job, encoded, meta = done.get()
+            in_flight.release()
+            try:
+                data, error = encoded.result(), None
+            except Exception as exc:
+                data, error = None, exc
+            yield job, data, meta, error
+    finally:
+        # Also reached when the consumer stops early (Ctrl+C): unblock fetch
+        # threads waiting on the semaphore and drop queued work.
+        stop.set()
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        encode_pool.shutdown(wait=True, cancel_futures=True)
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Mirror game-data images into public/assets/ as WebP")
     parser.add_argument("--apply", action="store_true", help="Download+rewrite; default is a no-network preview")
-    parser.add_argument("--workers", type=int, default=12, help="Kept conservative — Wuthery throttles under concurrent load")
+    parser.add_argument("--workers", type=int, default=12, help="Fetch threads; kept conservative — Wuthery throttles under concurrent load")
+    parser.add_argument("--encode-workers", type=int, default=os.cpu_count() or 1, help="Processes for PNG -> WebP encoding (default: CPU count)")
     parser.add_argument("--limit", type=int, default=None, help="Only fetch the first N not-yet-downloaded URLs")
+    parser.add_argument("--manifest", action="store_true", help=f"Track mirrored keys in {MANIFEST_PATH.name} instead of probing the disk")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate manifest entries upstream (conditional GET); implies --manifest")
+    preset_argument(parser)
+    parser.add_argument(
+        "--variants",
+        action="store_true",
+        help=f"Also write downscaled width variants + {VARIANTS_MANIFEST_PATH.name}, and enforce per-class byte budgets",
+    )
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="CLASS=KB",
+        help="Override a variant class budget (repeatable), e.g. --budget head=2048",
+    )
     args = parser.parse_args()
-
+    use_manifest = args.manifest or args.refresh
+    budgets = {name: budget for name, _, _, budget in VARIANT_CLASSES}
+    for override in args.budget:
+        name, _, value = override.partition("=")
+        if name not in budgets or not value.isdigit():
+            parser.error(f"--budget expects CLASS=KB with CLASS in {', '.join(budgets)}: {override!r}")
+        budgets[name] = int(value)
+
+    # Data files are parsed only when their bytes changed since the ref index
+    # was written, or when something below needs the records themselves.
     loaded: dict[str, Any] = {}
+
+    def load_data(name: str) -> Any:
+        if name not in loaded:
+            loaded[name] = json.loads((DATA_DIR / name).read_bytes())
+        return loaded[name]
+
+    targets = target_files()
+    ref_index = RefIndex.load()
+    ref_index.prune(targets)
+    file_refs: dict[str, list[tuple[str, str]]] = {}
     all_refs: set[str] = set(EXTRA_ASSETS)
     local_refs: set[str] = set()
-    for name in TARGET_FILES:
-        path = DATA_DIR / name
-        data = json.loads(path.read_text(encoding="utf-8"))
-        loaded[name] = data
-        collect_image_refs(data, all_refs, local_refs)
+    for name in targets:
+        raw = (DATA_DIR / name).read_bytes()
+        refs = ref_index.refs_for(name, raw)
+        if refs is None:
+            loaded[name] = json.loads(raw)
+            refs = list(iter_image_refs(loaded[name]))
+            ref_index.update(name, raw, refs)
+        file_refs[name] = refs
+        for _, ref in refs:
+            (local_refs if _LOCAL_ASSET_RE.match(ref) else all_refs).add(ref)
 
     # Derived variants ride along with their source ref, whichever form the
     # JSON currently holds: an upstream URL derives an upstream URL, while an
     # already-rewritten /assets/ ref derives a local key plus a reconstructed
-    # Wuthery source URL (fetch_webp's Encore fallback covers the rest) — so
+    # Wuthery source URL (fetch_source's Encore fallback covers the rest) — so
     # a re-run heals a missing derived file in any state.
     for ref in sorted(all_refs):
         for pattern, replacement in DERIVED_VARIANTS:
@@ -263,7 +764,7 @@ def main() -> int:
                 derived_local[key] = f"{CDN_BASE}/d/GameData/{_IMAGE_SUFFIX_RE.sub('.png', key)}"
 
     # Resolving key + local path up front doubles as both the rewrite mapping
-    # and the on-disk resumability check — no separate manifest to keep in sync.
+    # and the on-disk resumability check (or the manifest lookup, with --manifest).
     ref_info = {}
     for url in all_refs:
         absolute = resolve_absolute(url)
@@ -273,14 +774,47 @@ def main() -> int:
         local_ref = f"{PUBLIC_PATH_PREFIX}/{key}"
         ref_info.setdefault(local_ref, {"absolute": upstream, "key": key, "local_path": local_path_for_key(key)})
 
-    pending = sorted(url for url, info in ref_info.items() if not info["local_path"].exists())
+    manifest: MirrorManifest | None = None
+    if use_manifest:
+        manifest = MirrorManifest.load()
+        dropped = manifest.drop_missing()
+        if dropped:
+            print(f"Dropped {dropped} {MANIFEST_PATH.name} entries whose file is missing; they are fetched again")
+        adopted = 0
+        for info in ref_info.values():
+            if info["key"] not in manifest and info["local_path"].exists():
+                manifest.adopt(info["key"], info["local_path"], info["absolute"])
+                adopted += 1
+        if adopted:
+            print(f"Adopted {adopted} already-mirrored files into {MANIFEST_PATH.name}")
+
+    def is_mirrored(info: dict) -> bool:
+        if manifest is not None:
+            return info["key"] in manifest
+        return info["local_path"].exists()
+
+    pending = sorted(url for url, info in ref_info.items() if not is_mirrored(info))
     already = len(ref_info) - len(pending)
     if args.limit:
         pending = pending[: args.limit]
 
+    # Jobs are (label, absolute, key, validators); pending refs fetch
+    # unconditionally, refreshed manifest entries conditionally.
+    jobs: list[tuple[str, str, str, dict | None]] = [
+        (url, ref_info[url]["absolute"], ref_info[url]["key"], None) for url in pending
+    ]
+    if args.refresh:
+        absolute_by_key = {info["key"]: info["absolute"] for info in ref_info.values()}
+        pending_keys = {job[2] for job in jobs}
+        for key, entry in sorted(manifest.entries.items()):
+            upstream = absolute_by_key.get(key) or entry.get("url")
+            if key not in pending_keys and upstream:
+                jobs.append((upstream, upstream, key, entry))
+
     print(
-        f"{len(ref_info)} unique image references ({len(TARGET_FILES)} data files + {len(EXTRA_ASSETS)} UI-chrome assets + derived variants), "
-        f"{already} already on disk, {len(pending)} selected to fetch this run"
+        f"{len(ref_info)} unique image references ({len(targets)} data files + {len(EXTRA_ASSETS)} UI-chrome assets + derived variants), "
+        f"{already} already {'in manifest' if manifest is not None else 'on disk'}, {len(pending)} selected to fetch this run"
+        + (f", {len(jobs) - len(pending)} to revalidate" if args.refresh else "")
     )
 
     if not args.apply:
@@ -294,41 +828,93 @@ def main() -> int:
     session = requests.Session()
     failed: list[str] = []
     total_bytes = 0
-    with ThreadPoolExecutor(max_workers=args.workers) as pool:
-        futures = {
-            pool.submit(mirror_one, session, url, ref_info[url]["absolute"], ref_info[url]["local_path"]): url
-            for url in pending
-        }
-        for i, future in enumerate(as_completed(futures), 1):
-            url = futures[future]
-            try:
-                result = future.result()
-                total_bytes += result["bytes"]
-                print(f"  [{i}/{len(pending)}] OK   {url} ({result['bytes'] / 1024:.1f} KB)")
-            except Exception as error:
-                failed.append(url)
-                print(f"  [{i}/{len(pending)}] FAIL {url} ({error})")
+    counts = {"written": 0, "linked": 0, "unchanged": 0}
+    # Files are staged and committed together at the end of the run (one
+    # parallel fsync pass + one fsync per directory instead of one per file).
+    batch = BatchWriter()
+    results = run_pipeline(jobs, session, args.workers, args.encode_workers, args.encoder_preset)
+    try:
+        for i, ((label, _, key, validators), data, meta, error) in enumerate(results, 1):
+            if error is None and data is not None:
+                try:
+                    result = store_webp(data, meta, local_path_for_key(key), manifest, validators, batch)
+                except Exception as exc:
+                    error = exc
+            if error is not None:
+                failed.append(label)
+                print(f"  [{i}/{len(jobs)}] FAIL {label} ({error})")
+                continue
+            if data is None:
+                counts["unchanged"] += 1  # 304 Not Modified
+                continue
+            counts[result["status"]] += 1
+            total_bytes += result["bytes"]
+            if manifest is not None:
+                manifest.record(key, result["meta"], result["sha256"], result["bytes"])
+            if result["status"] != "unchanged":
+                print(f"  [{i}/{len(jobs)}] OK   {label} ({result['bytes'] / 1024:.1f} KB{', linked' if result['status'] == 'linked' else ''})")
+    finally:
+        results.close()
+        # Committed (and the manifest saved) even on failure/interrupt so
+        # finished downloads aren't refetched. Everything staged is a complete,
+        # validated file; the manifest is only saved once they are all in place.
+        batch.commit()
+        if manifest is not None:
+            manifest.save()
 
-    print(f"\n{len(pending) - len(failed)} downloaded ({total_bytes / 1e6:.1f} MB), {len(failed)} failed")
+    print(
+        f"\n{counts['written'] + counts['linked']} downloaded ({total_bytes / 1e6:.1f} MB, "
+        f"{counts['linked']} deduped by hard link), {counts['unchanged']} unchanged upstream, {len(failed)} failed"
+    )
+
+    within_budget = True
+    if args.variants:
+        within_budget = build_variants(
+            {info["key"] for info in ref_info.values()}, args.encode_workers, budgets, args.encoder_preset
+        )
 
     # The rewrite is gated on the WHOLE mirror being present — not just this
     # run's batch — so --limit runs and partial failures never leave the JSONs
     # pointing at files that don't exist. Re-run until complete.
-    missing = sorted(url for url, info in ref_info.items() if not info["local_path"].exists())
+    missing = sorted(url for url, info in ref_info.items() if not is_mirrored(info))
     if missing:
+        ref_index.save()
         print(f"{len(missing)} references still unmirrored; JSON rewrite deferred until all are on disk.")
         for url in missing[:10]:
             print(f"  missing: {url}")
-        return 1 if failed else 0
+        return 1 if failed or not within_budget else 0
 
     full_mapping = {url: f"{PUBLIC_PATH_PREFIX}/{info['key']}" for url, info in ref_info.items()}
-    for name in TARGET_FILES:
-        rewritten = rewrite_image_refs(loaded[name], full_mapping)
-        write_json_atomic(DATA_DIR / name, rewritten, separators=(",", ":"), ensure_ascii=False)
-        print(f"  Rewrote {name}")
-
-    print(f"\nDone: mirror complete, rewrote {len(TARGET_FILES)} files.")
-    return 0
+    rewritten = 0
+    resplit: list[str] = []
+    # One batch, so a failure part-way never leaves some JSONs rewritten and
+    # others still pointing upstream.
+    with BatchWriter() as json_batch:
+        for name in targets:
+            changes = [
+                (pointer, ref, full_mapping[ref])
+                for pointer, ref in file_refs[name]
+                if full_mapping.get(ref, ref) != ref
+            ]
+            if not changes:
+                continue  # Already all /assets/ refs: leave the file untouched.
+            data = load_data(name)
+            for pointer, ref, local_ref in changes:
+                set_at_pointer(data, pointer, ref, local_ref)
+            raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            json_batch.write_bytes(DATA_DIR / name, raw)
+            ref_index.update(name, raw, [(pointer, full_mapping.get(ref, ref)) for pointer, ref in file_refs[name]])
+            rewritten += 1
+            print(f"  Rewrote {name} ({len(changes)} refs)")
+            if has_split(DATA_DIR, name):
+                resplit.append(name)
+    ref_index.save()
+    # After the batch committed: the split's source hash is of the bytes on disk.
+    for name in resplit:
+        save_split(DATA_DIR, name, loaded[name], {"separators": (",", ":"), "ensure_ascii": False})
+
+    print(f"\nDone: mirror complete, rewrote {rewritten} of {len(targets)} files.")
+    return 0 if within_budget else 1
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+"""
+Normalized description text shared by the description parsers.
+
+`sync_lb.py` and `sync_characters.py` both run many regex parsers over the same
+move/chain/effect strings, and each parser used to re-strip markup and re-split
+sentences on its own. `parse_text()` computes that work once per distinct
+string and hands every parser the same `ParsedText`:
+
+- plain            markup-stripped text (after an optional sanitizer)
+- buff_sentences   sentence split used by the sync_lb buff parsers
+- effect_sentences sentence split used by sync_lb._parse_effect_en
+- chain_sentences  (sentence, line) pairs used by the chain/inherent matchers
+
+Every view is computed lazily on first use. The cache keys on the field string
+rather than storing the object on the record, so records that are later
+serialized to JSON never carry it.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable
+
+MARKUP_RE = re.compile(r"<[^>]+>")
+_BR_RE = re.compile(r"<br\s*/?>", re.I)
+_PLACEHOLDER_RE = re.compile(r"\{[^}]+\}")
+_CRIT_ABBREV_RE = re.compile(r"\bCrit\.\s+")
+_REGEN_ABBREV_RE = re.compile(r"\bRegen\.\s+")
+_BUFF_SENTENCE_SPLIT_RE = re.compile(r"(?:\.\s+|\.\n+|\n+)")
+_EFFECT_SENTENCE_SPLIT_RE = re.compile(r"\.\s+")
+_CHAIN_SENTENCE_SPLIT_RE = re.compile(r"\.(?=\s|$|[A-Z])")
+
+# Stat names with internal periods that would be split by a naive sentence splitter.
+_PROTECT_PAIRS = (("Crit. Rate", "CRIT_RATE_PH"), ("Crit. DMG", "CRIT_DMG_PH"))
+
+PARSED_TEXT_CACHE_SIZE = 16384
+
+
+def _split_spans(text: str, splitter: re.Pattern[str]) -> tuple[tuple[int, int], ...]:
+    """Return stripped, non-empty segment spans between splitter matches."""
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    for bound in [m.span() for m in splitter.finditer(text)] + [(len(text), len(text))]:
+        segment = text[pos:bound[0]]
+        stripped = segment.strip()
+        if stripped:
+            start = pos + (len(segment) - len(segment.lstrip()))
+            spans.append((start, start + len(stripped)))
+        pos = bound[1]
+    return tuple(spans)
+
+
+def _normalize_abbreviations(text: str) -> str:
+    # "Crit. Rate" / "Energy Regen. " would otherwise end a sentence.
+    return _REGEN_ABBREV_RE.sub("Regen ", _CRIT_ABBREV_RE.sub("Crit ", text))
+
+
+class ParsedText:
+    """One description field, normalized once and shared by every parser."""
+
+    __slots__ = (
+        "raw",
+        "plain",
+        "_buff_text",
+        "_buff_sentences",
+        "_effect_sentences",
+        "_chain_sentences",
+    )
+
+    def __init__(self, raw: str, sanitizer: Callable[[str], str] | None = None) -> None:
+        self.raw = raw
+        self.plain = MARKUP_RE.sub("", sanitizer(raw) if sanitizer else raw)
+        self._buff_text: str | None = None
+        self._buff_sentences: tuple[str, ...] | None = None
+        self._effect_sentences: tuple[str, ...] | None = None
+        self._chain_sentences: tuple[tuple[str, str], ...] | None = None
+
+    @property
+    def buff_text(self) -> str:
+        """`<br>` as sentence breaks, markup stripped, Crit./Regen. joined."""
+        if self._buff_text is None:
+            self._buff_text = _normalize_abbreviations(MARKUP_RE.sub("", _BR_RE.sub(". ", self.raw)))
+        return self._buff_text
+
+    @property
+    def buff_sentences(self) -> list[str]:
+        """Sentences of `buff_text` (split on ". ", ".\\n" and newlines)."""
+        if self._buff_sentences is None:
+            text = self.buff_text
+            self._buff_sentences = tuple(text[a:b] for a, b in _split_spans(text, _BUFF_SENTENCE_SPLIT_RE))
+        return list(self._buff_sentences)
+
+    @property
+    def effect_sentences(self) -> tuple[str, ...]:
+        """Sentences of a set/weapon effect with `{N}` placeholders dropped."""
+        if self._effect_sentences is None:
+            text = MARKUP_RE.sub("", _BR_RE.sub(". ", self.raw))
+            text = _normalize_abbreviations(_PLACEHOLDER_RE.sub("", text)).rstrip(".")
+            self._effect_sentences = tuple(text[a:b] for a, b in _split_spans(text, _EFFECT_SENTENCE_SPLIT_RE))
+        return self._effect_sentences
+
+    @property
+    def chain_sentences(self) -> tuple[tuple[str, str], ...]:
+        """(sentence, original_line) pairs of `plain`.
+
+        Splitting on '.' can separate a conditional clause from the stat boost
+        that follows on the same line (e.g. "At 2 stacks of Snow Rust, ... {1}.
+        Hiyuki's Crit. DMG is increased by {2}."). Returning the original line
+        alongside each sentence lets callers check the full line context for
+        conditional keywords.
+        """
+        if self._chain_sentences is None:
+            protected = self.plain
+            for original, ph in _PROTECT_PAIRS:
+                protected = protected.replace(original, ph)
+            sentences: list[tuple[str, str]] = []
+            for line in protected.split("\n"):
+                restored_line = line
+                for original, ph in _PROTECT_PAIRS:
+                    restored_line = restored_line.replace(ph, original)
+                # Split on a sentence-ending period: one followed by whitespace, end
+                # of line, or directly by an uppercase letter. The trailing-uppercase
+                # case handles Encore descriptions, which strip the spacing/newlines
+                # Wuthery keeps (e.g. "...by 30%.When performing..."). The protected
+                # "Crit. Rate"/"Crit. DMG" stat names are never split here.
+                for part in _CHAIN_SENTENCE_SPLIT_RE.split(line):
+                    s = part.strip()
+                    if s:
+                        for original, ph in _PROTECT_PAIRS:
+                            s = s.replace(ph, original)
+                        sentences.append((s, restored_line))
+            self._chain_sentences = tuple(sentences)
+        return self._chain_sentences
+
+
+@lru_cache(maxsize=PARSED_TEXT_CACHE_SIZE)
+def parse_text(raw: str, sanitizer: Callable[[str], str] | None = None) -> ParsedText:
+    """Return the shared ParsedText for *raw* (optionally sanitized first)."""
+    return ParsedText(raw or "", sanitizer)
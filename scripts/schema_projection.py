@@ -0,0 +1,166 @@
+"""
+Compiled schema projection for the Wuthery CDN record transforms.
+
+`sync_characters.py` and `sync_weapons.py` describe the fields they keep with a
+small schema (True = whole field, ["k1", "k2"] = only these keys). Walking that
+schema generically meant three passes over every 14-language record: a
+`filter_keys` walk that rebuilt `set(keys)` and `set(obj.keys())` at every
+nesting level, a `prepend_cdn` walk that copied the whole result again, and an
+`apply_sub_filters` walk that trimmed nested icon dicts in place.
+
+`compile_schema()` resolves the schema once into a projector function. Key sets
+are frozen at compile time and each record is walked once: keys are selected,
+CDN paths fixed up and prefixed, and sub-filters applied while the output is
+built.
+
+Key-list rules keep their shape detection: a dict that holds any of the keys is
+filtered directly, otherwise (dict-of-dicts keyed by id) every value is
+filtered, and lists are filtered item by item.
+
+Usage:
+    from schema_projection import compile_schema
+    project = compile_schema(SCHEMA, cdn_base=CDN_BASE, sub_filters=SUB_FILTERS)
+    output = project(raw_record)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Mapping
+
+Projector = Callable[[Any], Any]
+
+
+def _copier(cdn_base: str, path_fixups: Mapping[str, str] | None) -> Projector:
+    """Deep copy with CDN paths fixed up and prefixed (the True rule).
+
+    The 14-language text blobs are almost all dicts of strings, and a call per
+    string costs as much as the passes the compiler removes, so strings inside
+    containers are rewritten inline and exact JSON types are dispatched with
+    `type() is`."""
+    fix = dict(path_fixups or {}).get
+
+    def copy(obj: Any) -> Any:
+        cls = type(obj)
+        if cls is dict:
+            return {
+                k: (cdn_base + p if (p := fix(v, v)).startswith("/d/") else p) if type(v) is str else copy(v)
+                for k, v in obj.items()
+            }
+        if cls is list:
+            return [
+                (cdn_base + p if (p := fix(v, v)).startswith("/d/") else p) if type(v) is str else copy(v)
+                for v in obj
+            ]
+        if cls is str:
+            obj = fix(obj, obj)
+            return cdn_base + obj if obj.startswith("/d/") else obj
+        return obj
+    return copy
+
+
+def _selector(keys: frozenset[str], copy: Projector) -> Callable[..., Any]:
+    """Key-list rule. `only`, when given, further limits the keys of the
+    outermost dict (a sub-filter applied by the parent level)."""
+    def select(obj: Any, only: frozenset[str] | None = None) -> Any:
+        if isinstance(obj, dict):
+            if keys.isdisjoint(obj):
+                # Dict of dicts (e.g. chains, skill keyed by ID) - recurse
+                if only is None:
+                    return {k: select(v) for k, v in obj.items()}
+                return {k: select(v) for k, v in obj.items() if k in only}
+            wanted = keys if only is None else keys & only
+            return {k: copy(v) for k, v in obj.items() if k in wanted}
+        if isinstance(obj, list):
+            return [select(item) for item in obj]
+        if isinstance(obj, str):
+            return copy(obj)
+        return obj
+    return select
+
+
+def _with_sub_filter(
+    rule_keys: frozenset[str] | None,
+    sub_filter: Mapping[str, list[str]],
+    copy: Projector,
+    select: Callable[..., Any] | None,
+) -> Projector:
+    """Field projector that trims the named sub-fields of the field's dict (or
+    of each dict in the field's list) while projecting it."""
+    only_for = {sub_field: frozenset(sub_keys) for sub_field, sub_keys in sub_filter.items()}
+    walk = copy if select is None else select
+
+    def copied(key: str, value: Any) -> Any:
+        only = only_for.get(key)
+        if only is None or not isinstance(value, dict):
+            return copy(value)
+        return {k: copy(v) for k, v in value.items() if k in only}
+
+    def selected(key: str, value: Any) -> Any:
+        only = only_for.get(key)
+        if only is None or not isinstance(value, dict):
+            return select(value)
+        return select(value, only)
+
+    def project_dict(obj: dict) -> dict:
+        if rule_keys is None or not rule_keys.isdisjoint(obj):
+            # Whole dict, or the key-list rule matched here: children are copied.
+            return {k: copied(k, v) for k, v in obj.items() if rule_keys is None or k in rule_keys}
+        return {k: selected(k, v) for k, v in obj.items()}
+
+    def project(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return project_dict(obj)
+        if isinstance(obj, list):
+            return [project_dict(item) if isinstance(item, dict) else walk(item) for item in obj]
+        return walk(obj)
+
+    return project
+
+
+def compile_schema(
+    schema: Mapping[str, Any],
+    *,
+    cdn_base: str,
+    path_fixups: Mapping[str, str] | None = None,
+    sub_filters: Mapping[str, Mapping[str, list[str]]] | None = None,
+    handlers: Mapping[str, Projector] | None = None,
+) -> Callable[[dict], dict]:
+    """Compile a field schema into a single-pass record projector.
+
+    schema:       field -> True (keep whole) | [keys] (keep only these keys)
+    path_fixups:  exact path -> corrected path, applied before CDN prefixing
+    sub_filters:  field -> sub_field -> [keys to keep inside that sub-field]
+    handlers:     field -> function given the raw value; its result is used
+                  as-is (no CDN prefixing, no sub-filter). Takes precedence
+                  over the field's rule.
+
+    Fields missing from the record are omitted; output keys follow the schema
+    order. Rules other than True or a key list are ignored.
+    """
+    copy = _copier(cdn_base, path_fixups)
+    handlers = handlers or {}
+    sub_filters = sub_filters or {}
+
+    fields: list[tuple[str, Projector]] = []
+    for field, rule in schema.items():
+        if field in handlers:
+            fields.append((field, handlers[field]))
+            continue
+        if rule is True:
+            rule_keys, select = None, None
+            projector = copy
+        elif isinstance(rule, list):
+            rule_keys = frozenset(rule)
+            select = _selector(rule_keys, copy)
+            projector = select
+        else:
+            continue
+        if sub_filters.get(field):
+            projector = _with_sub_filter(rule_keys, sub_filters[field], copy, select)
+        fields.append((field, projector))
+    compiled = tuple(fields)
+
+    def project(data: dict) -> dict:
+        return {field: projector(data[field]) for field, projector in compiled if field in data}
+
+    return project
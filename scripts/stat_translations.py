@@ -1,7 +1,7 @@
 """
 Sync stat translations from Wuthery CDN PropertyIndexs.json to public/Data/Stats.json.
 
-Fetches PropertyIndexs.json and picks out the stats used in EchoStats.json by their exact CDN English name.
+Fetches PropertyIndexs.json (through the cached localization_index.py loader) and picks out the stats used in EchoStats.json by their exact CDN English name.
 
 HP%, ATK%, DEF% are not separate entries so they're derived by
 appending "%" to each translation of their base stat (HP / ATK / DEF).
@@ -18,15 +18,8 @@ Usage:
 import json
 import argparse
 from pathlib import Path
-from cdn_config import CDN_BASE, request_json_with_retry, write_json_atomic
-
-try:
-    import requests
-except ImportError:
-    print("pip install requests")
-    raise SystemExit(1)
-
-PROPERTY_INDEXS_URL = f"{CDN_BASE}/d/GameData/Grouped/LocalizationIndex/PropertyIndexs.json"
+from cdn_config import CDN_BASE, write_json_atomic
+from localization_index import load_localization_index
 
 OUTPUT = Path(__file__).parent.parent / "public/Data/Stats.json"
 
@@ -94,12 +87,7 @@ def main():
     parser.add_argument("--pretty",  action="store_true", help="Pretty-print JSON")
     args = parser.parse_args()
 
-    session = requests.Session()
-
-    print("Fetching PropertyIndexs.json ...")
-    props_raw = request_json_with_retry(session, "get", PROPERTY_INDEXS_URL)
-    if not isinstance(props_raw, list):
-        raise ValueError("Unexpected PropertyIndexs payload; expected a list")
+    props_raw = load_localization_index().rows("PropertyIndexs")
     print(f"  {len(props_raw)} property entries")
 
     # Index by Name.en, prefer IsShow=True entries when names collide (e.g. HP appears twice)
@@ -146,6 +134,7 @@ def main():
         return
 
     write_json_atomic(OUTPUT, output, **json_kwargs)
+    load_localization_index().save()
 
     size_kb = OUTPUT.stat().st_size / 1024
     print(f"\nWrote {OUTPUT} [{size_kb:.1f} KB], {len(output)} stat entries")
@@ -6,13 +6,19 @@ translations and writes them to public/Data. Wuthery is the default source;
 pass --encore to use Encore's faster early-patch sync path.
 Also generates backend OCR data and LB constants.
 Supported flags are routed only to child scripts that declare them.
+The children share one run start time, so the LocalizationIndex files
+(localization_index.py) are fetched or revalidated once per run.
 """
 
 import argparse
+import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 
+from localization_index import RUN_STARTED_ENV
+
 
 def main() -> int:
     scripts_dir = Path(__file__).resolve().parent
@@ -79,9 +85,10 @@ def main() -> int:
             ("Leaderboard",[sys.executable, str(scripts_dir / "sync_lb.py"), *data_flags]),
         ]
 
+    env = {**os.environ, RUN_STARTED_ENV: str(time.time())}
     for name, cmd in scripts:
         print(f"\n--- Sync {name} ---")
-        r = subprocess.run(cmd, cwd=scripts_dir)
+        r = subprocess.run(cmd, cwd=scripts_dir, env=env)
         if r.returncode != 0:
             return r.returncode
     print("\n--- All syncs done ---")
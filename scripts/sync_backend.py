@@ -31,11 +31,13 @@ from concurrent.futures import ThreadPoolExecutor
 
 from cdn_config import (
     CDN_BASE,
+    BatchWriter,
     encore_request_json,
     request_json_with_retry,
     write_bytes_atomic,
     write_json_atomic,
 )
+from game_catalog import GameCatalog, load_catalog
 
 try:
     import requests
@@ -71,6 +73,11 @@ def _encore_json(route: str):
     return encore_request_json(requests, "en", route, headers=UA)
 
 
+def _catalog() -> GameCatalog:
+    # Only English columns are read here: load the English split when it is current.
+    return load_catalog(FRONTEND_DATA, lang="en")
+
+
 def _frontend_fetter_ids() -> frozenset[int]:
     path = FRONTEND_DATA / "Fetters.json"
     payload = json.loads(path.read_text(encoding="utf-8"))
@@ -113,21 +120,31 @@ def _needs_reencode(src: str | Path) -> bool:
     return suffix.lower() != ".webp"
 
 
-def _save_webp(raw: bytes, dest: Path, reencode: bool) -> None:
+def _save_webp(raw: bytes, dest: Path, reencode: bool, batch: BatchWriter | None = None) -> None:
     """Write image bytes to dest as WebP.
 
     Encore icons are already WebP, so reencode=False writes the bytes straight through.
     A non-WebP source (Wuthery PNG fallback) needs reencode=True, which decodes and
-    re-encodes via OpenCV.
+    re-encodes via OpenCV. With a batch the file is staged and lands on commit.
     """
     if not reencode:
-        write_bytes_atomic(dest, raw)
+        if batch is not None:
+            batch.write_bytes(dest, raw)
+        else:
+            write_bytes_atomic(dest, raw)
         return
     if cv2 is None or np is None:
         raise RuntimeError("cv2 + numpy required to re-encode non-WebP source to WebP")
     img = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
     if img is None:
         raise RuntimeError("could not decode downloaded image")
+    if batch is not None:
+        # cv2 picks the encoder from the suffix, so stage a .webp temp name.
+        temp_path = batch.temp_path(dest, ".tmp.webp")
+        if not cv2.imwrite(str(temp_path), img, [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY]):
+            batch.discard(dest)
+            raise RuntimeError("could not write WebP")
+        return
     temp_path = dest.with_name(f".{dest.stem}.{os.getpid()}.tmp.webp")
     try:
         if not cv2.imwrite(str(temp_path), img, [cv2.IMWRITE_WEBP_QUALITY, WEBP_QUALITY]):
@@ -151,17 +168,21 @@ def _download_icons(tasks: list[tuple[str, str | Path, Path]], force: bool, reen
         print(f"  {label}: all {len(tasks)} present, nothing to fetch")
         return 0
 
+    # Icons are staged and committed once the set is done: one parallel fsync
+    # pass and a directory fsync instead of an fsync per template.
+    batch = BatchWriter()
+
     def work(item):
         tid, src, dest = item
         re = _needs_reencode(src) if reencode == "auto" else reencode
         try:
-            _save_webp(_source_bytes(src), dest, re)
+            _save_webp(_source_bytes(src), dest, re, batch)
             return tid, None
         except Exception as exc:  # noqa: BLE001
             return tid, str(exc)
 
     downloaded = errors = 0
-    with ThreadPoolExecutor(max_workers=ICON_WORKERS) as pool:
+    with batch, ThreadPoolExecutor(max_workers=ICON_WORKERS) as pool:
         for tid, err in pool.map(work, todo):
             if err:
                 errors += 1
@@ -276,13 +297,11 @@ def _echo_icon_source(raw: str) -> str | Path:
 
 
 def sync_echo_icons(dry_run: bool, force: bool) -> int:
-    echoes = json.loads((FRONTEND_DATA / "Echoes.json").read_text(encoding="utf-8"))
     tasks: list[tuple[str, str, Path]] = []
-    for echo in echoes:
-        eid = str(echo.get("id", "")).strip()
-        raw = echo.get("icon")
-        if eid and isinstance(raw, str) and raw:
-            tasks.append((eid, _echo_icon_source(raw), BACKEND_ECHOES / f"{eid}.webp"))
+    for echo in _catalog().echoes:
+        eid = echo.key.strip()
+        if eid and echo.icon:
+            tasks.append((eid, _echo_icon_source(echo.icon), BACKEND_ECHOES / f"{eid}.webp"))
     if dry_run:
         n = sum(1 for _, _, d in tasks if force or not d.exists())
         print(f"  Echo icons: {n}/{len(tasks)} to fetch -> {BACKEND_ECHOES}")
@@ -295,15 +314,14 @@ def sync_echo_icons(dry_run: bool, force: bool) -> int:
 # --- JSON transforms ----------------------------------------------------------
 
 def sync_characters(dry_run: bool) -> int:
-    data = json.loads((FRONTEND_DATA / "Characters.json").read_text(encoding="utf-8"))
     out = []
-    for char in data:
+    for char in _catalog().characters:
         out.append({
-            "name": char["name"]["en"],
+            "name": char.name,
             # Canonical backend/runtime ID is CDN character id.
-            "id": str(char["id"]),
-            "element": char["element"]["name"]["en"],
-            "weaponType": char["weapon"]["name"]["en"],
+            "id": char.key,
+            "element": char.element,
+            "weaponType": char.weapon_type,
         })
     if not dry_run:
         write_json_atomic(
@@ -316,15 +334,12 @@ def sync_characters(dry_run: bool) -> int:
 
 
 def sync_weapons(dry_run: bool) -> int:
-    data = json.loads((FRONTEND_DATA / "Weapons.json").read_text(encoding="utf-8"))
     grouped: dict[str, list] = {}
-    for weapon in data:
-        type_en = weapon["type"]["name"]["en"]
+    for weapon in _catalog().weapons:
         # Keep raw CDN/frontend weapon type name (no legacy plural remapping).
-        key = type_en
-        grouped.setdefault(key, []).append({
-            "name": weapon["name"]["en"],
-            "id": str(weapon["id"]),
+        grouped.setdefault(weapon.type, []).append({
+            "name": weapon.name,
+            "id": weapon.key,
         })
     if not dry_run:
         write_json_atomic(
@@ -338,16 +353,15 @@ def sync_weapons(dry_run: bool) -> int:
 
 
 def sync_echoes(dry_run: bool) -> int:
-    data = json.loads((FRONTEND_DATA / "Echoes.json").read_text(encoding="utf-8"))
     out = []
     valid_fetter_ids = _frontend_fetter_ids()
-    for echo in data:
-        echo_id = str(echo["id"])
-        set_ids = [fid for fid in echo.get("fetter", []) if fid in valid_fetter_ids]
+    for echo in _catalog().echoes:
+        echo_id = echo.key
+        set_ids = [fid for fid in echo.fetter_ids if fid in valid_fetter_ids]
         out.append({
-            "name": echo["name"].get("en") or echo_id,
+            "name": echo.name or echo_id,
             "id": echo_id,  # Always CDN ID, match what _load_from_cdn uses
-            "cost": echo["cost"],
+            "cost": echo.cost,
             "setIds": set_ids,
         })
     if not dry_run:
@@ -2,28 +2,38 @@
 Sync Characters from Wuthery CDN to public/Data.
 
 Fetches character data from CDN, transforms it using a schema (keeping all
-languages), and writes to public/Data/Characters (combined or --individual).
+languages), and writes public/Data/Characters.json, per-character shards under
+public/Data/Characters/ with an index (see data_shards.py), or both.
 
 Usage:
     python sync_characters.py --fetch                    # Sync all → combined Characters.json
     python sync_characters.py --fetch --id 1102          # Sync single from CDN
     python sync_characters.py --fetch --id 1102 --dry-run --pretty
-    python sync_characters.py --fetch --individual       # Write per-character files instead
+    python sync_characters.py --fetch --layout sharded   # Shards + index; only changed shards are rewritten
+    python sync_characters.py --fetch --layout both      # Characters.json and the shards
     python sync_characters.py --fetch --include-skills   # Include full skill multiplier data
+    python sync_characters.py --fetch --split-langs      # Also write the per-language split (l10n_split.py)
+    python sync_characters.py --fetch --refresh-icons    # Re-fetch every sequence icon instead of using the cache
 """
 
 import json
 import argparse
 import re
 from pathlib import Path
-from typing import Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from cdn_config import (
-    CDN_BASE,
-    merge_records_by_id,
-    request_json_with_retry,
-    write_json_atomic,
+from typing import Any, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from cdn_config import CDN_BASE, request_json_with_retry, write_json_atomic
+from data_shards import (
+    current_layout,
+    index_hashes,
+    layout_argument,
+    load_characters,
+    record_hash,
+    save_characters,
 )
+from l10n_split import split_argument
+from parsed_text import parse_text
+from schema_projection import compile_schema
 
 # Regex to extract legacy ID from iconRound URL
 # e.g. "T_IconRoleHeadCircle256_26_UI.png" -> 26
@@ -46,67 +56,95 @@ SAP_TOKEN_PATTERN = re.compile(
 )
 
 # Sequence bonus parsing, embedded into each chain entry at sync time.
-# Maps game description text patterns to our StatName values.
-# More-specific patterns must appear before shorter overlapping ones.
-_CHAIN_STAT_PATTERNS: list[tuple[re.Pattern, str]] = [
-    (re.compile(r"Resonance\s+Skill\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),   'Resonance Skill DMG Bonus'),
-    (re.compile(r"Resonance\s+Liberation\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I), 'Resonance Liberation DMG Bonus'),
-    (re.compile(r"Basic\s+Attack\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),       'Basic Attack DMG Bonus'),
-    (re.compile(r"Heavy\s+Attack\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),       'Heavy Attack DMG Bonus'),
-    (re.compile(r"Aero\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),     'Aero DMG'),
-    (re.compile(r"Glacio\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),   'Glacio DMG'),
-    (re.compile(r"Fusion\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),   'Fusion DMG'),
-    (re.compile(r"Electro\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),  'Electro DMG'),
-    (re.compile(r"Havoc\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),    'Havoc DMG'),
-    (re.compile(r"Spectro\s+DMG\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),  'Spectro DMG'),
-    (re.compile(r"Crit[.]\s+Rate\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),  'Crit Rate'),
-    (re.compile(r"Crit[.]\s+DMG\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),   'Crit DMG'),
-    (re.compile(r"Energy\s+Regen\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),   'Energy Regen'),
-    (re.compile(r"Healing\s+Bonus\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I),  'Healing Bonus'),
-    (re.compile(r"\bATK\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I), 'ATK%'),
-    (re.compile(r"\bHP\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)",  re.I), 'HP%'),
-    (re.compile(r"\bDEF\s+is\s+increased\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I), 'DEF%'),
+# Maps game description stat phrases to our StatName values. Each is matched as
+# "<stat> is increased by <value>". The list order is the priority when one
+# sentence names several stats, so more-specific phrases come first.
+_BONUS_VALUE = r"(\{\d+\}|\d+(?:\.\d+)?)"
+_CHAIN_STAT_CLAUSES: list[tuple[str, str]] = [
+    (r"Resonance\s+Skill\s+DMG\s+Bonus",      'Resonance Skill DMG Bonus'),
+    (r"Resonance\s+Liberation\s+DMG\s+Bonus", 'Resonance Liberation DMG Bonus'),
+    (r"Basic\s+Attack\s+DMG\s+Bonus",         'Basic Attack DMG Bonus'),
+    (r"Heavy\s+Attack\s+DMG\s+Bonus",         'Heavy Attack DMG Bonus'),
+    (r"Aero\s+DMG\s+Bonus",    'Aero DMG'),
+    (r"Glacio\s+DMG\s+Bonus",  'Glacio DMG'),
+    (r"Fusion\s+DMG\s+Bonus",  'Fusion DMG'),
+    (r"Electro\s+DMG\s+Bonus", 'Electro DMG'),
+    (r"Havoc\s+DMG\s+Bonus",   'Havoc DMG'),
+    (r"Spectro\s+DMG\s+Bonus", 'Spectro DMG'),
+    (r"Crit[.]\s+Rate",        'Crit Rate'),
+    (r"Crit[.]\s+DMG",         'Crit DMG'),
+    (r"Energy\s+Regen",        'Energy Regen'),
+    (r"Healing\s+Bonus",       'Healing Bonus'),
+    (r"\bATK", 'ATK%'),
+    (r"\bHP",  'HP%'),
+    (r"\bDEF", 'DEF%'),
 ]
 
-# Reverse-phrasing patterns ("Increase[s] <stat> by <val>") used ONLY for
+# Reverse-phrasing clauses ("Increase[s] <stat> by <val>") used ONLY for
 # inherent skills — e.g. Cantarella's "Cure" ("Increase Healing Bonus by 20%.").
 # Chains deliberately stay forward-only so party-scoped clauses like "increases
 # all allies' ATK by ..." are never mistaken for the wielder's panel stat;
 # inherents guard against that via the shared conditional filter (team/nearby/
 # allies keywords are all in _CHAIN_CONDITIONAL_RE) and are limited to the
 # self-buff stats inherents actually grant unconditionally.
-_INHERENT_REVERSE_PATTERNS: list[tuple[re.Pattern, str]] = [
-    (re.compile(r"Increases?\s+Healing\s+Bonus\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)", re.I), 'Healing Bonus'),
-    (re.compile(r"Increases?\s+Energy\s+Regen\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)",   re.I), 'Energy Regen'),
-    (re.compile(r"Increases?\s+Crit[.]\s+Rate\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)",   re.I), 'Crit Rate'),
-    (re.compile(r"Increases?\s+Crit[.]\s+DMG\s+by\s+(\{\d+\}|\d+(?:\.\d+)?)",    re.I), 'Crit DMG'),
+_INHERENT_REVERSE_CLAUSES: list[tuple[str, str]] = [
+    (r"Healing\s+Bonus", 'Healing Bonus'),
+    (r"Energy\s+Regen",  'Energy Regen'),
+    (r"Crit[.]\s+Rate",  'Crit Rate'),
+    (r"Crit[.]\s+DMG",   'Crit DMG'),
 ]
 
-# Inherent skills accept both the forward chain patterns and the reverse forms.
-_INHERENT_BONUS_PATTERNS = _CHAIN_STAT_PATTERNS + _INHERENT_REVERSE_PATTERNS
-
-_CHAIN_CONDITIONAL_RE = re.compile(
+_CHAIN_CONDITIONAL_SOURCE = (
     r'\b(?:when|after|upon|if|while|during|casting|triggers?|stacks?'
     r'|consumes?|consuming|cooldown|entering|teammates?|team\s+members?'
     r'|nearby|allies?|below|above|state)\b'
-    r'|for\s+\d+s?\b|for\s+\{\d+\}s?\b|\{\d+\}s\b',
-    re.IGNORECASE,
+    r'|for\s+\d+s?\b|for\s+\{\d+\}s?\b|\{\d+\}s\b'
 )
+_CHAIN_CONDITIONAL_RE = re.compile(_CHAIN_CONDITIONAL_SOURCE, re.IGNORECASE)
 
 # A stat increase scoped to a specific move's "DMG Multiplier" buffs only that
 # move, not the character's panel stat (e.g. Lucy S3: "The DMG Multiplier of
 # Override ... is increased by 50%, and its Crit. DMG is increased by 100%." —
 # the +100% applies to Override's crit, not Lucy's Crit. DMG stat). The "DMG
-# Multiplier" antecedent and the possessive "its"/"their" anaphora that refers
-# back to it are the tells; reject so it is never recorded as a flat bonus.
-_CHAIN_MOVE_SCOPED_RE = re.compile(
-    r'\bDMG\s+Multiplier\b|\b(?:its|their)\s*$',
-    re.IGNORECASE,
-)
+# Multiplier" antecedent and the possessive "its"/"their" anaphora directly
+# before the stat are the tells; reject so it is never recorded as a flat bonus.
+_CHAIN_MOVE_SCOPED_SOURCE = r'\bDMG\s+Multiplier\b'
+_CHAIN_ANAPHORA_SOURCE = r'\b(?:its|their)\s*'
+
+
+def _compile_bonus_scanner(
+    forward: list[tuple[str, str]],
+    reverse: list[tuple[str, str]] = (),
+) -> tuple[re.Pattern, dict[str, tuple[int, str, int]]]:
+    """One alternation over every stat clause plus the conditional and
+    move-scoped tells, dispatched on `lastgroup`.
+
+    Returns (pattern, clause group -> (priority, stat name, value group)).
+    Stat clauses never contain a conditional word, so a single non-overlapping
+    scan sees every token the per-pattern searches of before/after did.
+    """
+    clauses = [
+        (rf"{stat}\s+is\s+increased\s+by\s+{_BONUS_VALUE}", stat_name) for stat, stat_name in forward
+    ] + [
+        (rf"Increases?\s+{stat}\s+by\s+{_BONUS_VALUE}", stat_name) for stat, stat_name in reverse
+    ]
+    alternatives = [f"(?P<b{priority}>{source})" for priority, (source, _) in enumerate(clauses)]
+    alternatives += [
+        f"(?P<cond>{_CHAIN_CONDITIONAL_SOURCE})",
+        f"(?P<scoped>{_CHAIN_MOVE_SCOPED_SOURCE})",
+        f"(?P<its>{_CHAIN_ANAPHORA_SOURCE})",
+    ]
+    pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+    groups = {
+        f"b{priority}": (priority, stat_name, pattern.groupindex[f"b{priority}"] + 1)
+        for priority, (_, stat_name) in enumerate(clauses)
+    }
+    return pattern, groups
 
-_MARKUP_RE = re.compile(r'<[^>]+>')
-# Stat names with internal periods that would be split by a naive sentence splitter.
-_PROTECT_PAIRS = [('Crit. Rate', 'CRIT_RATE_PH'), ('Crit. DMG', 'CRIT_DMG_PH')]
+
+_CHAIN_BONUS_SCANNER = _compile_bonus_scanner(_CHAIN_STAT_CLAUSES)
+# Inherent skills accept both the forward chain clauses and the reverse forms.
+_INHERENT_BONUS_SCANNER = _compile_bonus_scanner(_CHAIN_STAT_CLAUSES, _INHERENT_REVERSE_CLAUSES)
 
 DAMAGE_TYPE_TAG_MAP = {
     4: "Basic Attack DMG",
@@ -121,92 +159,71 @@ DAMAGE_TYPE_TEXT_TO_SUBSTAT = {
 }
 
 
-def _chain_strip_markup(text: str) -> str:
-    return _MARKUP_RE.sub('', text)
-
-
-def _chain_split_sentences(text: str) -> list[tuple[str, str]]:
-    """Split chain description into (sentence, original_line) tuples.
-
-    Splitting on '.' can separate a conditional clause from the stat boost
-    that follows on the same line (e.g. "At 2 stacks of Snow Rust, ... {1}.
-    Hiyuki's Crit. DMG is increased by {2}.").  By returning the original
-    line alongside each sentence, callers can check the full line context
-    for conditional keywords.
-    """
-    protected = text
-    for original, ph in _PROTECT_PAIRS:
-        protected = protected.replace(original, ph)
-    sentences: list[tuple[str, str]] = []
-    for line in protected.split('\n'):
-        # Restore protection in the full line for context checks.
-        restored_line = line
-        for original, ph in _PROTECT_PAIRS:
-            restored_line = restored_line.replace(ph, original)
-        # Split on a sentence-ending period: one followed by whitespace, end of
-        # line, or directly by an uppercase letter. The trailing-uppercase case
-        # handles Encore descriptions, which strip the spacing/newlines Wuthery
-        # keeps (e.g. "...by 30%.When performing..."). The "Crit. Rate"/"Crit. DMG"
-        # stat names are protected above, so they are never split here.
-        for part in re.split(r'\.(?=\s|$|[A-Z])', line):
-            s = part.strip()
-            if s:
-                for original, ph in _PROTECT_PAIRS:
-                    s = s.replace(ph, original)
-                sentences.append((s, restored_line))
-    return sentences
-
-
 def _parse_param_value(param_str: str) -> float | None:
     m = re.match(r'^\s*(\d+(?:\.\d+)?)%?\s*$', param_str)
     return float(m.group(1)) if m else None
 
 
-def _match_stat_bonus(desc_en: str, params: list[str], patterns) -> dict | None:
+def _match_stat_bonus(desc_en: str, params: list[str], scanner) -> dict | None:
     """Return {stat, value} for the first unconditional stat clause, or None.
 
     Shared core for chain (forward-only) and inherent (forward + reverse)
-    parsing: splits into sentences, matches the given patterns, and rejects any
-    clause carrying a conditional/temporal/move-scoped qualifier.
+    parsing: splits into sentences, scans each once with the combined matcher,
+    and rejects any clause carrying a conditional/temporal/move-scoped qualifier.
     """
-    clean = _chain_strip_markup(desc_en)
-    for sentence, original_line in _chain_split_sentences(clean):
-        for pattern, stat_name in patterns:
-            m = pattern.search(sentence)
-            if not m:
+    pattern, clauses = scanner
+    for sentence, original_line in parse_text(desc_en).chain_sentences:
+        # Every stat clause contains "increase"; most sentences don't, and a
+        # substring test is far cheaper than the alternation scan.
+        if "increase" not in sentence.lower():
+            continue
+        best = None
+        conditional = False
+        scoped_starts: list[int] = []
+        anaphora_ends: set[int] = set()
+        for m in pattern.finditer(sentence):
+            kind = m.lastgroup
+            if kind == "cond":
+                conditional = True
+            elif kind == "scoped":
+                scoped_starts.append(m.start())
+            elif kind == "its":
+                anaphora_ends.add(m.end())
+            elif best is None or clauses[kind][0] < clauses[best.lastgroup][0]:
+                best = m
+        if best is None:
+            continue
+        # Check the isolated sentence for conditional keywords.
+        if conditional:
+            continue  # sentence is conditional and we skip it
+        # Reject increases scoped to a move's DMG Multiplier (anaphoric
+        # "its Crit. DMG" etc.) rather than the character's panel stat.
+        if best.start() in anaphora_ends or any(start < best.start() for start in scoped_starts):
+            continue
+        # A preceding sentence on the same line may carry a conditional that
+        # scopes the stat boost (e.g. "At 2 stacks of X, ... {1}. Crit. DMG is
+        # increased by {2}."). Only the text *before* this sentence matters —
+        # checking the whole line would wrongly reject bonuses followed by
+        # unrelated conditional clauses, which is how Encore (single-line,
+        # newline-stripped descriptions) lays out every chain.
+        if original_line != sentence:
+            line_prefix = original_line[:original_line.find(sentence)]
+            if line_prefix and _CHAIN_CONDITIONAL_RE.search(line_prefix):
                 continue
-            before = sentence[:m.start()]
-            after  = sentence[m.end():]
-            # Check the isolated sentence for conditional keywords.
-            if _CHAIN_CONDITIONAL_RE.search(before) or _CHAIN_CONDITIONAL_RE.search(after):
-                break  # sentence is conditional and we skip it
-            # Reject increases scoped to a move's DMG Multiplier (anaphoric
-            # "its Crit. DMG" etc.) rather than the character's panel stat.
-            if _CHAIN_MOVE_SCOPED_RE.search(before):
-                break
-            # A preceding sentence on the same line may carry a conditional that
-            # scopes the stat boost (e.g. "At 2 stacks of X, ... {1}. Crit. DMG is
-            # increased by {2}."). Only the text *before* this sentence matters —
-            # checking the whole line would wrongly reject bonuses followed by
-            # unrelated conditional clauses, which is how Encore (single-line,
-            # newline-stripped descriptions) lays out every chain.
-            if original_line != sentence:
-                line_prefix = original_line[:original_line.find(sentence)]
-                if line_prefix and _CHAIN_CONDITIONAL_RE.search(line_prefix):
-                    break
-            # The captured token is either a Wuthery-style param placeholder ("{0}")
-            # or an inline literal value ("40", "12.5") as emitted by Encore, which
-            # pre-substitutes its descriptions. Resolve both to a numeric value.
-            value = _resolve_chain_bonus_token(m.group(1), params)
-            if value is None:
-                break
-            return {'stat': stat_name, 'value': int(value) if value == int(value) else value}
+        # The captured token is either a Wuthery-style param placeholder ("{0}")
+        # or an inline literal value ("40", "12.5") as emitted by Encore, which
+        # pre-substitutes its descriptions. Resolve both to a numeric value.
+        _, stat_name, value_group = clauses[best.lastgroup]
+        value = _resolve_chain_bonus_token(best.group(value_group), params)
+        if value is None:
+            continue
+        return {'stat': stat_name, 'value': int(value) if value == int(value) else value}
     return None
 
 
 def parse_chain_bonus(desc_en: str, params: list[str]) -> dict | None:
     """Return {stat, value} for an unconditional passive stat bonus, or None."""
-    return _match_stat_bonus(desc_en, params, _CHAIN_STAT_PATTERNS)
+    return _match_stat_bonus(desc_en, params, _CHAIN_BONUS_SCANNER)
 
 
 def parse_inherent_bonuses(moves: list[dict] | None) -> list[dict]:
@@ -226,7 +243,7 @@ def parse_inherent_bonuses(moves: list[dict] | None) -> list[dict]:
         desc_field = move.get("description")
         desc_en = desc_field.get("en", "") if isinstance(desc_field, dict) else str(desc_field or "")
         params = move.get("descriptionParams") or []
-        bonus = _match_stat_bonus(desc_en, params, _INHERENT_BONUS_PATTERNS)
+        bonus = _match_stat_bonus(desc_en, params, _INHERENT_BONUS_SCANNER)
         if bonus and bonus not in out:
             out.append(bonus)
     return out
@@ -309,7 +326,7 @@ SKILLS_SCHEMA = {
     "skill": ["id", "params"],
 }
 
-# Sub-filters applied after main schema extraction to trim nested icon dicts.
+# Sub-filters applied while projecting the schema to trim nested icon dicts.
 # field -> sub_field -> [keys to keep]
 SUB_FILTERS = {
     "element": {"icon": ["1", "7"]},
@@ -317,67 +334,6 @@ SUB_FILTERS = {
 }
 
 
-def prepend_cdn(obj: Any) -> Any:
-    """Prepend CDN base URL to paths starting with /d/"""
-    if isinstance(obj, str):
-        fixed = CDN_PATH_FIXUPS.get(obj, obj)
-        if fixed.startswith("/d/"):
-            return f"{CDN_BASE}{fixed}"
-        return fixed
-    elif isinstance(obj, dict):
-        return {k: prepend_cdn(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [prepend_cdn(item) for item in obj]
-    return obj
-
-
-def filter_keys(obj: Any, keys: list[str]) -> Any:
-    """Filter object to only specified keys.
-
-    Handles three shapes automatically:
-    - Direct dict (keys match): filter keys directly
-    - Dict of dicts (keys don't match outer): recurse into each value
-    - List of dicts: recurse into each item
-    """
-    keys_set = set(keys)
-
-    if isinstance(obj, dict):
-        if keys_set & set(obj.keys()):
-            # Target keys found at this level - filter directly
-            return {k: v for k, v in obj.items() if k in keys_set}
-        else:
-            # Dict of dicts (e.g. chains, skill keyed by ID) - recurse
-            return {k: filter_keys(v, keys) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [filter_keys(item, keys) for item in obj]
-    return obj
-
-
-def apply_sub_filters(data: dict, filters: dict) -> dict:
-    """Apply nested key filters to trim sub-fields (e.g. element.icon → keep only "1","7")."""
-    for field, sub_filters in filters.items():
-        if field not in data:
-            continue
-
-        value = data[field]
-
-        if isinstance(value, dict):
-            for sub_field, sub_keys in sub_filters.items():
-                if sub_field in value and isinstance(value[sub_field], dict):
-                    keys_set = set(sub_keys)
-                    value[sub_field] = {k: v for k, v in value[sub_field].items() if k in keys_set}
-
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, dict):
-                    for sub_field, sub_keys in sub_filters.items():
-                        if sub_field in item and isinstance(item[sub_field], dict):
-                            keys_set = set(sub_keys)
-                            item[sub_field] = {k: v for k, v in item[sub_field].items() if k in keys_set}
-
-    return data
-
-
 def _has_non_null_skin_color(color: Any) -> bool:
     """Return True if a skin color object contains any non-null override value."""
     if not isinstance(color, dict):
@@ -610,33 +566,14 @@ def extract_sequence_item_ids(role_info: Any) -> dict[int, int]:
     return result
 
 
-def match_sequence_item_ids(
-    raw_characters: list[dict],
-    role_item_ids: dict[int, int],
-) -> dict[int, int]:
-    """Match syncable characters to authoritative RoleInfo waveband items."""
-    char_to_item: dict[int, int] = {}
-    missing: list[int] = []
-    for data in raw_characters:
-        char_id = data.get("id")
-        name_field = data.get("name", {})
-        en_name = name_field.get("en", "") if isinstance(name_field, dict) else str(name_field or "")
-        if not isinstance(char_id, int) or char_id in SKIP_IDS or not en_name:
-            continue
-
-        item_id = role_item_ids.get(char_id)
-        if item_id is None:
-            missing.append(char_id)
-        else:
-            char_to_item[char_id] = item_id
-
-    if missing:
-        raise RuntimeError(
-            "RoleInfo.SpilloverItem is missing or invalid for character IDs: "
-            + ", ".join(str(value) for value in sorted(missing))
-        )
-
-    return char_to_item
+def _syncable_character_id(data: dict) -> int | None:
+    """The id of a character that gets written (and so needs a sequence icon)."""
+    char_id = data.get("id")
+    name_field = data.get("name", {})
+    en_name = name_field.get("en", "") if isinstance(name_field, dict) else str(name_field or "")
+    if not isinstance(char_id, int) or char_id in SKIP_IDS or not en_name:
+        return None
+    return char_id
 
 
 def _fetch_sequence_icon(session: Any, item_id: int) -> tuple[int, str | None]:
@@ -653,82 +590,92 @@ def _fetch_sequence_icon(session: Any, item_id: int) -> tuple[int, str | None]:
         return (item_id, None)
 
 
-def fetch_sequence_icons(raw_characters: list[dict], workers: int | None = None) -> dict[int, str]:
-    """Fetch canonical sequence icons using RoleInfo's waveband item mapping."""
-    try:
-        import requests
-    except ImportError:
-        print("Install requests library: pip install requests")
-        return {}
-
-    session = requests.Session()
-    try:
-        role_info = request_json_with_retry(session, "get", CDN_ROLE_INFO_URL)
-        role_item_ids = extract_sequence_item_ids(role_info)
-        char_to_item = match_sequence_item_ids(raw_characters, role_item_ids)
-    except Exception as error:
-        raise RuntimeError(f"Failed to resolve sequence item mappings from RoleInfo.json: {error}") from error
-
-    if not char_to_item:
-        return {}
-
-    item_ids = sorted(set(char_to_item.values()))
-    actual_workers = workers if workers else 20
-    print(f"Fetching {len(item_ids)} canonical sequence icons with {actual_workers} threads...")
-
-    item_icon_map: dict[int, str] = {}
-    failed: list[int] = []
-    with ThreadPoolExecutor(max_workers=actual_workers) as pool:
-        futures = {pool.submit(_fetch_sequence_icon, session, item_id): item_id for item_id in item_ids}
-        for future in as_completed(futures):
-            item_id, icon = future.result()
-            if icon:
-                item_icon_map[item_id] = icon
-            else:
-                failed.append(item_id)
-
-    if failed:
-        raise RuntimeError(
-            "Failed to resolve canonical sequence icons; refusing to write partial "
-            f"character data. Item IDs: {', '.join(str(value) for value in sorted(failed))}"
-        )
-
-    return {
-        char_id: item_icon_map[item_id]
-        for char_id, item_id in char_to_item.items()
-        if item_id in item_icon_map
-    }
-
-
-def extract_by_schema(data: dict, schema: dict) -> dict:
-    """Extract fields from data according to schema."""
-    output = {}
-
-    for field, rule in schema.items():
-        if field not in data:
-            continue
-
-        value = data[field]
+# --- Sequence icon cache ---
+#
+# Wuthery has no grouped index of item icons: each waveband item is its own
+# Grouped/Item/<id>.json, and every sync fetched one per character, each one
+# subject to the CDN's throttling and retry sleeps. An item's icon does not
+# change once the item is released, so resolved icons are kept in
+# scripts/.cache/sequence-icons.json (git-ignored, never deployed) and only
+# items missing from it (newly released characters) are fetched.
+# --refresh-icons ignores the cache.
+
+SEQUENCE_ICON_CACHE_FILE = Path(__file__).resolve().parent / ".cache" / "sequence-icons.json"
+SEQUENCE_ICON_CACHE_VERSION = 1
+
+
+class SequenceIconCache:
+    """item id -> upstream sequence icon URL, persisted between runs.
+
+    With *refresh*, lookups always miss, so every icon is fetched again and
+    overwrites its entry; entries for items not fetched are kept."""
+
+    def __init__(self, path: Path, items: dict[str, str] | None = None, refresh: bool = False) -> None:
+        self.path = path
+        self.items: dict[str, str] = dict(items or {})
+        self.refresh = refresh
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path, refresh: bool = False) -> "SequenceIconCache":
+        if not path.exists():
+            return cls(path, refresh=refresh)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict) or payload.get("version") != SEQUENCE_ICON_CACHE_VERSION:
+            return cls(path, refresh=refresh)  # Unknown layout: every icon is fetched again.
+        items = payload.get("items") or {}
+        return cls(path, {key: icon for key, icon in items.items() if isinstance(icon, str) and icon}, refresh)
+
+    def get(self, item_id: int) -> str | None:
+        return None if self.refresh else self.items.get(str(item_id))
+
+    def record(self, item_id: int, icon: str) -> None:
+        if self.items.get(str(item_id)) != icon:
+            self.items[str(item_id)] = icon
+            self.dirty = True
+
+    def prune(self, item_ids: set[int]) -> None:
+        """Forget items no character maps to any more (full syncs only)."""
+        keep = {str(item_id) for item_id in item_ids}
+        for key in set(self.items) - keep:
+            del self.items[key]
+            self.dirty = True
+
+    def save(self) -> None:
+        if self.dirty:
+            write_json_atomic(
+                self.path,
+                {"version": SEQUENCE_ICON_CACHE_VERSION, "items": self.items},
+                sort_keys=True,
+                indent=1,
+            )
+            self.dirty = False
 
-        if rule is True:
-            output[field] = prepend_cdn(value)
 
-        elif rule == "value":
-            output[field] = extract_stats(value)
+def fetch_role_item_ids(session: Any) -> dict[int, int]:
+    """RoleInfo.json -> {character id: canonical waveband item id}."""
+    return extract_sequence_item_ids(request_json_with_retry(session, "get", CDN_ROLE_INFO_URL))
 
-        elif isinstance(rule, list):
-            output[field] = prepend_cdn(filter_keys(value, rule))
 
-    return output
+def compile_character_schema(schema: dict) -> Callable[[dict], dict]:
+    """Compile SCHEMA (+ SKILLS_SCHEMA) into a single-pass projector that
+    filters keys, applies CDN_PATH_FIXUPS and the CDN prefix, and SUB_FILTERS."""
+    return compile_schema(
+        schema,
+        cdn_base=CDN_BASE,
+        path_fixups=CDN_PATH_FIXUPS,
+        sub_filters=SUB_FILTERS,
+        handlers={field: extract_stats for field, rule in schema.items() if rule == "value"},
+    )
 
 
 def transform_character(
     data: dict,
-    schema: dict,
+    project: Callable[[dict], dict],
     description_param_map: dict[int, list[str]] | None = None,
     sequence_icon_map: dict[int, str] | None = None,
 ) -> dict | None:
-    """Transform raw CDN character data using schema."""
+    """Transform raw CDN character data with a compile_character_schema() projector."""
     char_id = data.get("id")
     name = data.get("name", {})
     en_name = name.get("en", "") if isinstance(name, dict) else name
@@ -736,8 +683,7 @@ def transform_character(
     if not en_name or char_id in SKIP_IDS:
         return None
 
-    result = extract_by_schema(data, schema)
-    apply_sub_filters(result, SUB_FILTERS)
+    result = project(data)
     if "skins" in result:
         result["skins"] = prune_default_skins(result["skins"], result.get("icon"))
 
@@ -794,7 +740,7 @@ def transform_character(
 
 
 def _strip_game_markup_for_matching(text: str) -> str:
-    return _MARKUP_RE.sub('', _sanitize_game_text(text or ''))
+    return parse_text(text or '', _sanitize_game_text).plain
 
 
 def _extract_damage_type_from_tags(tags: list[dict]) -> str | None:
@@ -1336,78 +1282,210 @@ def _fetch_one(session, filename: str) -> tuple[str, dict | None]:
         return (filename, None)
 
 
-def fetch_cdn_characters(single_id: str | None = None, workers: int | None = None) -> list[dict]:
-    """Fetch character data from CDN, parallelized with threads.
+def list_character_files(session) -> list[str] | None:
+    """Character JSON filenames from the CDN list API (None on an API error)."""
+    list_data = request_json_with_retry(
+        session,
+        "post",
+        CDN_LIST_API,
+        json={"path": "/GameData/Grouped/Character"},
+        headers={"Content-Type": "application/json"},
+    )
+    if list_data.get("code") != 200:
+        print(f"List API error: {list_data.get('message')}")
+        return None
+    files = list_data.get("data", {}).get("content", [])
+    return [f["name"] for f in files if f["name"].endswith(".json")]
 
-    Args:
-        single_id: Optional single character ID to fetch
-        workers: Number of parallel threads. None = all files in parallel
-    """
+
+# --- Overlapped fetch + transform ---
+#
+# Skill.json (the largest single download), RoleInfo.json and the character
+# files used to be fetched one phase after another, and transform only started
+# once all three were done. Here all of them start together in one pool, each
+# sequence item is requested as soon as its character and RoleInfo are both in,
+# and a character is transformed on the main thread the moment its raw JSON,
+# Skill.json and its sequence icon are all available. Transform CPU therefore
+# overlaps the downloads still in flight, and wall time is roughly the slowest
+# fetch chain instead of the sum of the phases.
+
+def fetch_and_transform_characters(
+    schema: dict,
+    single_id: str | None = None,
+    workers: int | None = None,
+    icon_cache: SequenceIconCache | None = None,
+) -> tuple[list[dict], int, int] | None:
+    """Fetch and transform every character concurrently.
+
+    Returns (characters, raw file count, resolved sequence icon count), or
+    None when the character files could not all be fetched (nothing must be
+    written). Skill.json / RoleInfo / sequence icon failures raise, exactly as
+    the sequential fetchers do. Sequence icons found in *icon_cache* are not
+    fetched; fetched ones are recorded in it (the caller saves it)."""
     try:
         import requests
     except ImportError:
         print("Install requests library: pip install requests")
-        return []
+        return None
 
     session = requests.Session()
-
     if single_id:
-        url = f"{CDN_DOWNLOAD_BASE}/{single_id}.json"
-        print(f"Fetching {url}")
+        json_files = [f"{single_id}.json"]
+        print(f"Fetching {CDN_DOWNLOAD_BASE}/{json_files[0]}")
+    else:
+        print("Listing characters from CDN...")
         try:
-            data = request_json_with_retry(session, "get", url)
-            if not isinstance(data, dict):
-                raise ValueError(f"expected an object, got {type(data).__name__}")
-            return [data]
-        except Exception as e:
-            print(f"Failed to fetch {single_id} after retries: {e}")
-        return []
+            json_files = list_character_files(session)
+        except Exception as error:
+            print(f"Error listing CDN: {error}")
+            return None
+        if json_files is None:
+            return None
 
-    print("Listing characters from CDN...")
-    try:
-        list_data = request_json_with_retry(
-            session,
-            "post",
-            CDN_LIST_API,
-            json={"path": "/GameData/Grouped/Character"},
-            headers={"Content-Type": "application/json"},
-        )
+    project = compile_character_schema(schema)
+    actual_workers = workers if workers else 20
+    print(
+        f"Fetching {len(json_files)} character files, Skill.json and RoleInfo.json "
+        f"together with {actual_workers} threads..."
+    )
 
-        if list_data.get("code") != 200:
-            print(f"List API error: {list_data.get('message')}")
-            return []
-
-        files = list_data.get("data", {}).get("content", [])
-        json_files = [f["name"] for f in files if f["name"].endswith(".json")]
-
-        actual_workers = workers if workers else 20
-        print(f"Found {len(json_files)} character files, fetching with {actual_workers} threads...")
-
-        characters = []
-        failed: list[str] = []
-        with ThreadPoolExecutor(max_workers=actual_workers) as pool:
-            futures = {pool.submit(_fetch_one, session, f): f for f in json_files}
-            for future in as_completed(futures):
-                filename, data = future.result()
-                if data:
-                    characters.append(data)
-                    print(f"  Fetched {filename}")
+    raw_by_file: dict[str, dict] = {}
+    failed_files: list[str] = []
+    item_for_char: dict[int, int] = {}
+    missing_items: list[int] = []
+    icon_for_item: dict[int, str] = {}
+    failed_items: list[int] = []
+    cached_items = 0
+    waiting: list[dict] = []  # Raw characters not yet transformable.
+    characters: list[dict] = []
+    shared: dict[str, Any] = {}
+
+    # +2 so the two shared downloads never wait behind character files.
+    with ThreadPoolExecutor(max_workers=actual_workers + 2) as pool:
+        skill_future = pool.submit(fetch_skill_description_params)
+        role_future = pool.submit(fetch_role_item_ids, session)
+        pending: dict[Future, tuple[str, Any]] = {
+            skill_future: ("skill", None),
+            role_future: ("role", None),
+        }
+        for filename in json_files:
+            pending[pool.submit(_fetch_one, session, filename)] = ("character", filename)
+        requested_items: set[int] = set()
+
+        def request_icon(data: dict) -> None:
+            nonlocal cached_items
+            char_id = _syncable_character_id(data)
+            if char_id is None or "role" not in shared:
+                return
+            item_id = shared["role"].get(char_id)
+            if item_id is None:
+                missing_items.append(char_id)
+                return
+            item_for_char[char_id] = item_id
+            if item_id not in requested_items:
+                requested_items.add(item_id)
+                cached = icon_cache.get(item_id) if icon_cache is not None else None
+                if cached:
+                    icon_for_item[item_id] = cached
+                    cached_items += 1
                 else:
-                    failed.append(filename)
+                    pending[pool.submit(_fetch_sequence_icon, session, item_id)] = ("item", item_id)
+
+        def ready(data: dict) -> bool:
+            if "skill" not in shared:
+                return False
+            char_id = _syncable_character_id(data)
+            if char_id is None:
+                return True  # transform_character drops it; no icon needed.
+            item_id = item_for_char.get(char_id)
+            return item_id is not None and (item_id in icon_for_item or item_id in failed_items)
+
+        def transform_ready() -> None:
+            still_waiting = []
+            for data in waiting:
+                if not ready(data):
+                    still_waiting.append(data)
+                    continue
+                char_id = data.get("id")
+                item_id = item_for_char.get(char_id)
+                icon_map = {char_id: icon_for_item[item_id]} if item_id in icon_for_item else {}
+                char = transform_character(data, project, shared["skill"], icon_map)
+                if char:
+                    characters.append(char)
+            waiting[:] = still_waiting
 
-        if failed:
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, tag = pending.pop(future)
+                    if kind == "skill":
+                        shared["skill"] = future.result()
+                    elif kind == "role":
+                        try:
+                            shared["role"] = future.result()
+                        except Exception as error:
+                            raise RuntimeError(
+                                f"Failed to resolve sequence item mappings from RoleInfo.json: {error}"
+                            ) from error
+                        for data in raw_by_file.values():
+                            request_icon(data)
+                    elif kind == "character":
+                        filename, data = future.result()
+                        if not data:
+                            failed_files.append(filename)
+                            continue
+                        print(f"  Fetched {filename}")
+                        raw_by_file[filename] = data
+                        waiting.append(data)
+                        request_icon(data)
+                    else:
+                        item_id, icon = future.result()
+                        if icon:
+                            icon_for_item[item_id] = icon
+                            if icon_cache is not None:
+                                icon_cache.record(item_id, icon)
+                        else:
+                            failed_items.append(item_id)
+                transform_ready()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    if requested_items:
+        print(
+            f"Sequence icons: {cached_items} from the cache, "
+            f"{len(requested_items) - cached_items} fetched"
+        )
+    if icon_cache is not None and not single_id and not failed_files and not missing_items:
+        icon_cache.prune(set(item_for_char.values()))
+
+    if failed_files:
+        if single_id:
+            print(f"Failed to fetch {single_id} after retries")
+        else:
             print(
-                f"ERROR: fetched only {len(characters)}/{len(json_files)} character files; "
-                f"refusing to replace Characters.json. Failed: {', '.join(sorted(failed))}"
+                f"ERROR: fetched only {len(raw_by_file)}/{len(json_files)} character files; "
+                f"refusing to replace the character data. Failed: {', '.join(sorted(failed_files))}"
             )
-            return []
-
-        return characters
-
-    except Exception as e:
-        print(f"Error listing CDN: {e}")
+        return None
+    if missing_items:
+        raise RuntimeError(
+            "Failed to resolve sequence item mappings from RoleInfo.json: "
+            "RoleInfo.SpilloverItem is missing or invalid for character IDs: "
+            + ", ".join(str(value) for value in sorted(missing_items))
+        )
+    if failed_items:
+        raise RuntimeError(
+            "Failed to resolve canonical sequence icons; refusing to write partial "
+            f"character data. Item IDs: {', '.join(str(value) for value in sorted(failed_items))}"
+        )
+    if waiting:
+        raise RuntimeError(f"{len(waiting)} characters were fetched but never became transformable")
 
-    return []
+    icon_count = sum(1 for item_id in item_for_char.values() if item_id in icon_for_item)
+    return characters, len(raw_by_file), icon_count
 
 
 # --- Main ---
@@ -1420,8 +1498,11 @@ def main():
                        help="Fetch from CDN")
     parser.add_argument("--include-skills", action="store_true",
                        help="Include full skill multiplier data (off by default)")
-    parser.add_argument("--individual", action="store_true",
-                       help="Write per-character files instead of combined Characters.json")
+    layout_argument(parser)
+    # Per-character files alongside Characters.json: the site still reads the
+    # combined file, so the old flag must never remove it.
+    parser.add_argument("--individual", action="store_const", dest="layout", const="both",
+                       help="Alias for --layout both (per-character shards, Characters.json kept)")
     parser.add_argument("--workers", "-w", type=int, default=None,
                        help="Parallel fetch threads (default: all files in parallel)")
     parser.add_argument("--output", "-o", type=Path, default=OUTPUT_DIR,
@@ -1430,6 +1511,9 @@ def main():
                        help="Preview output without writing files")
     parser.add_argument("--pretty", action="store_true",
                        help="Pretty print JSON (default: compact)")
+    parser.add_argument("--refresh-icons", action="store_true",
+                       help=f"Re-fetch every sequence icon instead of reading {SEQUENCE_ICON_CACHE_FILE.name}")
+    split_argument(parser)
 
     args = parser.parse_args()
 
@@ -1438,15 +1522,24 @@ def main():
     if args.include_skills:
         schema.update(SKILLS_SCHEMA)
 
+    data_dir = args.output.parent
+    if args.fetch and args.split_langs and args.layout == "sharded":
+        parser.error("--split-langs splits Characters.json; use --layout combined or both")
     if not args.fetch:
-        # No CDN fetch, re-parse bonus fields on existing Characters.json and exit.
-        combined_path = args.output.parent / "Characters.json"
-        if not combined_path.exists():
-            parser.error(f"No Characters.json found at {combined_path}. Use --fetch to sync from CDN.")
+        # No CDN fetch, re-parse bonus fields on the existing character data and exit.
+        layout = current_layout(data_dir)
+        if layout is None:
+            parser.error(f"No Characters.json or character shards found in {data_dir}. Use --fetch to sync from CDN.")
             return 1
-        print(f"Re-parsing sequence bonuses and preferred stats in {combined_path} ...")
-        with open(combined_path, encoding="utf-8") as f:
-            characters = json.load(f)
+        if args.split_langs and layout == "sharded":
+            parser.error("--split-langs splits Characters.json, which the sharded layout does not have")
+        print(f"Re-parsing sequence bonuses and preferred stats in {data_dir} ({layout} layout) ...")
+        characters = load_characters(data_dir)
+        # The shards hold mirrored URLs; hashing them would make the next
+        # --fetch see every shard as changed. Characters this pass leaves
+        # untouched keep the hash taken at sync time.
+        synced_hashes = index_hashes(data_dir)
+        loaded_hashes = {str(char.get("id")): record_hash(char) for char in characters}
         total = 0
         inherent_total = 0
         preferred_updates = 0
@@ -1483,35 +1576,37 @@ def main():
             elif "preferredStats" in char:
                 preferred_updates += 1
                 char.pop("preferredStats", None)
+        kept_hashes = {
+            key: synced_hashes[key]
+            for char in characters
+            if (key := str(char.get("id"))) in synced_hashes and record_hash(char) == loaded_hashes[key]
+        }
         if not args.dry_run:
-            write_json_atomic(
-                combined_path,
+            save_characters(
+                data_dir,
                 characters,
-                separators=(",", ":"),
-                ensure_ascii=False,
+                layout,
+                {"separators": (",", ":"), "ensure_ascii": False},
+                split_langs=args.split_langs,
+                hashes=kept_hashes,
             )
-            print(f"Embedded {total} sequence bonuses, {inherent_total} inherent bonuses and refreshed {preferred_updates} preferred stat sets → {combined_path}")
+            print(f"Embedded {total} sequence bonuses, {inherent_total} inherent bonuses and refreshed {preferred_updates} preferred stat sets → {data_dir}")
         else:
             print(f"[dry-run] Would embed {total} sequence bonuses, {inherent_total} inherent bonuses and refresh {preferred_updates} preferred stat sets")
         return 0
 
-    raw_characters = fetch_cdn_characters(single_id=args.id, workers=args.workers)
-    if not raw_characters:
+    icon_cache = SequenceIconCache.load(SEQUENCE_ICON_CACHE_FILE, refresh=args.refresh_icons)
+    fetched = fetch_and_transform_characters(schema, single_id=args.id, workers=args.workers, icon_cache=icon_cache)
+    if not args.dry_run:
+        # Icons resolved so far stay valid even when the character fetch failed.
+        icon_cache.save()
+    if not fetched:
         print("No complete character data to save")
         return 1
-    description_param_map = fetch_skill_description_params()
-    sequence_icon_map = fetch_sequence_icons(raw_characters, workers=args.workers)
-
-    print(f"\nLoaded {len(raw_characters)} raw character files")
-    print(f"Resolved {len(sequence_icon_map)} canonical sequence icons")
-
-    # Transform characters using schema.
-    characters = []
-    for data in raw_characters:
-        char = transform_character(data, schema, description_param_map, sequence_icon_map)
-        if char:
-            characters.append(char)
+    characters, raw_count, icon_count = fetched
 
+    print(f"\nLoaded {raw_count} raw character files")
+    print(f"Resolved {icon_count} canonical sequence icons")
     print(f"Transformed {len(characters)} characters")
 
     if not characters:
@@ -1520,24 +1615,13 @@ def main():
 
     characters.sort(key=lambda c: c.get("name", {}).get("en", ""))
 
-    combined_path = args.output.parent / "Characters.json"
-    combined_characters = characters
-    if args.id and not args.individual:
-        if not combined_path.exists():
+    if args.id:
+        if current_layout(data_dir) is None:
             parser.error(
-                f"Cannot merge character {args.id}: {combined_path} does not exist. "
-                "Run a full sync first or use --individual."
+                f"Cannot merge character {args.id}: no Characters.json or character shards in {data_dir}. "
+                "Run a full sync first."
             )
-        with combined_path.open(encoding="utf-8") as handle:
-            existing = json.load(handle)
-        if not isinstance(existing, list):
-            parser.error(f"Expected a JSON array in {combined_path}")
-        combined_characters = merge_records_by_id(existing, characters)
-        combined_characters.sort(key=lambda c: c.get("name", {}).get("en", ""))
-        print(
-            f"Single-character mode: merging {args.id} into the "
-            f"{len(existing)}-record canonical file"
-        )
+        print(f"Single-character mode: merging {args.id} into the existing character data")
 
     json_kwargs = (
         {"indent": 2, "ensure_ascii": False}
@@ -1556,25 +1640,8 @@ def main():
             if len(output_json) > 5000:
                 print(f"\n... [{size_kb:.1f}KB total, truncated]")
     else:
-        if args.individual:
-            # Write per-character files
-            args.output.mkdir(parents=True, exist_ok=True)
-
-            for char in characters:
-                char_id = char["id"]
-                en_name = char.get("name", {}).get("en", str(char_id))
-                output_path = args.output / f"{char_id}.json"
-                write_json_atomic(output_path, char, **json_kwargs)
-                size_kb = output_path.stat().st_size / 1024
-                print(f"  Saved {output_path.name} ({en_name}) [{size_kb:.1f}KB]")
-
-            print(f"\nDone: {len(characters)} characters → {args.output}")
-        else:
-            # Default: combined Characters.json
-            write_json_atomic(combined_path, combined_characters, **json_kwargs)
-            size_kb = combined_path.stat().st_size / 1024
-            print(f"  Saved Characters.json [{size_kb:.1f}KB] ({len(combined_characters)} characters)")
-            print(f"\nDone: {len(combined_characters)} characters → {combined_path}")
+        save_characters(data_dir, characters, args.layout, json_kwargs, merge=bool(args.id), split_langs=args.split_langs)
+        print(f"\nDone: {len(characters)} characters → {data_dir} ({args.layout} layout)")
 
     return 0
 
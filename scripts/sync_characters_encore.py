@@ -23,6 +23,7 @@ import requests
 
 from cdn_config import encore_request_json
 
+from data_shards import load_character
 from sync_characters import (
     _normalize_param_value,
     _sanitize_i18n_value,
@@ -525,15 +526,7 @@ def transform_character(locales: dict[str, dict]) -> dict:
 
 
 def load_existing_character(char_id: int) -> dict | None:
-    path = OUTPUT_DIR / "Characters.json"
-    if not path.exists():
-        return None
-    with path.open("r", encoding="utf-8") as f:
-        characters = json.load(f)
-    for character in characters:
-        if isinstance(character, dict) and character.get("id") == char_id:
-            return character
-    return None
+    return load_character(OUTPUT_DIR, char_id)
 
 
 def diff_paths(left: Any, right: Any, prefix: str = "") -> list[str]:
@@ -575,7 +568,7 @@ def main() -> None:
     if args.compare:
         existing = load_existing_character(args.id)
         if not existing:
-            print(f"No existing character {args.id} found in {OUTPUT_DIR / 'Characters.json'}")
+            print(f"No existing character {args.id} found in {OUTPUT_DIR}")
         else:
             paths = diff_paths(existing, character)
             print(f"Compared character {args.id}: {len(paths)} differing paths")
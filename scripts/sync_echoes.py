@@ -8,6 +8,8 @@ Usage:
     python sync_echoes.py --fetch                     # Sync from CDN
     python sync_echoes.py --fetch --id 60000425      # Single phantom from CDN
     python sync_echoes.py --fetch --dry-run --pretty
+    python sync_echoes.py --fetch --split-langs       # Also write the per-language split (l10n_split.py)
+    python sync_echoes.py --fetch --refresh-names     # Re-fetch the Encore name fallback instead of using the cache
 """
 
 import json
@@ -22,11 +24,20 @@ from cdn_config import (
     request_json_with_retry,
     write_json_atomic,
 )
+from game_catalog import PHANTOM_SKIN_PREFIX, EchoTable, echo_record
+from l10n_split import save_split, split_argument
+from legacy_ids import load_legacy_index
 
 CDN_LIST_API = f"{CDN_BASE}/api/fs/list"
 CDN_DOWNLOAD_BASE = f"{CDN_BASE}/d/GameData/Grouped/Phantom"
 # Scripts in /scripts; output in /public/Data
 OUTPUT_FILE = Path(__file__).parent.parent / "public/Data/Echoes.json"
+# Encore English names by monster id, for 5-star rows Wuthery has no English
+# name for. The Encore list is fetched only when a blank row's monster id is
+# not cached yet; --refresh-names fetches it regardless. The cache is kept
+# under the git-ignored scripts/.cache/, out of the deployed public/ tree.
+ENCORE_NAME_CACHE_FILE = Path(__file__).resolve().parent / ".cache" / "encore-echo-names.json"
+ENCORE_NAME_CACHE_VERSION = 1
 
 STAT_PATTERNS = [
     (re.compile(r"\{(\d+)\}\s*(?:more\s+)?Glacio DMG(?: Bonus)?\b", re.I), "Glacio DMG"),
@@ -150,8 +161,7 @@ def extract_main_slot_bonuses(skill: dict) -> list[dict] | None:
 
 def extract_legacy_id(icon_path: str) -> str | None:
     """Extract legacy numeric ID from icon path like T_IconMonsterGoods_992_UI.png."""
-    m = re.search(r"T_IconMonsterGoods_(\d+)_UI\.png", icon_path)
-    return m.group(1) if m else None
+    return load_legacy_index().icon_id("echoes", icon_path)
 
 
 def fetch_encore_echo_name_index() -> dict[int, str]:
@@ -189,6 +199,55 @@ def fetch_encore_echo_name_index() -> dict[int, str]:
     return out
 
 
+class EncoreEchoNameCache:
+    """monster id -> Encore English echo name, persisted between runs."""
+
+    def __init__(self, path: Path, names: dict[int, str] | None = None, refresh: bool = False) -> None:
+        self.path = path
+        self.names: dict[int, str] = dict(names or {})
+        self.refresh = refresh
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path, refresh: bool = False) -> "EncoreEchoNameCache":
+        if not path.exists():
+            return cls(path, refresh=refresh)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict) or payload.get("version") != ENCORE_NAME_CACHE_VERSION:
+            return cls(path, refresh=refresh)  # Unknown layout: fetched again when needed.
+        names = {}
+        for key, name in (payload.get("names") or {}).items():
+            if isinstance(name, str) and name and str(key).isdigit():
+                names[int(key)] = name
+        return cls(path, names, refresh)
+
+    def resolve(self, monster_ids: set[int]) -> dict[int, str]:
+        """Names for *monster_ids*, fetching the Encore list only when one of
+        them is not cached (or on refresh). Raises like the fetch."""
+        missing = monster_ids if self.refresh else monster_ids - self.names.keys()
+        if missing:
+            fetched = fetch_encore_echo_name_index()
+            if any(self.names.get(key) != name for key, name in fetched.items()):
+                self.names.update(fetched)
+                self.dirty = True
+            self.refresh = False
+            print(f"Encore echo names: fetched the list ({len(fetched)} names) for {len(missing)} uncached monster ids")
+        else:
+            print(f"Encore echo names: {len(monster_ids)} monster ids answered from {self.path.name}")
+        return {key: self.names[key] for key in monster_ids if key in self.names}
+
+    def save(self) -> None:
+        if self.dirty:
+            write_json_atomic(
+                self.path,
+                {"version": ENCORE_NAME_CACHE_VERSION, "names": {str(key): name for key, name in self.names.items()}},
+                ensure_ascii=False,
+                sort_keys=True,
+                indent=1,
+            )
+            self.dirty = False
+
+
 def _apply_name_fallback(raw: dict, encore_names: dict[int, str]) -> dict:
     name = dict(raw.get("name") or {})
     if not name.get("en"):
@@ -302,23 +361,36 @@ def fetch_cdn_echoes(single_id: str | None = None, workers: int | None = None) -
 def _process_raw_list(
     raw_list: list[dict],
     existing_echoes: list[dict] | None = None,
+    name_cache: EncoreEchoNameCache | None = None,
 ) -> tuple[list[dict], dict]:
-    """Filter, deterministically dedupe, and merge base/phantom echoes."""
+    """Filter, deterministically dedupe, and merge base/phantom echoes.
+
+    Blank English names are filled from *name_cache* (or a fresh Encore
+    list fetch without one)."""
     base_echoes: dict[str, dict] = {
         str(echo.get("name", {}).get("en") or ""): echo
         for echo in existing_echoes or []
         if isinstance(echo, dict) and isinstance(echo.get("name"), dict)
     }
+    # id -> the name it is stored under, so a renamed echo replaces its old row.
+    name_by_id = {str(echo.get("id")): name for name, echo in base_echoes.items()}
     phantom_skins: list[dict] = []
     skipped_cosmetic = skipped_rarity = duplicates = 0
     names_seen_this_run: set[str] = set()
-    needs_name_fallback = any(
-        raw.get("phantomType") == 1
+    blank_monster_ids = {
+        raw.get("monsterId")
+        for raw in raw_list
+        if raw.get("phantomType") == 1
         and raw.get("rarity", {}).get("id") == 5
         and not raw.get("name", {}).get("en")
-        for raw in raw_list
-    )
-    encore_names = fetch_encore_echo_name_index() if needs_name_fallback else {}
+        and raw.get("monsterId") is not None
+    }
+    encore_names: dict[int, str] = {}
+    if blank_monster_ids:
+        if name_cache is not None:
+            encore_names = name_cache.resolve(blank_monster_ids)
+        else:
+            encore_names = fetch_encore_echo_name_index()
 
     def raw_sort_key(raw: dict) -> tuple[int, str]:
         try:
@@ -334,7 +406,7 @@ def _process_raw_list(
             skipped_rarity += 1
             continue
         name_en = _apply_name_fallback(raw, encore_names).get("en", "")
-        if name_en.startswith("Phantom: "):
+        if name_en.startswith(PHANTOM_SKIN_PREFIX):
             phantom_skins.append(raw)
             continue
         if name_en in names_seen_this_run:
@@ -342,27 +414,26 @@ def _process_raw_list(
             continue
         transformed = transform_echo(raw, encore_names)
         transformed_id = str(transformed.get("id"))
-        for old_name, old_echo in list(base_echoes.items()):
-            if old_name != name_en and str(old_echo.get("id")) == transformed_id:
-                del base_echoes[old_name]
+        old_name = name_by_id.get(transformed_id)
+        if old_name is not None and old_name != name_en:
+            base_echoes.pop(old_name, None)
+        replaced = base_echoes.get(name_en)
+        if replaced is not None and name_by_id.get(str(replaced.get("id"))) == name_en:
+            del name_by_id[str(replaced.get("id"))]
         base_echoes[name_en] = transformed
+        name_by_id[transformed_id] = name_en
         names_seen_this_run.add(name_en)
 
     merged = orphaned = 0
+    # The skin name doesn't always spell the base name the same way
+    # ("Phantom: Nightmare Crownless" -> "Nightmare: Crownless"); EchoTable
+    # matches on a separator-folded name key, then on the SG icon number.
+    table = EchoTable(echo_record(echo) for echo in base_echoes.values())
     for skin in phantom_skins:
-        base_name = skin["name"]["en"][len("Phantom: "):]
-        if base_name not in base_echoes:
-            for attempt in [
-                base_name.replace("Nightmare ", "Nightmare: "),
-                base_name.replace("Reminiscence ", "Reminiscence: "),
-                base_name.replace(" - ", ": "),
-            ]:
-                if attempt in base_echoes:
-                    base_name = attempt
-                    break
-        base = base_echoes.get(base_name)
+        skin_icon = skin["icon"].get("icon", "")
+        base = table.skin_base(_apply_name_fallback(skin, encore_names).get("en", ""), skin_icon)
         if base:
-            base["phantomIcon"] = skin["icon"].get("icon", "")
+            base.raw["phantomIcon"] = skin_icon
             merged += 1
         else:
             print(f"  Warning: orphaned phantom skin \"{skin['name']['en']}\" ({skin['id']})")
@@ -400,6 +471,9 @@ def main() -> int:
     parser.add_argument("--workers", "-w", type=int, default=None, help="Parallel fetch threads")
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing")
     parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON")
+    parser.add_argument("--refresh-names", action="store_true",
+                        help=f"Re-fetch the Encore name fallback instead of reading {ENCORE_NAME_CACHE_FILE.name}")
+    split_argument(parser)
     args = parser.parse_args()
 
     if not args.fetch:
@@ -428,7 +502,8 @@ def main() -> int:
         )
 
     print(f"\nProcessing {len(raw_list)} raw phantom entries...")
-    echoes, stats = _process_raw_list(raw_list, existing_echoes)
+    name_cache = EncoreEchoNameCache.load(ENCORE_NAME_CACHE_FILE, refresh=args.refresh_names)
+    echoes, stats = _process_raw_list(raw_list, existing_echoes, name_cache)
 
     s = stats
     print("\nResults:")
@@ -452,6 +527,11 @@ def main() -> int:
         kwargs = {"indent": 2, "ensure_ascii": False} if args.pretty else {"separators": (",", ":"), "ensure_ascii": False}
         write_json_atomic(OUTPUT_FILE, echoes, **kwargs)
         print(f"\nWrote {len(echoes)} echoes to {OUTPUT_FILE}")
+        name_cache.save()
+        load_legacy_index().save()
+        if args.split_langs:
+            save_split(OUTPUT_FILE.parent, OUTPUT_FILE.name, echoes, kwargs)
+    load_legacy_index().report()
     return 0
 
 
@@ -31,6 +31,11 @@ from cdn_config import (  # noqa: E402
     merge_records_by_id,
     write_json_atomic,
 )
+from data_shards import layout_argument, save_characters  # noqa: E402
+from l10n_split import save_split, split_argument  # noqa: E402
+from legacy_ids import LegacyIdIndex, load_legacy_index  # noqa: E402
+from localization_index import load_localization_index  # noqa: E402
+from game_catalog import PHANTOM_SKIN_PREFIX, EchoTable, echo_record  # noqa: E402
 from sync_characters import get_preferred_substats  # noqa: E402
 from sync_characters_encore import (  # noqa: E402
     ENCORE_LANGS,
@@ -42,7 +47,6 @@ from sync_characters_encore import (  # noqa: E402
     transform_character,
 )
 from sync_weapons import (  # noqa: E402
-    _load_legacy_weapon_name_index,
     _resolve_legacy_weapon_id,
     dedupe_semantic_weapon_aliases,
     extract_unconditional_passive_bonuses,
@@ -84,7 +88,6 @@ PROP_ID_TO_ATTR = {
     10010: "Def",
 }
 
-LEGACY_ECHO_ID_RE = re.compile(r"T_IconMonsterGoods_(\d+)_UI")
 NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?%?")
 
 
@@ -92,12 +95,14 @@ def _json_kwargs(pretty: bool) -> dict[str, Any]:
     return {"indent": 2, "ensure_ascii": False} if pretty else {"separators": (",", ":"), "ensure_ascii": False}
 
 
-def _write_json(path: Path, data: Any, dry_run: bool, pretty: bool) -> None:
+def _write_json(path: Path, data: Any, dry_run: bool, pretty: bool, split: bool = False) -> None:
     if dry_run:
         print(f"[DRY RUN] Would write {path}")
         return
     write_json_atomic(path, data, **_json_kwargs(pretty))
     print(f"Wrote {path} ({len(data) if isinstance(data, list) else 'object'})")
+    if split:
+        save_split(path.parent, path.name, data, _json_kwargs(pretty))
 
 
 def _load_json(path: Path, default: Any) -> Any:
@@ -113,6 +118,7 @@ def _merge_by_id(
     pretty: bool,
     sort_key,
     normalize=None,
+    split: bool = False,
 ) -> list[dict]:
     existing = _load_json(path, [])
     if not isinstance(existing, list):
@@ -121,7 +127,7 @@ def _merge_by_id(
     if normalize is not None:
         merged = normalize(merged)
     merged.sort(key=sort_key)
-    _write_json(path, merged, dry_run, pretty)
+    _write_json(path, merged, dry_run, pretty, split)
     return merged
 
 
@@ -243,17 +249,18 @@ def sync_characters(args: argparse.Namespace) -> list[dict]:
                 print(f"  ERROR character {char_id}: {exc}")
                 raise
     _backfill_rover_skill_data(characters)
-    if args.merge:
-        characters = _merge_by_id(
-            DATA_DIR / "Characters.json",
+    characters.sort(key=lambda c: c.get("name", {}).get("en", ""))
+    if args.dry_run:
+        print(f"[DRY RUN] Would write {len(characters)} characters to {DATA_DIR} ({args.character_layout} layout)")
+    else:
+        save_characters(
+            DATA_DIR,
             characters,
-            args.dry_run,
-            args.pretty,
-            lambda c: c.get("name", {}).get("en", ""),
+            args.character_layout,
+            _json_kwargs(args.pretty),
+            merge=args.merge,
+            split_langs=args.split_langs,
         )
-    else:
-        characters.sort(key=lambda c: c.get("name", {}).get("en", ""))
-        _write_json(DATA_DIR / "Characters.json", characters, args.dry_run, args.pretty)
     return characters
 
 
@@ -320,7 +327,7 @@ def _weapon_effect_to_placeholders(desc: str, desc_params: list) -> str:
     return _WEAPON_SPAN_RE.sub(repl, desc)
 
 
-def _transform_weapon(locales: dict[str, dict], legacy_index: dict[str, list[str]]) -> dict | None:
+def _transform_weapon(locales: dict[str, dict], legacy: LegacyIdIndex) -> dict | None:
     en = locales["en"]
     wid = int(en.get("ItemId") or 0)
     name_en = str(en.get("WeaponName") or "")
@@ -345,7 +352,7 @@ def _transform_weapon(locales: dict[str, dict], legacy_index: dict[str, list[str
         "params": _weapon_params(en),
         "stats": _weapon_stats(en),
     }
-    legacy_id = _resolve_legacy_weapon_id({"name": weapon["name"]}, legacy_index)
+    legacy_id = _resolve_legacy_weapon_id({"name": weapon["name"]}, legacy)
     weapon["legacyId"] = legacy_id or str(wid)
     passive = extract_unconditional_passive_bonuses(_weapon_raw_for_passive(weapon))
     if passive:
@@ -361,7 +368,7 @@ def sync_weapons(args: argparse.Namespace) -> list[dict]:
         ids = [int(v) for v in _new_payload().get("weapon", [])]
     if not ids:
         ids = _list_ids("weapon", "weapons")
-    legacy_index = _load_legacy_weapon_name_index()
+    legacy = load_legacy_index()
     print(f"Fetching {len(ids)} Encore weapons...")
     weapons: list[dict] = []
     with ThreadPoolExecutor(max_workers=args.workers) as pool:
@@ -372,7 +379,7 @@ def sync_weapons(args: argparse.Namespace) -> list[dict]:
         }
         for future in as_completed(futures):
             wid = futures[future]
-            weapon = _transform_weapon(future.result(), legacy_index)
+            weapon = _transform_weapon(future.result(), legacy)
             if weapon:
                 weapons.append(weapon)
                 print(f"  weapon {wid}")
@@ -384,19 +391,15 @@ def sync_weapons(args: argparse.Namespace) -> list[dict]:
             args.pretty,
             lambda w: w.get("name", {}).get("en", ""),
             dedupe_semantic_weapon_aliases,
+            args.split_langs,
         )
     else:
         weapons = dedupe_semantic_weapon_aliases(weapons)
         weapons.sort(key=lambda w: w.get("name", {}).get("en", ""))
-        _write_json(DATA_DIR / "Weapons.json", weapons, args.dry_run, args.pretty)
+        _write_json(DATA_DIR / "Weapons.json", weapons, args.dry_run, args.pretty, args.split_langs)
     return weapons
 
 
-def _extract_legacy_echo_id(icon: str) -> str | None:
-    match = LEGACY_ECHO_ID_RE.search(icon or "")
-    return match.group(1) if match else None
-
-
 def _echo_name_i18n(locales: dict[str, dict]) -> dict[str, str]:
     return i18n(locales, lambda data: data.get("MonsterName", ""))
 
@@ -462,7 +465,7 @@ def _transform_echo(locales: dict[str, dict]) -> dict | None:
     if en.get("PhantomType") != 1 or en.get("QualityId") != 5:
         return None
     name_en = str(en.get("MonsterName") or "")
-    if name_en.startswith("Phantom: "):
+    if name_en.startswith(PHANTOM_SKIN_PREFIX):
         return None
     icon = asset_url(en.get("Icon", ""))
     skill = en.get("Skill") or {}
@@ -478,7 +481,7 @@ def _transform_echo(locales: dict[str, dict]) -> dict | None:
             "description": description,
             "params": skill.get("LevelDescStrArray", []),
         },
-        "legacyId": _extract_legacy_echo_id(icon) or str(en.get("ItemId") or ""),
+        "legacyId": load_legacy_index().icon_id("echoes", icon) or str(en.get("ItemId") or ""),
     }
     bonuses = extract_main_slot_bonuses({
         "descriptionEx": {"en": description.get("en", "")},
@@ -519,7 +522,7 @@ def sync_echoes(args: argparse.Namespace) -> list[dict]:
             locales = future.result()
             en = locales["en"]
             name_en = str(en.get("MonsterName") or "")
-            if name_en.startswith("Phantom: ") and en.get("QualityId") == 5:
+            if name_en.startswith(PHANTOM_SKIN_PREFIX) and en.get("QualityId") == 5:
                 phantom_skins.append(en)
                 continue
             if en.get("PhantomType") != 1 or en.get("QualityId") != 5:
@@ -538,34 +541,26 @@ def sync_echoes(args: argparse.Namespace) -> list[dict]:
 
     combined_by_id = dict(existing_by_id)
     combined_by_id.update(incoming_by_id)
-    echoes_by_name: dict[str, dict] = {
-        str(echo.get("name", {}).get("en") or ""): echo
+    # Same last-wins-by-English-name view sync_lb/sync_backend read through.
+    table = EchoTable(
+        echo_record(echo)
         for echo in combined_by_id.values()
         if isinstance(echo.get("name"), dict)
-    }
+    )
     orphaned = 0
     for skin in phantom_skins:
-        base_name = str(skin.get("MonsterName") or "")[len("Phantom: "):]
-        if base_name not in echoes_by_name:
-            # The skin name doesn't always spell the base name the same way
-            # (e.g. "Phantom: Nightmare Crownless" -> "Nightmare: Crownless",
-            # "Phantom: Twin Nova - Collapsar Blade" -> "Twin Nova: Collapsar Blade").
-            for attempt in (
-                base_name.replace("Nightmare ", "Nightmare: "),
-                base_name.replace("Reminiscence ", "Reminiscence: "),
-                base_name.replace(" - ", ": "),
-            ):
-                if attempt in echoes_by_name:
-                    base_name = attempt
-                    break
-        base = echoes_by_name.get(base_name)
+        # The skin name doesn't always spell the base name the same way
+        # (e.g. "Phantom: Nightmare Crownless" -> "Nightmare: Crownless",
+        # "Phantom: Twin Nova - Collapsar Blade" -> "Twin Nova: Collapsar Blade").
+        skin_icon = asset_url(skin.get("Icon", ""))
+        base = table.skin_base(str(skin.get("MonsterName") or ""), skin_icon)
         if base:
-            base["phantomIcon"] = asset_url(skin.get("Icon", ""))
+            base.raw["phantomIcon"] = skin_icon
         else:
             orphaned += 1
             print(f"  Warning: orphaned phantom skin {str(skin.get('MonsterName'))!r}")
-    echoes = sorted(echoes_by_name.values(), key=lambda e: (-e["cost"], e.get("name", {}).get("en", "")))
-    _write_json(DATA_DIR / "Echoes.json", echoes, args.dry_run, args.pretty)
+    echoes = sorted((record.raw for record in table.by_name.values()), key=lambda e: (-e["cost"], e.get("name", {}).get("en", "")))
+    _write_json(DATA_DIR / "Echoes.json", echoes, args.dry_run, args.pretty, args.split_langs)
     return echoes
 
 
@@ -583,7 +578,9 @@ def sync_fetters(args: argparse.Namespace) -> list[dict]:
         print(f"Appending {len(encore_fetters)} Encore-only fetter groups...")
         fetters.extend(encore_fetters)
         fetters.sort(key=lambda f: int(f.get("id") or 0))
-    _write_json(DATA_DIR / "Fetters.json", fetters, args.dry_run, args.pretty)
+    _write_json(DATA_DIR / "Fetters.json", fetters, args.dry_run, args.pretty, args.split_langs)
+    if not args.dry_run:
+        load_localization_index().save()
     return fetters
 
 
@@ -772,6 +769,8 @@ def main() -> int:
     parser.add_argument("--echo-ids", default="", help="Comma-separated Encore echo IDs to fetch")
     parser.add_argument("--workers", "-w", type=int, default=6)
     parser.add_argument("--lang-workers", type=int, default=13, help="Parallel per-language requests for one entity")
+    layout_argument(parser, "--character-layout")
+    split_argument(parser)
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--pretty", action="store_true")
     args = parser.parse_args()
@@ -779,6 +778,8 @@ def main() -> int:
         parser.error("--workers and --lang-workers must both be at least 1")
     if args.id is not None and args.only not in {"characters", "weapons", "echoes"}:
         parser.error("--id requires --only characters, --only weapons, or --only echoes")
+    if args.split_langs and args.character_layout == "sharded" and args.only in {"all", "characters"}:
+        parser.error("--split-langs splits Characters.json; use --character-layout combined or both")
 
     explicit_ids = {
         "characters": bool(_parse_ids(args.character_ids)),
@@ -804,6 +805,9 @@ def main() -> int:
         sync_echoes(args)
     if args.only in {"all", "fetters"}:
         sync_fetters(args)
+    if not args.dry_run:
+        load_legacy_index().save()
+    load_legacy_index().report()
     return 0
 
 
@@ -1,8 +1,8 @@
 """
 Sync fetter data to public/Data/Fetters.json.
 
-Fetches PhantomFetters.json, PhantomFetterGroups.json, and ConfigDBParsed/PhantomFetter.json,
-then merges them into one file keyed by FetterGroup ID (the same IDs used in Echo.fetter arrays).
+Fetches PhantomFetters.json, PhantomFetterGroups.json, and ConfigDBParsed/PhantomFetter.json
+(concurrently, through the cached localization_index.py loader), then merges them into one file keyed by FetterGroup ID (the same IDs used in Echo.fetter arrays).
 
 The smallest piece-count tier is still exposed in top-level fields for backward
 compatibility (2-piece for most sets, 3-piece for 3-piece-only sets), and all
@@ -32,22 +32,15 @@ Usage:
     python sync_fetters.py            # Fetch and write Fetters.json
     python sync_fetters.py --dry-run  # Preview without writing
     python sync_fetters.py --pretty   # Pretty-print output
+    python sync_fetters.py --split-langs  # Also write the per-language split (l10n_split.py)
 """
 
 import json
 import argparse
 from pathlib import Path
-from cdn_config import CDN_BASE, request_json_with_retry, write_json_atomic
-
-try:
-    import requests
-except ImportError:
-    print("pip install requests")
-    raise SystemExit(1)
-
-FETTERS_URL  = f"{CDN_BASE}/d/GameData/Grouped/LocalizationIndex/PhantomFetters.json"
-GROUPS_URL   = f"{CDN_BASE}/d/GameData/Grouped/LocalizationIndex/PhantomFetterGroups.json"
-FETTERS_CONFIG_URL = f"{CDN_BASE}/d/GameData/ConfigDBParsed/PhantomFetter.json"
+from cdn_config import CDN_BASE, write_json_atomic
+from l10n_split import save_split, split_argument
+from localization_index import FETTER_FILES, LocalizationIndex, load_localization_index
 
 OUTPUT = Path(__file__).parent.parent / "public/Data/Fetters.json"
 
@@ -86,8 +79,8 @@ def build_piece_effect(piece_count: int, fetter: dict, config_fetter: dict | Non
     }
 
 
-def fetch_and_build(session: "requests.Session | None" = None) -> list[dict]:
-    """Fetch the three localization-index files and build the Fetters.json list.
+def fetch_and_build(index: LocalizationIndex | None = None) -> list[dict]:
+    """Load the three localization-index files and build the Fetters.json list.
 
     Exposed so the Encore pipeline (`sync_encore.py`) can reuse Wuthery's
     structured fetter data: Encore's echo FetterGroups carry the set bonus only
@@ -95,36 +88,16 @@ def fetch_and_build(session: "requests.Session | None" = None) -> list[dict]:
     bonuses must come from this localization index. It is a small, reliable
     3-file fetch (not the flaky large-parallel pattern Encore otherwise avoids).
     """
-    session = session or requests.Session()
-
-    print("Fetching PhantomFetters.json ...")
-    fetters_raw = request_json_with_retry(session, "get", FETTERS_URL)
-    if not isinstance(fetters_raw, list):
-        raise ValueError("Unexpected PhantomFetters payload; expected a list")
-    print(f"  {len(fetters_raw)} fetter entries")
-
-    print("Fetching PhantomFetterGroups.json ...")
-    groups_raw = request_json_with_retry(session, "get", GROUPS_URL)
-    if not isinstance(groups_raw, list):
-        raise ValueError("Unexpected PhantomFetterGroups payload; expected a list")
-    print(f"  {len(groups_raw)} fetter groups")
-
-    print("Fetching ConfigDBParsed/PhantomFetter.json ...")
-    fetters_config_raw = request_json_with_retry(
-        session,
-        "get",
-        FETTERS_CONFIG_URL,
+    index = index or load_localization_index()
+    index.prefetch(FETTER_FILES)
+
+    fetters_by_id = index.by_id("PhantomFetters")
+    groups_raw = index.rows("PhantomFetterGroups")
+    config_fetters_by_id = index.by_id("PhantomFetter")
+    print(
+        f"  {len(fetters_by_id)} fetter entries, {len(groups_raw)} fetter groups, "
+        f"{len(config_fetters_by_id)} config fetter entries"
     )
-    if not isinstance(fetters_config_raw, list):
-        raise ValueError("Unexpected PhantomFetter config payload; expected a list")
-    print(f"  {len(fetters_config_raw)} config fetter entries")
-
-    # Index individual fetter entries by their Id
-    fetters_by_id: dict[int, dict] = {f["Id"]: f for f in fetters_raw}
-    config_fetters_by_id: dict[int, dict] = {
-        int(f["Id"]): f for f in fetters_config_raw
-        if isinstance(f, dict) and "Id" in f
-    }
 
     output: list[dict] = []
 
@@ -186,6 +159,7 @@ def main():
     parser = argparse.ArgumentParser(description="Sync fetter data from Wuthery CDN")
     parser.add_argument("--dry-run", action="store_true", help="Print output without writing")
     parser.add_argument("--pretty",  action="store_true", help="Pretty-print JSON")
+    split_argument(parser)
     args = parser.parse_args()
 
     output = fetch_and_build()
@@ -202,9 +176,12 @@ def main():
         return
 
     write_json_atomic(OUTPUT, output, **json_kwargs)
+    load_localization_index().save()
 
     size_kb = OUTPUT.stat().st_size / 1024
     print(f"\nWrote {OUTPUT} [{size_kb:.1f} KB], {len(output)} fetter groups")
+    if args.split_langs:
+        save_split(OUTPUT.parent, OUTPUT.name, output, json_kwargs)
 
 
 if __name__ == "__main__":
@@ -6,28 +6,43 @@ Inputs (all from frontend public/Data/):
 - EchoStats.json
 - Fetters.json
 - CharacterCurve.json, LevelCurve.json
+  Characters/Weapons/Echoes/Fetters come from the English split under i18n/
+  (l10n_split.py) when it is current, else from the combined files.
 
 Outputs:
 - lb/internal/calc/data/character_bases.json
 - lb/internal/calc/data/weapon_bases.json    (lv1 ATK + secondary, effect_en, params_r1/params_r5)
+  With --stat-tables, character and weapon entries also carry `stat_tables`:
+  per-level HP/ATK/DEF (characters) or ATK/main (weapons) arrays and, for
+  weapons, params for every rank R1..R5.
 - lb/internal/calc/data/echo_bases.json
 - lb/internal/calc/data/fetter_bases.json    (piece_effects include parsed `effects` arrays)
 - lb/internal/calc/data/character_curve.json
 - lb/internal/calc/data/level_curve.json
 - lb/internal/calc/data/echo_stats.json
+- lb/internal/calc/data/calc_data.bin       (binary bundle of the curves + weapon numeric
+                                            tables, round-trip verified against the JSON;
+                                            see lb_bundle.py)
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import heapq
 import json
 import re
-import unicodedata
-
-_MARKUP_RE = re.compile(r"<[^>]+>")
+import time
 from pathlib import Path
 from typing import Any
 from cdn_config import write_bytes_atomic, write_json_atomic
+from data_shards import current_layout
+from game_catalog import CharacterRecord, EchoRecord, RecordTable, WeaponRecord, load_catalog
+from l10n_split import load_records
+from legacy_ids import LegacyIdIndex, load_legacy_index
+from lb_bundle import BUNDLE_FILENAME, encode_bundle, verify_bundle
+from parsed_text import parse_text
+from weapon_aliases import WeaponAliasIndex
 
 SCRIPTS_DIR = Path(__file__).resolve().parent
 DATA_DIR = SCRIPTS_DIR.parent / "public" / "Data"
@@ -41,8 +56,6 @@ FETTERS_JSON = DATA_DIR / "Fetters.json"
 CHARACTER_CURVE_JSON = DATA_DIR / "CharacterCurve.json"
 LEVEL_CURVE_JSON = DATA_DIR / "LevelCurve.json"
 ECHO_STATS_JSON = DATA_DIR / "EchoStats.json"
-LEGACY_ECHOES_JSON = SCRIPTS_DIR.parent / "lib" / "data" / "legacyEchoes.json"
-LEGACY_WEAPONS_JSON = SCRIPTS_DIR.parent / "lib" / "data" / "legacyWeapons.json"
 
 CHARACTER_BASES_JSON = DATA_OUTPUT_DIR / "character_bases.json"
 WEAPON_BASES_JSON = DATA_OUTPUT_DIR / "weapon_bases.json"
@@ -51,6 +64,7 @@ FETTER_BASES_JSON = DATA_OUTPUT_DIR / "fetter_bases.json"
 CHARACTER_CURVE_OUT_JSON = DATA_OUTPUT_DIR / "character_curve.json"
 LEVEL_CURVE_OUT_JSON = DATA_OUTPUT_DIR / "level_curve.json"
 ECHO_STATS_OUT_JSON = DATA_OUTPUT_DIR / "echo_stats.json"
+CALC_BUNDLE_OUT = DATA_OUTPUT_DIR / BUNDLE_FILENAME
 
 FORTE_PARENT_TO_TREE = {
     1: "tree1", 2: "tree2", 3: "tree4", 6: "tree5",
@@ -92,67 +106,11 @@ FETTER_ID_TO_SET_KEY = {
 }
 
 
-NAME_TOKEN_ALIASES = {
-    "baby": "young",      # Baby Roseshroom (current) vs Young Roseshroom (legacy)
-    "reminiscence": "",   # Reminiscence prefixes are absent in some legacy labels
-}
-
-
 def _load_json(path: Path) -> Any:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def _normalize_name(name: str) -> str:
-    # Normalize diacritics ("Jué" -> "Jue"), punctuation, and known wording drift.
-    folded = unicodedata.normalize("NFKD", name)
-    ascii_name = "".join(ch for ch in folded if not unicodedata.combining(ch))
-    tokens = re.findall(r"[a-z]+|\d+", ascii_name.lower())
-    normalized_tokens: list[str] = []
-    for token in tokens:
-        # Treat possessive "'s" punctuation splits as noise.
-        if token == "s":
-            continue
-        if token in NAME_TOKEN_ALIASES:
-            token = NAME_TOKEN_ALIASES[token]
-        if token == "":
-            continue
-        # Smooth common singular/plural diffs across legacy catalogs.
-        if token.isalpha() and len(token) > 3 and token.endswith("s"):
-            token = token[:-1]
-        normalized_tokens.append(token)
-    return "".join(normalized_tokens)
-
-
-def _load_legacy_catalog(path: Path, label: str) -> list[dict]:
-    if not path.exists():
-        raise ValueError(f"Missing required {label} catalog: {path}")
-    try:
-        payload = _load_json(path)
-    except Exception as exc:
-        raise ValueError(f"Failed to load {label} catalog {path}: {exc}") from exc
-    if not isinstance(payload, list):
-        raise ValueError(f"{label} catalog must be a JSON array: {path}")
-
-    catalog: list[dict] = []
-    for i, entry in enumerate(payload):
-        if not isinstance(entry, dict):
-            raise ValueError(f"{label} catalog entry at index {i} is not an object: {path}")
-        catalog.append(entry)
-    return catalog
-
-
-def _build_legacy_name_index(catalog: list[dict]) -> dict[str, list[str]]:
-    name_to_ids: dict[str, list[str]] = {}
-    for entry in catalog:
-        legacy_id = str(entry.get("id", "") or "").strip()
-        name = str(entry.get("name", "") or "").strip()
-        key = _normalize_name(name)
-        if not legacy_id or not key:
-            continue
-        bucket = name_to_ids.setdefault(key, [])
-        if legacy_id not in bucket:
-            bucket.append(legacy_id)
-    return name_to_ids
+LEGACY_KINDS = {"weapon": "weapons", "echo": "echoes"}
 
 
 def _resolve_required_legacy_id(
@@ -160,17 +118,10 @@ def _resolve_required_legacy_id(
     entity: str,
     entity_id: str,
     name: str,
-    legacy_name_index: dict[str, list[str]],
+    legacy: LegacyIdIndex,
     errors: list[str],
 ) -> str:
-    if not name:
-        return entity_id
-
-    key = _normalize_name(name)
-    if not key:
-        return entity_id
-
-    candidate_legacy_ids = legacy_name_index.get(key, [])
+    candidate_legacy_ids = legacy.candidates(LEGACY_KINDS[entity], name)
     if len(candidate_legacy_ids) == 1:
         return candidate_legacy_ids[0]
     if not candidate_legacy_ids:
@@ -213,6 +164,159 @@ def _copy_file(src: Path, dst: Path, dry_run: bool) -> None:
     print(f"Copied {src} -> {dst}")
 
 
+def _write_bundle(
+    path: Path,
+    weapon_bases: dict[str, dict],
+    level_curves: dict,
+    character_curve: dict,
+    dry_run: bool,
+) -> bool:
+    """Encode the binary bundle, verify it against the JSON data, then write it.
+
+    Returns False (and writes nothing) when the round trip does not match, so a
+    bundle that disagrees with the JSON outputs never reaches the calc service.
+    """
+    data = encode_bundle(weapon_bases, level_curves, character_curve)
+    errors = verify_bundle(data, weapon_bases, level_curves, character_curve)
+    if errors:
+        _print_error_report("Binary bundle does not round-trip against JSON outputs", errors)
+        return False
+    if dry_run:
+        print(f"[DRY RUN] Would write {path} ({len(data)} bytes, round-trip verified)")
+        return True
+    write_bytes_atomic(path, data)
+    print(f"Wrote {path} ({len(data)} bytes, round-trip verified)")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Rule profiling (--profile-rules)
+# ---------------------------------------------------------------------------
+# A single pathological pattern (a `[^.]{0,100}` window, the long
+# _RE_DURATION alternation, ...) can dominate a run. --profile-rules rebinds,
+# once before generating, every module-level compiled pattern (each parser
+# pass has its own), the rule tables in _PROFILED_PATTERN_TABLES and the parser
+# functions in _PROFILED_FUNCTIONS to timing wrappers that record calls,
+# matches and cumulative time, plus the slowest input each saw. Without the
+# flag nothing is wrapped and the parsers run unchanged.
+
+_PROFILE_SLOWEST_KEPT = 10
+_PROFILED_FUNCTIONS = (
+    "_extract_buffs",
+    "_extract_duration",
+    "_extract_trigger",
+    "_split_compound_and",
+    "_parse_party_scoped_buffs",
+    "_parse_char_kit_party_buffs",
+)
+_PROFILED_PATTERN_METHODS = ("search", "match", "fullmatch", "finditer", "findall", "sub", "split")
+# Module-level lists of (compiled pattern, value) rules; each entry is timed as
+# "<table>[<index>:<value>]".
+_PROFILED_PATTERN_TABLES = ("_TRIGGER_MOVE_PATTERNS",)
+
+
+class _RuleProfile:
+    """Per-rule call/match/time counters with the slowest samples kept."""
+
+    def __init__(self) -> None:
+        # rule -> [calls, matches, seconds]
+        self.rules: dict[str, list] = {}
+        self.slowest: list[tuple[float, str, str]] = []
+
+    def record(self, rule: str, seconds: float, matched: bool, sample: str) -> None:
+        stats = self.rules.setdefault(rule, [0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += int(matched)
+        stats[2] += seconds
+        entry = (seconds, rule, sample)
+        if len(self.slowest) < _PROFILE_SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def report(self) -> None:
+        print("\nRule profile (cumulative; parser functions include the patterns they run):")
+        print(f"  {'rule':<48} {'calls':>8} {'matches':>8} {'total ms':>10} {'avg us':>9}")
+        for rule, (calls, matches, seconds) in sorted(self.rules.items(), key=lambda kv: -kv[1][2]):
+            print(f"  {rule:<48} {calls:>8} {matches:>8} {seconds * 1000:>10.1f} {seconds / calls * 1e6:>9.1f}")
+        print(f"\nSlowest inputs (top {len(self.slowest)}):")
+        for seconds, rule, sample in sorted(self.slowest, reverse=True):
+            clipped = sample if len(sample) <= 140 else sample[:137] + "..."
+            print(f"  {seconds * 1000:8.2f} ms  {rule}: {clipped!r}")
+
+
+def _profile_sample(value: Any) -> str:
+    if isinstance(value, dict):
+        return str((value.get("name") or {}).get("en", "") or value.get("id", ""))
+    return str(value)
+
+
+def _profiled_function(fn, profile: _RuleProfile):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        sample = _profile_sample(args[0]) if args else ""
+        # A one-element split means "no split happened".
+        matched = len(result) > 1 if fn.__name__ == "_split_compound_and" else bool(result)
+        profile.record(fn.__name__, time.perf_counter() - start, matched, sample)
+        return result
+    return wrapper
+
+
+class _ProfiledPattern:
+    """A compiled pattern whose matching methods are timed under its global name.
+
+    finditer is consumed inside the timer, so its matches come back as an
+    iterator over a list."""
+
+    def __init__(self, name: str, pattern: re.Pattern, profile: _RuleProfile) -> None:
+        self._pattern = pattern
+        for method in _PROFILED_PATTERN_METHODS:
+            setattr(self, method, self._timed(f"{name}.{method}", getattr(pattern, method), method, profile))
+
+    @staticmethod
+    def _timed(rule: str, call, method: str, profile: _RuleProfile):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = call(*args, **kwargs)
+            # sub takes (repl, string); every other method takes the string first.
+            string = args[1] if method == "sub" else args[0]
+            if method == "finditer":
+                matches = list(result)
+                result, matched = iter(matches), bool(matches)
+            elif method == "sub":
+                matched = result != string
+            elif method == "split":
+                matched = len(result) > 1
+            else:
+                matched = bool(result)
+            profile.record(rule, time.perf_counter() - start, matched, str(string))
+            return result
+        return timed
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._pattern, attr)
+
+
+def _install_rule_profiling() -> _RuleProfile:
+    """Rebind the module's compiled patterns and parser functions to timing
+    wrappers (they are looked up as globals at call time)."""
+    profile = _RuleProfile()
+    namespace = globals()
+    for name, value in list(namespace.items()):
+        if isinstance(value, re.Pattern):
+            namespace[name] = _ProfiledPattern(name, value, profile)
+    for name in _PROFILED_PATTERN_TABLES:
+        namespace[name] = [
+            (_ProfiledPattern(f"{name}[{i}:{value}]", pattern, profile), value)
+            for i, (pattern, value) in enumerate(namespace[name])
+        ]
+    for name in _PROFILED_FUNCTIONS:
+        namespace[name] = _profiled_function(namespace[name], profile)
+    return profile
+
+
 def _fmt_effect_value(value: float) -> str:
     if value == int(value):
         return str(int(value))
@@ -386,6 +490,63 @@ _DAMAGE_INSTANCE_RE = re.compile(
 )
 
 
+# _extract_buffs passes, in the order they run. Kept at module level so
+# --profile-rules times each one.
+# Pass B2: "MOVETYPE DMG ignores X% [of] DEF [and Y% Element RES]".
+_MOVE_DEF_RES_IGNORE_RE = re.compile(
+    r"\b(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)"
+    r"\s+DMG\s+ignores?\s+(\d+(?:\.\d+)?)\s*%\s+"
+    r"(?:of\s+(?:the\s+)?(?:target'?s?\s+)?)?"
+    r"DEF"
+    r"(?:\s+and\s+(\d+(?:\.\d+)?)\s*%\s+(Havoc|Spectro|Glacio|Fusion|Electro|Aero)\s+RES)?",
+    re.I,
+)
+# Pass A: element / status / Frazzle / move-type amplification.
+_ELEMENT_AMP_RE = re.compile(
+    r"\b(Glacio|Fusion|Electro|Aero|Havoc|Spectro)\s+DMG\s+(?:is\s+)?"
+    r"[Aa]mplified\s+by\s+(\d+(?:\.\d+)?)\s*%",
+    re.I,
+)
+_STATUS_AMP_RE = re.compile(
+    r"\b(Glacio\s+Chafe|Spectro\s+Frazzle|Aero\s+Erosion)\s+DMG\b"
+    r"[^.]{0,100}\b[Aa]mplified\s+by\s+(\d+(?:\.\d+)?)\s*%",
+    re.I,
+)
+_FRAZZLE_AMP_VERB_RE = re.compile(
+    r"\bAmplif(?:y|ies)\s+(?:the\s+)?(?:[A-Za-z]+\s+)?[Ff]razzle\s+DMG\b[^.]{0,80}\bby\s+(\d+(?:\.\d+)?)\s*%",
+    re.I,
+)
+_FRAZZLE_AMP_NOUN_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*%\s+(?:[A-Za-z]+\s+)?[Ff]razzle\s+DMG\s+Amplification\b",
+    re.I,
+)
+_MOVE_AMP_NOUN_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*%\s+"
+    r"(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)\s+DMG\s+Amplification\b",
+    re.I,
+)
+_MOVE_AMP_VERB_RE = re.compile(
+    r"\b(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)\s+DMG\s+Amplification\b.*?\b(\d+(?:\.\d+)?)\s*%",
+    re.I,
+)
+# Pass B: "X% StatName" and its lookaround checks.
+_INCREASE_IN_RE = re.compile(r"(?:increase|increased)\s+in\s+", re.I)
+_DEAL_VERB_BEFORE_RE = re.compile(r"\bdeal(?:s|ing|t)?\s+$", re.I)
+_LEADING_EXTRA_RE = re.compile(r"^(?:additional|extra)\s+", re.I)
+_AND_CONTINUATION_RE = re.compile(r"\s+and\s+")
+# Pass C: "ignore(s) X% of the target's DEF".
+_DEF_IGNORE_RE = re.compile(
+    r"\bignores?\s+(\d+(?:\.\d+)?)\s*%\s+of\s+(?:(?:the\s+target'?s|their)\s+)?DEF\b",
+    re.I,
+)
+# Pass D: "StatName + X%" / "StatName ... by X%".
+_STAT_IMMEDIATE_PCT_RE = re.compile(r"\s+(?:Bonus\s+)?(\d+(?:\.\d+)?)\s*%", re.I)
+_STAT_BY_PCT_RE = re.compile(r"(?:\+\s*|by\s+|increases?\s+by\s+)(\d+(?:\.\d+)?)\s*%", re.I)
+# Pass E: "the DMG taken ... is Amplified by X%".
+_DMG_TAKEN_AMP_RE = re.compile(r"\bDMG\s+taken\b.*?\bAmplified\s+by\s+(\d+(?:\.\d+)?)\s*%", re.I)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _extract_buffs(text: str) -> list[dict]:
     """Find all (stat, value) buff pairs in *text*.
 
@@ -416,14 +577,7 @@ def _extract_buffs(text: str) -> list[dict]:
         "resonance liberation": "resonance_liberation",
         "echo skill":           "echo",
     }
-    move_def_res_m = re.search(
-        r"\b(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)"
-        r"\s+DMG\s+ignores?\s+(\d+(?:\.\d+)?)\s*%\s+"
-        r"(?:of\s+(?:the\s+)?(?:target'?s?\s+)?)?"
-        r"DEF"
-        r"(?:\s+and\s+(\d+(?:\.\d+)?)\s*%\s+(Havoc|Spectro|Glacio|Fusion|Electro|Aero)\s+RES)?",
-        text, re.I,
-    )
+    move_def_res_m = _MOVE_DEF_RES_IGNORE_RE.search(text)
     if move_def_res_m:
         mt_key = _MOVE_TYPE_TO_CODE.get(move_def_res_m.group(1).lower(), "")
         span = move_def_res_m.span()
@@ -442,12 +596,7 @@ def _extract_buffs(text: str) -> list[dict]:
     # Run before the generic "% StatName" matcher so noun-form text like
     # "24% Heavy Attack DMG Amplification" is claimed as amplification instead
     # of being truncated to a plain "Heavy Attack DMG" buff.
-    for elem_amp_m in re.finditer(
-        r"\b(Glacio|Fusion|Electro|Aero|Havoc|Spectro)\s+DMG\s+(?:is\s+)?"
-        r"[Aa]mplified\s+by\s+(\d+(?:\.\d+)?)\s*%",
-        text,
-        re.I,
-    ):
+    for elem_amp_m in _ELEMENT_AMP_RE.finditer(text):
         span = elem_amp_m.span()
         if not _overlaps(*span):
             element = _ELEMENT_AMP_TO_CODE.get(elem_amp_m.group(1).lower(), "")
@@ -458,16 +607,11 @@ def _extract_buffs(text: str) -> list[dict]:
             })
             used.append(span)
 
-    for status_amp_m in re.finditer(
-        r"\b(Glacio\s+Chafe|Spectro\s+Frazzle|Aero\s+Erosion)\s+DMG\b"
-        r"[^.]{0,100}\b[Aa]mplified\s+by\s+(\d+(?:\.\d+)?)\s*%",
-        text,
-        re.I,
-    ):
+    for status_amp_m in _STATUS_AMP_RE.finditer(text):
         span = status_amp_m.span()
         if not _overlaps(*span):
             move_type = _STATUS_DMG_AMP_TO_MOVE_TYPE.get(
-                re.sub(r"\s+", " ", status_amp_m.group(1).strip().lower()),
+                _WHITESPACE_RE.sub(" ", status_amp_m.group(1).strip().lower()),
                 "",
             )
             buffs.append({
@@ -478,11 +622,7 @@ def _extract_buffs(text: str) -> list[dict]:
             used.append(span)
 
     # Matches verb form: "Amplif[y/ies] [the] [Element] Frazzle DMG [intervening text] by X%"
-    frazzle_amp_m = re.search(
-        r"\bAmplif(?:y|ies)\s+(?:the\s+)?(?:[A-Za-z]+\s+)?[Ff]razzle\s+DMG\b[^.]{0,80}\bby\s+(\d+(?:\.\d+)?)\s*%",
-        text,
-        re.I,
-    )
+    frazzle_amp_m = _FRAZZLE_AMP_VERB_RE.search(text)
     if frazzle_amp_m:
         span = frazzle_amp_m.span()
         if not _overlaps(*span):
@@ -493,11 +633,7 @@ def _extract_buffs(text: str) -> list[dict]:
             })
             used.append(span)
     # Noun form: "X% [Element] Frazzle DMG Amplification" (e.g. "100% Spectro Frazzle DMG Amplification")
-    noun_frazzle_m = re.search(
-        r"(\d+(?:\.\d+)?)\s*%\s+(?:[A-Za-z]+\s+)?[Ff]razzle\s+DMG\s+Amplification\b",
-        text,
-        re.I,
-    )
+    noun_frazzle_m = _FRAZZLE_AMP_NOUN_RE.search(text)
     if noun_frazzle_m:
         span = noun_frazzle_m.span()
         if not _overlaps(*span):
@@ -521,12 +657,7 @@ def _extract_buffs(text: str) -> list[dict]:
     # onto a number belonging to a later clause (e.g. "... Echo Skill DMG
     # Amplification, and ignore 8% of the target's DEF" would parse 8 instead of
     # 32, and the claimed span would also starve the DEF-ignore pass).
-    move_amp_noun_m = re.search(
-        r"(\d+(?:\.\d+)?)\s*%\s+"
-        r"(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)\s+DMG\s+Amplification\b",
-        text,
-        re.I,
-    )
+    move_amp_noun_m = _MOVE_AMP_NOUN_RE.search(text)
     if move_amp_noun_m:
         move_type = move_type_map.get(move_amp_noun_m.group(2).strip().lower())
         span = move_amp_noun_m.span()
@@ -538,11 +669,7 @@ def _extract_buffs(text: str) -> list[dict]:
             })
             used.append(span)
     # Verb / trailing-value form: "MOVETYPE DMG Amplification ... X%".
-    move_amp_m = re.search(
-        r"\b(Basic Attack|Heavy Attack|Resonance Skill|Resonance Liberation|Echo Skill)\s+DMG\s+Amplification\b.*?\b(\d+(?:\.\d+)?)\s*%",
-        text,
-        re.I,
-    )
+    move_amp_m = _MOVE_AMP_VERB_RE.search(text)
     if move_amp_m:
         move_type = move_type_map.get(move_amp_m.group(1).strip().lower())
         span = move_amp_m.span()
@@ -558,7 +685,7 @@ def _extract_buffs(text: str) -> list[dict]:
     for pct_m in _RE_PCT.finditer(text):
         val = float(pct_m.group(1))
         increase_after = text[pct_m.end():pct_m.end() + 90].lstrip()
-        increase_m = re.match(r"(?:increase|increased)\s+in\s+", increase_after, re.I)
+        increase_m = _INCREASE_IN_RE.match(increase_after)
         if increase_m:
             stat_m = _STAT_RE.match(increase_after[increase_m.end():])
             if stat_m:
@@ -572,11 +699,11 @@ def _extract_buffs(text: str) -> list[dict]:
         # Buff phrasings never put the value right after the verb ("deal 15%
         # more Havoc DMG" fails the stat match anyway because of "more").
         before = text[max(0, pct_m.start() - 16):pct_m.start()]
-        if re.search(r"\bdeal(?:s|ing|t)?\s+$", before, re.I):
+        if _DEAL_VERB_BEFORE_RE.search(before):
             continue
         after_start = pct_m.end()
         after = text[after_start:after_start + 70].lstrip()
-        after = re.sub(r"^(?:additional|extra)\s+", "", after, flags=re.I)
+        after = _LEADING_EXTRA_RE.sub("", after)
         stat_m = _STAT_RE.match(after)
         if stat_m:
             stat = _stat_name_for_match(stat_m)
@@ -592,7 +719,7 @@ def _extract_buffs(text: str) -> list[dict]:
                 stat_pos = text.find(stat_m.group(0), after_start)
                 if stat_pos >= 0:
                     cont_start = stat_pos + len(stat_m.group(0))
-                    and_m = re.match(r"\s+and\s+", text[cont_start:])
+                    and_m = _AND_CONTINUATION_RE.match(text[cont_start:])
                     if and_m:
                         stat2_start = cont_start + and_m.end()
                         stat2_m = _STAT_RE.match(text[stat2_start:])
@@ -601,11 +728,7 @@ def _extract_buffs(text: str) -> list[dict]:
                             used.append((cont_start, stat2_start + stat2_m.end()))
 
     # Pass C - "ignore(s) X% of the target's DEF".
-    def_ignore_m = re.search(
-        r"\bignores?\s+(\d+(?:\.\d+)?)\s*%\s+of\s+(?:(?:the\s+target'?s|their)\s+)?DEF\b",
-        text,
-        re.I,
-    )
+    def_ignore_m = _DEF_IGNORE_RE.search(text)
     if def_ignore_m:
         span = def_ignore_m.span()
         if not _overlaps(*span):
@@ -620,7 +743,7 @@ def _extract_buffs(text: str) -> list[dict]:
     for stat_m in _STAT_RE.finditer(text):
         stat = _stat_name_for_match(stat_m)
         immediate = text[stat_m.end():stat_m.end() + 24]
-        immediate_m = re.match(r"\s+(?:Bonus\s+)?(\d+(?:\.\d+)?)\s*%", immediate, re.I)
+        immediate_m = _STAT_IMMEDIATE_PCT_RE.match(immediate)
         if immediate_m:
             span_end = stat_m.end() + immediate_m.end()
             if not _overlaps(stat_m.start(), span_end):
@@ -628,10 +751,7 @@ def _extract_buffs(text: str) -> list[dict]:
                 used.append((stat_m.start(), span_end))
                 continue
         after = text[stat_m.end():stat_m.end() + 80]
-        pct_m = re.search(
-            r"(?:\+\s*|by\s+|increases?\s+by\s+)(\d+(?:\.\d+)?)\s*%",
-            after, re.I,
-        )
+        pct_m = _STAT_BY_PCT_RE.search(after)
         if pct_m:
             between = after[: pct_m.start()]
             if _STAT_RE.search(between):
@@ -643,11 +763,7 @@ def _extract_buffs(text: str) -> list[dict]:
                 used.append((stat_m.start(), span_end))
 
     # Pass E - generic "the DMG taken ... is Amplified by X%".
-    dmg_amp_m = re.search(
-        r"\bDMG\s+taken\b.*?\bAmplified\s+by\s+(\d+(?:\.\d+)?)\s*%",
-        text,
-        re.I,
-    )
+    dmg_amp_m = _DMG_TAKEN_AMP_RE.search(text)
     if dmg_amp_m:
         span = dmg_amp_m.span()
         if not _overlaps(*span):
@@ -670,6 +786,16 @@ def _stack_count(match: re.Match[str]) -> int:
     return int(match.group(1) or match.group(2))
 
 
+# _extract_trigger: a leading condition clause, else a trailing after/upon clause.
+_LEADING_CONDITION_RE = re.compile(
+    r"^((?:Hitting|Casting|Using|While|Upon|After|When|Dealing|Inflicting|Performing|"
+    r"Holding|Reaching|Every\s+time)\b.+?)"
+    r"(?:,\s*|\s+(?:increases?|grants?|gains?))",
+    re.I,
+)
+_TRAILING_CONDITION_RE = re.compile(r"\b(?:after|upon)\b\s+(?:releasing\s+)?(.+?)(?:\.|,|$)", re.I)
+
+
 def _extract_trigger(text: str) -> str:
     """Extract the condition/trigger clause from an effect sentence.
 
@@ -680,19 +806,12 @@ def _extract_trigger(text: str) -> str:
     Falls back to "" (passive / always-active) if neither is found.
     """
     # Pattern 1 – clause starts with a known trigger keyword
-    cond_m = re.match(
-        r"^((?:Hitting|Casting|Using|While|Upon|After|When|Dealing|Inflicting|Performing|"
-        r"Holding|Reaching|Every\s+time)\b.+?)"
-        r"(?:,\s*|\s+(?:increases?|grants?|gains?))",
-        text, re.I,
-    )
+    cond_m = _LEADING_CONDITION_RE.match(text)
     if cond_m:
         return cond_m.group(1).strip().rstrip(",")
 
     # Pattern 2 – "STAT + X% after/upon TRIGGER"
-    after_m = re.search(
-        r"\b(?:after|upon)\b\s+(?:releasing\s+)?(.+?)(?:\.|,|$)", text, re.I
-    )
+    after_m = _TRAILING_CONDITION_RE.search(text)
     if after_m:
         return after_m.group(1).strip().rstrip(".,")
 
@@ -723,7 +842,7 @@ def _split_compound_and(sentence: str) -> list[str]:
 
 
 # Canonical trigger-move keys (matching weapon_effects.go TriggerMove values)
-_TRIGGER_MOVE_PATTERNS: list[tuple[str, str]] = [
+_TRIGGER_MOVE_PATTERNS: list[tuple[re.Pattern[str], str]] = [(re.compile(pattern, re.I), key) for pattern, key in [
     (r"tune\s+break",                              "Passive"),
     (r"tune\s+rupture",                            "Passive"),
     # DOT-applier kits (Hiyuki/Aero/Havoc-applier weapons): the wielder keeps
@@ -751,7 +870,9 @@ _TRIGGER_MOVE_PATTERNS: list[tuple[str, str]] = [
     (r"\bhitting\s+a\s+target\b",                  "basic"),
     (r"\bdealing\s+heavy\s+attack\s+dmg",          "heavy"),
     (r"\bdealing\s+basic\s+attack\s+dmg",          "basic"),
-]
+]]
+_TRIGGER_OR_RE = re.compile(r"\s+or\s+", re.I)
+_AMPLIF_RE = re.compile(r"amplif", re.I)
 
 # Stat name → (go_type, element, moveType). None means skip (unsupported/complex).
 _STAT_TO_GO_EFFECT: dict[str, tuple[str, str, str]] = {
@@ -796,12 +917,12 @@ def _trigger_to_move_keys(trigger: str) -> list[str]:
         return []  # unconditional: already in passive_bonuses, don't emit weapon_effect
     # Split on literal " or " to handle multi-trigger phrases, but only where
     # each side contains a recognisable move keyword.
-    parts = re.split(r"\s+or\s+", trigger, flags=re.I)
+    parts = _TRIGGER_OR_RE.split(trigger)
     keys: list[str] = []
     for part in parts:
         p = part.lower()
         for pattern, key in _TRIGGER_MOVE_PATTERNS:
-            if re.search(pattern, p, re.I):
+            if pattern.search(p):
                 if key not in keys:
                     keys.append(key)
                 break
@@ -825,7 +946,7 @@ def _derive_go_weapon_effects(
     for eff in effects:
         trigger = eff.get("trigger", "")
         # Skip effects involving DMG Amplification (amplify type — handled manually)
-        if re.search(r"amplif", trigger, re.I):
+        if _AMPLIF_RE.search(trigger):
             continue
         move_keys = _trigger_to_move_keys(trigger)
         if not move_keys:
@@ -897,22 +1018,14 @@ def _parse_effect_en(effect_en: str) -> list[dict]:
     if not effect_en:
         return []
 
-    effect_en = re.sub(r"<br\s*/?>", ". ", effect_en, flags=re.I)
-    effect_en = _MARKUP_RE.sub("", effect_en)
-    effect_en = re.sub(r"\{[^}]+\}", "", effect_en)
-
-    # Normalise in-word abbreviations that contain ". " so they don't
-    # trigger false sentence splits (e.g. "Crit. Rate" → "Crit Rate").
-    text = re.sub(r"\bCrit\.\s+", "Crit ", effect_en)
-    text = re.sub(r"\bRegen\.\s+", "Regen ", text)
-
-    # Split into sentences. Keep meta-sentences (e.g. "This effect stacks up to
-    # N times.") temporarily so we can extract global stacking info before
+    # Split into sentences (markup/placeholders dropped, "Crit. Rate" joined so it
+    # does not end a sentence). Keep meta-sentences (e.g. "This effect stacks up
+    # to N times.") temporarily so we can extract global stacking info before
     # dropping them from the main results.
     _META_RE = re.compile(
         r"^(?:this effect|effects? of the same name|cd\s*:)", re.I
     )
-    sentences = [s.strip() for s in re.split(r"\.\s+", text.rstrip(".")) if s.strip()]
+    sentences = list(parse_text(effect_en).effect_sentences)
 
     # Pre-pass: extract stacking info and duration from meta-sentences so they
     # can be attached to per-stack buff entries whose stacking sentence was
@@ -1070,7 +1183,7 @@ def _extract_chains_lb(char: dict) -> list[dict]:
         name_en = name_field.get("en", "") if isinstance(name_field, dict) else str(name_field)
         desc_field = chain.get("description", {})
         desc_en = desc_field.get("en", "") if isinstance(desc_field, dict) else str(desc_field)
-        desc_en = _MARKUP_RE.sub("", desc_en).strip()
+        desc_en = parse_text(desc_en).plain.strip()
         entry: dict = {
             "id": chain.get("id"),
             "name": name_en,
@@ -1099,7 +1212,7 @@ def _extract_moves_lb(char: dict) -> list[dict]:
         name_en = name_field.get("en", "") if isinstance(name_field, dict) else str(name_field)
         desc_field = move.get("description", {})
         desc_en = desc_field.get("en", "") if isinstance(desc_field, dict) else str(desc_field)
-        desc_en = _MARKUP_RE.sub("", desc_en).strip()
+        desc_en = parse_text(desc_en).plain.strip()
         desc_params = [str(v) for v in (move.get("descriptionParams") or [])]
         damage_types = _extract_move_damage_types(desc_en)
 
@@ -1200,6 +1313,9 @@ def _skip_sequence_bonus(char: dict, chain: dict, index: int, bonus: dict) -> bo
 # Regex for the "up to Y%" cap pattern used in scaling party buffs.
 _RE_UP_TO_CAP = re.compile(r"up\s+to\s+(\d+(?:\.\d+)?)\s*%", re.I)
 _RE_UP_TO_POINTS = re.compile(r"up\s+to\s+(\d+(?:\.\d+)?)\s+points?", re.I)
+_RE_UP_TO_STACKS = re.compile(r"up\s+to\s+(\d+)\s+stacks?", re.I)
+# "increase in STAT ... for every ...": the cap belongs to a scaling buff.
+_SCALING_INCREASE_RE = re.compile(r"increase\s+in\s+(.+?)\s+to\s+.*?\bfor\s+every\b", re.I)
 
 # Phrases indicating the buff applies to party members (not just the caster).
 _PARTY_SCOPE_PHRASES = [
@@ -1392,11 +1508,7 @@ def _append_unique_party_buff(out: list[dict], entry: dict) -> None:
 
 
 def _split_buff_sentences(text: str) -> list[str]:
-    text = re.sub(r"<br\s*/?>", ". ", text, flags=re.I)
-    text = _MARKUP_RE.sub("", text)
-    text = re.sub(r"\bCrit\.\s+", "Crit ", text)
-    text = re.sub(r"\bRegen\.\s+", "Regen ", text)
-    return [s.strip() for s in re.split(r"(?:\.\s+|\.\n+|\n+)", text) if s.strip()]
+    return parse_text(text).buff_sentences
 
 
 def _stat_to_party_buffs(stat: str, value: float) -> list[dict]:
@@ -1477,6 +1589,9 @@ _SELF_SCOPE_RE = re.compile(
 )
 
 
+_CLAUSE_SPLIT_RE = re.compile(r",\s+(?:and\s+)?|;\s*")
+
+
 def _self_scoped_clause_buffs(sentence: str) -> list[dict]:
     """Collect buffs from sub-clauses explicitly scoped to the wielder.
 
@@ -1486,7 +1601,7 @@ def _self_scoped_clause_buffs(sentence: str) -> list[dict]:
     The wielder clause's stats must not be attributed to the party.
     """
     excluded: list[dict] = []
-    for clause in re.split(r",\s+(?:and\s+)?|;\s*", sentence):
+    for clause in _CLAUSE_SPLIT_RE.split(sentence):
         lower = clause.lower()
         if not _SELF_SCOPE_RE.search(clause):
             continue
@@ -1510,7 +1625,7 @@ def _incoming_scoped_clause_buffs(sentence: str) -> list[dict]:
     hands the wearer a phantom +22.5% ATK.
     """
     excluded: list[dict] = []
-    for clause in re.split(r",\s+(?:and\s+)?|;\s*", sentence):
+    for clause in _CLAUSE_SPLIT_RE.split(sentence):
         if not _INCOMING_SCOPE_RE.search(clause):
             continue
         excluded.extend(_extract_buffs(clause))
@@ -1566,7 +1681,7 @@ def _capped_party_dmg_value(text: str, match_end: int, value: float) -> float:
     cap_m = _RE_UP_TO_CAP.match(text[match_end:].lstrip(" ,"))
     if cap_m:
         return float(cap_m.group(1))
-    stack_m = re.search(r"up\s+to\s+(\d+)\s+stacks?", text, re.I)
+    stack_m = _RE_UP_TO_STACKS.search(text)
     if stack_m:
         return value * int(stack_m.group(1))
     return value
@@ -1587,7 +1702,7 @@ def _parse_party_scoped_buffs(text: str) -> list[dict]:
         for cap_m in _RE_UP_TO_CAP.finditer(sentence):
             cap_val = float(cap_m.group(1))
             scaling_clause = sentence[max(0, cap_m.start() - 140):cap_m.end()]
-            scaling_m = re.search(r"increase\s+in\s+(.+?)\s+to\s+.*?\bfor\s+every\b", scaling_clause, re.I)
+            scaling_m = _SCALING_INCREASE_RE.search(scaling_clause)
             if scaling_m:
                 stat_m = _STAT_RE.match(scaling_m.group(1).strip())
                 if stat_m:
@@ -1839,7 +1954,7 @@ def _parse_char_kit_party_buffs(char: dict) -> list[dict]:
 
         desc_field = move.get("description", {})
         desc_en = desc_field.get("en", "") if isinstance(desc_field, dict) else str(desc_field or "")
-        desc_en = _MARKUP_RE.sub("", desc_en).strip()
+        desc_en = parse_text(desc_en).plain.strip()
         desc_params = [str(v) for v in (move.get("descriptionParams") or [])]
 
         if not desc_en:
@@ -1973,7 +2088,7 @@ def _parse_weapon_party_buffs_by_rank(weapon: dict) -> list[list[dict]]:
     effect_en = (weapon.get("effect") or {}).get("en", "")
     for rank in range(1, 6):
         resolved = _resolve_effect_placeholders(effect_en, [], _params_for_rank(weapon, rank))
-        resolved = _MARKUP_RE.sub("", resolved).strip()
+        resolved = parse_text(resolved).plain.strip()
         buffs = _parse_support_text_buffs(resolved)
         out.append(buffs)
     return out
@@ -2022,7 +2137,7 @@ def _parse_char_inherent_self_buffs(char: dict) -> list[dict]:
 
         desc_field = move.get("description", {})
         desc_en = desc_field.get("en", "") if isinstance(desc_field, dict) else str(desc_field or "")
-        desc_en = _MARKUP_RE.sub("", desc_en).strip()
+        desc_en = parse_text(desc_en).plain.strip()
         if not desc_en:
             continue
         desc_params = [str(v) for v in (move.get("descriptionParams") or [])]
@@ -2069,17 +2184,60 @@ def _parse_char_inherent_self_buffs(char: dict) -> list[dict]:
             uniq.append(e)
     return uniq
 
+# ---------------------------------------------------------------------------
+# Precomputed stat tables (optional, --stat-tables)
+# ---------------------------------------------------------------------------
+# The calc side otherwise multiplies lv1 stats by a curve lookup and picks
+# rank params on every request. These tables move that work offline: every
+# array is aligned with the entry's `levels` list (the curve key order, e.g.
+# "1/20", "2", ..., "20/20", "20", ..., "90/90"). Values are unrounded products
+# (6dp to drop float noise); display rounding stays with the consumer.
+
+WEAPON_RANKS = (1, 2, 3, 4, 5)
+
+
+def _scale_by_curve(base: float, curve: dict[str, float], divisor: float = 1.0) -> list[float]:
+    return [round(base * float(factor) / divisor, 6) for factor in curve.values()]
+
+
+def _character_stat_tables(char: dict, character_curve: dict) -> dict:
+    curve = character_curve.get("CHARACTER_CURVE") or {}
+    stats = char.get("stats", {})
+    tables: dict[str, Any] = {"levels": list(curve)}
+    for out_key, stat_key in (("HP", "Life"), ("ATK", "Atk"), ("DEF", "Def")):
+        base = float(stats.get(stat_key, 0) or 0)
+        column = {level: row.get(out_key, 0) for level, row in curve.items()}
+        tables[out_key] = _scale_by_curve(base, column, 10000)
+    return tables
+
+
+def _weapon_stat_tables(weapon: dict, atk_lv1: float, base_main: float, level_curves: dict) -> dict:
+    atk_curve = level_curves.get("ATK_CURVE") or {}
+    stat_curve = level_curves.get("STAT_CURVE") or {}
+    if list(atk_curve) != list(stat_curve):
+        raise ValueError("ATK_CURVE and STAT_CURVE level keys differ; cannot build aligned stat tables")
+    return {
+        "levels": list(atk_curve),
+        "ATK": _scale_by_curve(atk_lv1, atk_curve),
+        "main": _scale_by_curve(base_main, stat_curve),
+        "params_by_rank": [_params_for_rank(weapon, rank) for rank in WEAPON_RANKS],
+    }
+
+
 def _build_character_bases(
-    full_chars: list[dict]
+    characters: RecordTable[CharacterRecord],
+    character_curve: dict | None = None,
 ) -> dict[str, dict]:
+    """Build character_bases dict; adds `stat_tables` when a curve is given."""
     out: dict[str, dict] = {}
 
-    for char in full_chars:
-        cdn_id = str(char.get("id"))
-        name = (char.get("name") or {}).get("en", "")
-        element = ((char.get("element") or {}).get("name") or {}).get("en", "") or "Spectro"
-        weapon_type = ((char.get("weapon") or {}).get("name") or {}).get("en", "Sword")
-        legacy_id = str(char.get("legacyId", "") or "").strip() or cdn_id
+    for record in characters:
+        char = record.raw
+        cdn_id = record.key
+        name = record.name
+        element = record.element or "Spectro"
+        weapon_type = record.weapon_type or "Sword"
+        legacy_id = record.legacy_id or cdn_id
 
         stats = char.get("stats", {})
         hp = int(round(float(stats.get("Life", 0) or 0)))
@@ -2118,6 +2276,8 @@ def _build_character_bases(
         # Only emit when present — keeps the field off the ~60 characters without one.
         if inherent_bonuses:
             entry["inherent_bonuses"] = inherent_bonuses
+        if character_curve is not None:
+            entry["stat_tables"] = _character_stat_tables(char, character_curve)
         out[cdn_id] = entry
 
     out = {k: out[k] for k in sorted(out, key=lambda x: int(x))}
@@ -2198,29 +2358,33 @@ def _passive_bonus_matrix(weapon: dict) -> dict[str, list[float]]:
 
 
 def _build_weapon_bases(
-    full_weapons: list[dict],
-    legacy_weapon_catalog: list[dict],
+    weapons: RecordTable[WeaponRecord],
+    legacy: LegacyIdIndex,
+    level_curves: dict | None = None,
 ) -> tuple[dict[str, dict], list[str]]:
-    """Build weapon_bases dict."""
+    """Build weapon_bases dict; adds `stat_tables` when level curves are given."""
     out: dict[str, dict] = {}
     errors: list[str] = []
-    legacy_weapon_name_index = _build_legacy_name_index(legacy_weapon_catalog)
+    # A semantic alias row left in Weapons.json (e.g. by an older sync) is the
+    # same weapon as its canonical row, whose id is the legacy id.
+    aliases = WeaponAliasIndex(record.raw for record in weapons)
 
-    for w in full_weapons:
-        wid = str(w.get("id", ""))
+    for record in weapons:
+        wid = record.key
         if not wid:
             continue
-        name = (w.get("name") or {}).get("en", "")
-        legacy_id = _resolve_required_legacy_id(
+        w = record.raw
+        name = record.name
+        legacy_id = aliases.canonical_id(wid) or _resolve_required_legacy_id(
             entity="weapon",
             entity_id=wid,
             name=name,
-            legacy_name_index=legacy_weapon_name_index,
+            legacy=legacy,
             errors=errors,
         )
 
-        type_name = ((w.get("type") or {}).get("name") or {}).get("en", "")
-        rarity_id = (w.get("rarity") or {}).get("id", 0)
+        type_name = record.type
+        rarity_id = record.rarity
         rarity_str = WEAPON_RARITY_MAP.get(rarity_id, f"{rarity_id}-star")
 
         # Base ATK (level 1) from stats.first
@@ -2268,6 +2432,9 @@ def _build_weapon_bases(
             "party_buffs_by_rank": party_buffs_by_rank,
             "weapon_effects": weapon_effects,
         }
+        if level_curves is not None:
+            # Scale the unrounded lv1 values, matching what the calc side does.
+            out[wid]["stat_tables"] = _weapon_stat_tables(w, base_atk, base_main, level_curves)
 
     out = {k: out[k] for k in sorted(out, key=lambda x: int(x))}
 
@@ -2279,28 +2446,28 @@ def _build_weapon_bases(
 # ---------------------------------------------------------------------------
 
 def _build_echo_bases(
-    echoes: list[dict],
-    legacy_echo_catalog: list[dict],
+    echoes: RecordTable[EchoRecord],
+    legacy: LegacyIdIndex,
 ) -> tuple[dict[str, dict], list[str]]:
     out: dict[str, dict] = {}
     errors: list[str] = []
-    legacy_echo_name_index = _build_legacy_name_index(legacy_echo_catalog)
 
-    for echo in echoes:
-        eid = str(echo.get("id"))
+    for record in echoes:
+        eid = record.key
         if not eid:
             continue
-        name = (echo.get("name") or {}).get("en", "")
+        echo = record.raw
+        name = record.name
         legacy_id = _resolve_required_legacy_id(
             entity="echo",
             entity_id=eid,
             name=name,
-            legacy_name_index=legacy_echo_name_index,
+            legacy=legacy,
             errors=errors,
         )
 
-        cost = int(echo.get("cost", 0))
-        raw_fetters = echo.get("fetter", []) if isinstance(echo.get("fetter"), list) else []
+        cost = record.cost
+        raw_fetters = list(record.fetter_ids)
         raw_skill = echo.get("skill") if isinstance(echo.get("skill"), dict) else {}
         raw_desc = raw_skill.get("description") or ""
         if isinstance(raw_desc, dict):
@@ -2418,25 +2585,43 @@ def _build_fetter_bases(fetters: list[dict]) -> dict[str, dict]:
 # Go code generation for weapon_buffs_gen.go
 # ---------------------------------------------------------------------------
 
-def _sync_weapons_only(dry_run: bool, pretty: bool) -> int:
+def _sync_weapons_only(dry_run: bool, pretty: bool, stat_tables: bool = False) -> int:
     required = [WEAPONS_JSON]
     for path in required:
         if not path.exists():
             print(f"ERROR: Missing required input: {path}")
             return 1
 
-    full_weapons = _load_json(WEAPONS_JSON)
+    catalog = load_catalog(DATA_DIR, lang="en")
+    legacy = load_legacy_index()
     try:
-        legacy_weapons = _load_legacy_catalog(LEGACY_WEAPONS_JSON, "legacy weapon")
-    except ValueError as exc:
+        legacy.section("weapons")
+    except (FileNotFoundError, ValueError) as exc:
         print(f"ERROR: {exc}")
         return 1
-    weapon_bases, weapon_errors = _build_weapon_bases(full_weapons, legacy_weapons)
+    if stat_tables and not LEVEL_CURVE_JSON.exists():
+        print(f"ERROR: --stat-tables needs {LEVEL_CURVE_JSON}")
+        return 1
+    level_curves = _load_json(LEVEL_CURVE_JSON) if stat_tables else None
+    weapon_bases, weapon_errors = _build_weapon_bases(catalog.weapons, legacy, level_curves)
+    if not dry_run:
+        legacy.save()
+    legacy.report()
     if weapon_errors:
         _print_error_report("Unable to resolve legacy weapon IDs", weapon_errors)
         return 1
 
     _write_json(WEAPON_BASES_JSON, weapon_bases, dry_run, pretty=pretty)
+    # The bundle also carries the static curves; rebuild it when they are present.
+    if CHARACTER_CURVE_JSON.exists() and LEVEL_CURVE_JSON.exists():
+        if not _write_bundle(
+            CALC_BUNDLE_OUT,
+            weapon_bases,
+            _load_json(LEVEL_CURVE_JSON),
+            _load_json(CHARACTER_CURVE_JSON),
+            dry_run,
+        ):
+            return 1
 
     print("\nGenerated summary (weapons-only):")
     print(f"  Weapons:    {len(weapon_bases)}")
@@ -2456,34 +2641,67 @@ def main() -> int:
         action="store_true",
         help="Regenerate weapon base data only",
     )
+    parser.add_argument(
+        "--stat-tables",
+        action="store_true",
+        help="Add precomputed per-level/per-rank stat_tables to character and weapon bases",
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="Report per-rule calls, matches, cumulative time and slowest inputs of the text parsers",
+    )
     args = parser.parse_args()
 
+    profile = _install_rule_profiling() if args.profile_rules else None
+    try:
+        return _generate(args)
+    finally:
+        if profile is not None:
+            profile.report()
+
+
+def _generate(args: argparse.Namespace) -> int:
     if args.weapons_only:
-        return _sync_weapons_only(args.dry_run, args.pretty)
+        return _sync_weapons_only(args.dry_run, args.pretty, args.stat_tables)
 
-    required = [CHARACTERS_JSON, WEAPONS_JSON, ECHOES_JSON, ECHO_STATS_JSON, FETTERS_JSON, CHARACTER_CURVE_JSON, LEVEL_CURVE_JSON]
+    required = [WEAPONS_JSON, ECHOES_JSON, ECHO_STATS_JSON, FETTERS_JSON, CHARACTER_CURVE_JSON, LEVEL_CURVE_JSON]
     for path in required:
         if not path.exists():
             print(f"ERROR: Missing required input: {path}")
             return 1
+    # Characters may be Characters.json or the sharded layout (game_catalog reads either).
+    if current_layout(DATA_DIR) is None:
+        print(f"ERROR: Missing required input: {CHARACTERS_JSON} (or its shards)")
+        return 1
 
-    full_chars = _load_json(CHARACTERS_JSON)
-    full_weapons = _load_json(WEAPONS_JSON)
-    full_echoes = _load_json(ECHOES_JSON)
-    full_fetters = _load_json(FETTERS_JSON)
+    # Only the English text is read, so take the English split when it is current.
+    catalog = load_catalog(DATA_DIR, lang="en")
+    full_fetters = load_records(DATA_DIR, FETTERS_JSON.name, lang="en")
     character_curve = _load_json(CHARACTER_CURVE_JSON)
     level_curves = _load_json(LEVEL_CURVE_JSON)
+    legacy = load_legacy_index()
     try:
-        legacy_weapons = _load_legacy_catalog(LEGACY_WEAPONS_JSON, "legacy weapon")
-        legacy_echoes = _load_legacy_catalog(LEGACY_ECHOES_JSON, "legacy echo")
-    except ValueError as exc:
+        legacy.section("weapons")
+        legacy.section("echoes")
+    except (FileNotFoundError, ValueError) as exc:
         print(f"ERROR: {exc}")
         return 1
 
-    character_bases = _build_character_bases(full_chars)
-    weapon_bases, weapon_errors = _build_weapon_bases(full_weapons, legacy_weapons)
-    echo_bases, echo_errors = _build_echo_bases(full_echoes, legacy_echoes)
+    character_bases = _build_character_bases(
+        catalog.characters,
+        character_curve if args.stat_tables else None,
+    )
+    weapon_bases, weapon_errors = _build_weapon_bases(
+        catalog.weapons,
+        legacy,
+        level_curves if args.stat_tables else None,
+    )
+    echo_bases, echo_errors = _build_echo_bases(catalog.echoes, legacy)
     fetter_bases = _build_fetter_bases(full_fetters)
+    if not args.dry_run:
+        legacy.save()
+    legacy.report()
     if weapon_errors or echo_errors:
         _print_error_report("Unable to resolve legacy weapon IDs", weapon_errors)
         _print_error_report("Unable to resolve legacy echo IDs", echo_errors)
@@ -2496,6 +2714,8 @@ def main() -> int:
     _write_json(CHARACTER_CURVE_OUT_JSON, character_curve, args.dry_run, pretty=args.pretty)
     _write_json(LEVEL_CURVE_OUT_JSON, level_curves, args.dry_run, pretty=args.pretty)
     _copy_file(ECHO_STATS_JSON, ECHO_STATS_OUT_JSON, args.dry_run)
+    if not _write_bundle(CALC_BUNDLE_OUT, weapon_bases, level_curves, character_curve, args.dry_run):
+        return 1
 
     print("\nGenerated summary:")
     print(f"  Characters: {len(character_bases)}")
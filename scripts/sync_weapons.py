@@ -9,14 +9,14 @@ Usage:
     python sync_weapons.py --fetch --id 21010015       # Sync single weapon from CDN
     python sync_weapons.py --fetch --dry-run --pretty  # Preview without writing
     python sync_weapons.py --fetch --individual        # Write per-weapon files instead
+    python sync_weapons.py --fetch --split-langs       # Also write the per-language split (l10n_split.py)
 """
 
 import json
 import argparse
 import re
-import unicodedata
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from cdn_config import (
     CDN_BASE,
@@ -24,15 +24,18 @@ from cdn_config import (
     request_json_with_retry,
     write_json_atomic,
 )
+from l10n_split import save_split, split_argument
+from legacy_ids import LegacyIdIndex, load_legacy_index
+from schema_projection import compile_schema
+from weapon_aliases import WeaponAliasIndex
 
 CDN_LIST_API = f"{CDN_BASE}/api/fs/list"
 CDN_DOWNLOAD_BASE = f"{CDN_BASE}/d/GameData/Grouped/Weapon"
 
-SCRIPTS_DIR = Path(__file__).resolve().parent
-LEGACY_WEAPONS_JSON = SCRIPTS_DIR.parent / "lib" / "data" / "legacyWeapons.json"
 OUTPUT_DIR = Path(__file__).parent.parent / "public/Data/Weapons"
 
-# Schema: True = keep as-is, ["k1","k2"] = keep only these keys
+# Schema: True = keep as-is, ["k1","k2"] = keep only these keys (compiled once
+# by compile_weapon_schema)
 SCHEMA = {
     "id": True,
     "name": True,
@@ -88,51 +91,10 @@ PASSIVE_PATTERNS: list[tuple[re.Pattern[str], list[str]]] = [
 ]
 
 
-def _normalize_name(name: str) -> str:
-    folded = unicodedata.normalize("NFKD", name)
-    ascii_name = "".join(ch for ch in folded if not unicodedata.combining(ch))
-    tokens = re.findall(r"[a-z]+|\d+", ascii_name.lower())
-    normalized_tokens: list[str] = []
-    for token in tokens:
-        if token == "s":
-            continue
-        if token.isalpha() and len(token) > 3 and token.endswith("s"):
-            token = token[:-1]
-        normalized_tokens.append(token)
-    return "".join(normalized_tokens)
-
-
-def _load_legacy_weapon_name_index() -> dict[str, list[str]]:
-    if not LEGACY_WEAPONS_JSON.exists():
-        raise FileNotFoundError(f"Missing legacy weapon catalog: {LEGACY_WEAPONS_JSON}")
-
-    payload = json.loads(LEGACY_WEAPONS_JSON.read_text(encoding="utf-8"))
-    if not isinstance(payload, list):
-        raise ValueError(f"Legacy weapon catalog must be a JSON array: {LEGACY_WEAPONS_JSON}")
-
-    name_index: dict[str, list[str]] = {}
-    for entry in payload:
-        if not isinstance(entry, dict):
-            continue
-        legacy_id = str(entry.get("id", "") or "").strip()
-        name = str(entry.get("name", "") or "").strip()
-        key = _normalize_name(name)
-        if not legacy_id or not key:
-            continue
-        bucket = name_index.setdefault(key, [])
-        if legacy_id not in bucket:
-            bucket.append(legacy_id)
-    return name_index
-
-
-def _resolve_legacy_weapon_id(data: dict, legacy_name_index: dict[str, list[str]]) -> str | None:
+def _resolve_legacy_weapon_id(data: dict, legacy: LegacyIdIndex) -> str | None:
     name = data.get("name", {})
     weapon_name = name.get("en", "") if isinstance(name, dict) else str(name)
-    key = _normalize_name(weapon_name)
-    if not key:
-        return None
-    matches = legacy_name_index.get(key, [])
-    return matches[0] if len(matches) == 1 else None
+    return legacy.resolve("weapons", weapon_name)
 
 
 def _sanitize_text(value: str | None) -> str:
@@ -199,34 +161,6 @@ def extract_unconditional_passive_bonuses(raw: dict) -> dict[str, list[float]]:
     return {stat: rank_values for stat in stats}
 
 
-def prepend_cdn(obj: Any) -> Any:
-    """Prepend CDN base URL to paths starting with /d/."""
-    if isinstance(obj, str):
-        return f"{CDN_BASE}{obj}" if obj.startswith("/d/") else obj
-    elif isinstance(obj, dict):
-        return {k: prepend_cdn(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [prepend_cdn(item) for item in obj]
-    return obj
-
-
-def filter_keys(obj: Any, keys: list[str]) -> Any:
-    """Filter object to only specified keys.
-
-    Handles direct dicts, dict-of-dicts, and list-of-dicts.
-    """
-    keys_set = set(keys)
-
-    if isinstance(obj, dict):
-        if keys_set & set(obj.keys()):
-            return {k: v for k, v in obj.items() if k in keys_set}
-        else:
-            return {k: filter_keys(v, keys) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [filter_keys(item, keys) for item in obj]
-    return obj
-
-
 def extract_stats(stats: dict) -> dict:
     """Extract lv1 base stats from the stats object.
 
@@ -270,32 +204,18 @@ def should_skip(data: dict) -> bool:
     return False
 
 
-def extract_by_schema(data: dict, schema: dict) -> dict:
-    """Extract fields from data according to schema."""
-    output = {}
-
-    for field, rule in schema.items():
-        if field not in data:
-            continue
-
-        value = data[field]
+def compile_weapon_schema(schema: dict) -> Callable[[dict], dict]:
+    """Compile SCHEMA into a single-pass projector (key filter + CDN prefix);
+    stats always go through extract_stats."""
+    return compile_schema(schema, cdn_base=CDN_BASE, handlers={"stats": extract_stats})
 
-        if field == "stats":
-            output[field] = extract_stats(value)
-        elif rule is True:
-            output[field] = prepend_cdn(value)
-        elif isinstance(rule, list):
-            output[field] = prepend_cdn(filter_keys(value, rule))
-
-    return output
 
-
-def transform_weapon(data: dict, schema: dict, legacy_name_index: dict[str, list[str]]) -> dict | None:
-    """Transform raw CDN weapon data using schema."""
+def transform_weapon(data: dict, project: Callable[[dict], dict], legacy: LegacyIdIndex) -> dict | None:
+    """Transform raw CDN weapon data with a compile_weapon_schema() projector."""
     if should_skip(data):
         return None
-    output = extract_by_schema(data, schema)
-    legacy_id = _resolve_legacy_weapon_id(data, legacy_name_index)
+    output = project(data)
+    legacy_id = _resolve_legacy_weapon_id(data, legacy)
     output["legacyId"] = legacy_id or str(output.get("id", "") or "")
     passive_bonuses = extract_unconditional_passive_bonuses(data)
     if passive_bonuses:
@@ -303,54 +223,9 @@ def transform_weapon(data: dict, schema: dict, legacy_name_index: dict[str, list
     return output
 
 
-def _semantic_weapon_fingerprint(weapon: dict) -> tuple[Any, ...]:
-    """Fields that identify one playable weapon despite source alias rows."""
-    stats = weapon.get("stats") or {}
-    first = stats.get("first") or {}
-    second = stats.get("second") or {}
-    icon = weapon.get("icon") or {}
-    effect = weapon.get("effect") or {}
-    return (
-        (weapon.get("name") or {}).get("en"),
-        ((weapon.get("type") or {}).get("name") or {}).get("en"),
-        (weapon.get("rarity") or {}).get("id"),
-        icon.get("icon") if isinstance(icon, dict) else icon,
-        effect.get("en") if isinstance(effect, dict) else effect,
-        first.get("attribute"),
-        first.get("value"),
-        second.get("attribute"),
-        second.get("value"),
-        second.get("isRatio"),
-        json.dumps(weapon.get("params") or {}, sort_keys=True, ensure_ascii=False),
-        json.dumps(
-            weapon.get("unconditionalPassiveBonuses") or {},
-            sort_keys=True,
-            ensure_ascii=False,
-        ),
-    )
-
-
 def dedupe_semantic_weapon_aliases(weapons: list[dict]) -> list[dict]:
     """Drop an alias row when its canonical legacy-ID row is equivalent."""
-    by_current_id = {str(weapon.get("id")): weapon for weapon in weapons}
-    kept: list[dict] = []
-    for weapon in weapons:
-        current_id = str(weapon.get("id"))
-        legacy_id = str(weapon.get("legacyId") or current_id)
-        canonical = by_current_id.get(legacy_id)
-        if (
-            canonical is not None
-            and current_id != legacy_id
-            and _semantic_weapon_fingerprint(weapon)
-            == _semantic_weapon_fingerprint(canonical)
-        ):
-            print(
-                f"  Skipped semantic weapon alias {current_id} "
-                f"({(weapon.get('name') or {}).get('en', '?')}); canonical ID {legacy_id}"
-            )
-            continue
-        kept.append(weapon)
-    return kept
+    return WeaponAliasIndex(weapons).dedupe(weapons)
 
 
 # --- CDN fetch ---
@@ -455,14 +330,18 @@ def main():
                         help="Preview output without writing files")
     parser.add_argument("--pretty", action="store_true",
                         help="Pretty print JSON (default: compact)")
+    split_argument(parser)
 
     args = parser.parse_args()
 
     if not args.fetch:
         parser.error("Specify --fetch to sync from CDN")
         return 1
+    if args.split_langs and args.individual:
+        parser.error("--split-langs splits the combined Weapons.json; it cannot be used with --individual")
     try:
-        legacy_name_index = _load_legacy_weapon_name_index()
+        legacy = load_legacy_index()
+        legacy.section("weapons")
     except (FileNotFoundError, ValueError) as exc:
         print(f"ERROR: {exc}")
         return 1
@@ -471,10 +350,11 @@ def main():
     print(f"\nLoaded {len(raw_weapons)} raw weapon files")
 
     # Transform
+    project = compile_weapon_schema(SCHEMA)
     weapons = []
     skipped = 0
     for data in raw_weapons:
-        weapon = transform_weapon(data, SCHEMA, legacy_name_index)
+        weapon = transform_weapon(data, project, legacy)
         if weapon:
             weapons.append(weapon)
         else:
@@ -545,8 +425,13 @@ def main():
         write_json_atomic(combined_path, combined_weapons, **json_kwargs)
         size_kb = combined_path.stat().st_size / 1024
         print(f"  Saved Weapons.json [{size_kb:.1f}KB] ({len(combined_weapons)} weapons)")
+        if args.split_langs:
+            save_split(combined_path.parent, combined_path.name, combined_weapons, json_kwargs)
         print(f"\nDone: {len(combined_weapons)} weapons → {combined_path}")
 
+    if not args.dry_run:
+        legacy.save()
+    legacy.report()
     return 0
 
 
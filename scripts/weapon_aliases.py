@@ -0,0 +1,118 @@
+"""
+Semantic alias index for weapon rows.
+
+Some weapons are published twice upstream: the canonical row, whose id is the
+weapon's legacy id, and an alias row whose `legacyId` points back at it. When
+every field that defines the playable weapon matches, the alias is a duplicate
+and is dropped from Weapons.json.
+
+`dedupe_semantic_weapon_aliases` used to fingerprint both rows for every
+comparison, running `json.dumps(sort_keys=True)` on `params` and
+`unconditionalPassiveBonuses` each time, so a canonical row was fingerprinted
+again for every alias that pointed at it. `WeaponAliasIndex` groups the rows
+by legacy id and fingerprints each row at most once, the first time a lookup
+needs it. sync_weapons and sync_encore dedupe through it, and sync_lb uses it
+to resolve an alias row's legacy id to its canonical row.
+
+Usage:
+    from weapon_aliases import WeaponAliasIndex
+    aliases = WeaponAliasIndex(weapons)
+    aliases.canonical_id("21020046")   # canonical row id, or None
+    weapons = aliases.dedupe(weapons)
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable
+
+
+def semantic_fingerprint(weapon: dict) -> tuple[Any, ...]:
+    """Fields that identify one playable weapon despite source alias rows."""
+    stats = weapon.get("stats") or {}
+    first = stats.get("first") or {}
+    second = stats.get("second") or {}
+    icon = weapon.get("icon") or {}
+    effect = weapon.get("effect") or {}
+    return (
+        (weapon.get("name") or {}).get("en"),
+        ((weapon.get("type") or {}).get("name") or {}).get("en"),
+        (weapon.get("rarity") or {}).get("id"),
+        icon.get("icon") if isinstance(icon, dict) else icon,
+        effect.get("en") if isinstance(effect, dict) else effect,
+        first.get("attribute"),
+        first.get("value"),
+        second.get("attribute"),
+        second.get("value"),
+        second.get("isRatio"),
+        json.dumps(weapon.get("params") or {}, sort_keys=True, ensure_ascii=False),
+        json.dumps(
+            weapon.get("unconditionalPassiveBonuses") or {},
+            sort_keys=True,
+            ensure_ascii=False,
+        ),
+    )
+
+
+class WeaponAliasIndex:
+    """Weapon rows by id and by legacy id, with memoized fingerprints.
+
+    A row is a semantic alias when its legacy id differs from its own id, a
+    row with that id exists, and both rows have the same fingerprint. Rows
+    are keyed by id; with duplicated ids the last row stands for the id."""
+
+    __slots__ = ("_by_id", "_aliases", "_fingerprints")
+
+    def __init__(self, weapons: Iterable[dict]) -> None:
+        self._by_id: dict[str, dict] = {}
+        # legacy id -> ids of the rows pointing at it from another id.
+        self._aliases: dict[str, list[str]] = {}
+        self._fingerprints: dict[str, tuple[Any, ...]] = {}
+        for weapon in weapons:
+            current_id = str(weapon.get("id"))
+            self._by_id[current_id] = weapon
+            legacy_id = str(weapon.get("legacyId") or current_id)
+            if legacy_id != current_id:
+                self._aliases.setdefault(legacy_id, []).append(current_id)
+
+    def _fingerprint(self, weapon_id: str) -> tuple[Any, ...]:
+        fingerprint = self._fingerprints.get(weapon_id)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[weapon_id] = semantic_fingerprint(self._by_id[weapon_id])
+        return fingerprint
+
+    def canonical_id(self, weapon_id: int | str) -> str | None:
+        """The canonical row's id when *weapon_id* is a semantic alias, else None."""
+        current_id = str(weapon_id)
+        weapon = self._by_id.get(current_id)
+        if weapon is None:
+            return None
+        legacy_id = str(weapon.get("legacyId") or current_id)
+        if legacy_id == current_id or legacy_id not in self._by_id:
+            return None
+        return legacy_id if self._fingerprint(current_id) == self._fingerprint(legacy_id) else None
+
+    def alias_ids(self) -> set[str]:
+        """Ids of every semantic alias row (only rows in a legacy-id group are fingerprinted)."""
+        return {
+            alias_id
+            for legacy_id, alias_ids in self._aliases.items()
+            if legacy_id in self._by_id
+            for alias_id in alias_ids
+            if self._fingerprint(alias_id) == self._fingerprint(legacy_id)
+        }
+
+    def dedupe(self, weapons: list[dict]) -> list[dict]:
+        """*weapons* without their semantic alias rows, order kept."""
+        aliases = self.alias_ids()
+        kept: list[dict] = []
+        for weapon in weapons:
+            current_id = str(weapon.get("id"))
+            if current_id in aliases and str(weapon.get("legacyId") or current_id) != current_id:
+                print(
+                    f"  Skipped semantic weapon alias {current_id} "
+                    f"({(weapon.get('name') or {}).get('en', '?')}); canonical ID {weapon.get('legacyId')}"
+                )
+                continue
+            kept.append(weapon)
+        return kept
@@ -0,0 +1,288 @@
+"""
+Named WebP encoder presets shared by the image writers, plus a benchmark that
+sweeps encoder settings over the mirrored corpus.
+
+The mirror always encoded with PIL at method=6 (slowest, smallest) and the
+backend templates with OpenCV at q95, neither measured against the
+alternatives. Presets name the speed/size trade-off once so the writers take
+a preset instead of hard-coding encoder arguments:
+
+  fast             method=2  (several times faster, noticeably larger files)
+  balanced         method=4  (libwebp's default)
+  max-compression  method=6  (the historical mirror setting; the default)
+
+Quality stays with the caller (q90 public mirror, q95 backend templates). The
+preset only picks the effort and whether to encode losslessly.
+
+--benchmark re-encodes a sample of public/assets/ (variants excluded) with
+every method x quality combination (plus lossless, plus OpenCV's encoder,
+which is what sync_backend._save_webp uses) in a process pool, one task per
+image, and reports per asset class the median encode ms, the output size
+relative to the current file and the mean SSIM against the decoded source.
+The sources are themselves q90 WebP, so SSIM measures the loss added by
+re-encoding, which is the quantity that matters when picking a setting.
+
+Usage:
+  python scripts/webp_encoding.py --benchmark                     # Sweep the default grid over 200 sampled images
+  python scripts/webp_encoding.py --benchmark --sample 0          # Whole corpus
+  python scripts/webp_encoding.py --benchmark --methods 2,4,6 --qualities 80,90 --report bench.json
+
+Requires:
+  pip install Pillow            (presets)
+  pip install numpy             (--benchmark SSIM; opencv-python adds the OpenCV row)
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from cdn_config import write_json_atomic
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ASSETS_DIR = SCRIPTS_DIR.parent / "public" / "assets"
+
+ENCODER_PRESETS: dict[str, dict] = {
+    "fast": {"method": 2, "lossless": False},
+    "balanced": {"method": 4, "lossless": False},
+    "max-compression": {"method": 6, "lossless": False},
+}
+DEFAULT_PRESET = "max-compression"
+
+BENCH_METHODS = (0, 2, 4, 6)
+BENCH_QUALITIES = (75, 85, 90, 95)
+BENCH_SAMPLE = 200
+SSIM_WINDOW = 7
+
+
+def encode_webp(img: Image.Image, quality: int, preset: str = DEFAULT_PRESET) -> bytes:
+    """Encode a decoded PIL image with one of ENCODER_PRESETS."""
+    settings = ENCODER_PRESETS[preset]
+    out = io.BytesIO()
+    img.save(out, "WEBP", quality=quality, method=settings["method"], lossless=settings["lossless"])
+    return out.getvalue()
+
+
+def preset_argument(parser: argparse.ArgumentParser) -> None:
+    """The --encoder-preset flag, shared by every script that encodes WebP."""
+    parser.add_argument(
+        "--encoder-preset",
+        choices=sorted(ENCODER_PRESETS),
+        default=DEFAULT_PRESET,
+        help=f"WebP encoder effort (default {DEFAULT_PRESET})",
+    )
+
+
+# --- Benchmark (--benchmark) ----------------------------------------------------
+
+def _luma(img: Image.Image) -> "np.ndarray":
+    """Float luminance; transparent pixels composite onto black, as the site's
+    dark backgrounds do, so alpha edges are scored too."""
+    if img.mode in ("RGBA", "LA", "P"):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGBA", rgba.size, (0, 0, 0, 255))
+        img = Image.alpha_composite(background, rgba)
+    return np.asarray(img.convert("L"), dtype=np.float64)
+
+
+def _box_mean(x: "np.ndarray", size: int) -> "np.ndarray":
+    """Mean over every size x size window (valid region) from one integral image."""
+    s = np.pad(x, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return (s[size:, size:] - s[:-size, size:] - s[size:, :-size] + s[:-size, :-size]) / (size * size)
+
+
+def ssim(a: "np.ndarray", b: "np.ndarray", window: int = SSIM_WINDOW) -> float:
+    """Mean SSIM of two luminance arrays with a uniform window (skimage's default)."""
+    if min(a.shape) < window:
+        return 1.0 if np.array_equal(a, b) else 0.0
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a, mu_b = _box_mean(a, window), _box_mean(b, window)
+    var_a = _box_mean(a * a, window) - mu_a * mu_a
+    var_b = _box_mean(b * b, window) - mu_b * mu_b
+    cov = _box_mean(a * b, window) - mu_a * mu_b
+    score = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(score.mean())
+
+
+def bench_settings(methods: tuple[int, ...], qualities: tuple[int, ...], lossless: bool) -> list[dict]:
+    settings = [
+        {"name": f"m{method} q{quality}", "method": method, "quality": quality, "lossless": False}
+        for method in methods
+        for quality in qualities
+    ]
+    if lossless:
+        settings += [{"name": f"m{method} lossless", "method": method, "quality": 100, "lossless": True} for method in methods]
+    if cv2 is not None:
+        # sync_backend._save_webp's encoder (no effort knob; alpha dropped).
+        settings += [{"name": f"opencv q{quality}", "encoder": "opencv", "quality": quality} for quality in qualities]
+    return settings
+
+
+def bench_image(path: Path, settings: list[dict]) -> list[dict]:
+    """Every setting for one image, decoded once. Runs in a pool process."""
+    data = path.read_bytes()
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    reference = _luma(img)
+    bgr = None
+    rows = []
+    for setting in settings:
+        start = time.perf_counter()
+        if setting.get("encoder") == "opencv":
+            if bgr is None:
+                bgr = cv2.cvtColor(np.asarray(img.convert("RGB")), cv2.COLOR_RGB2BGR)
+            ok, buf = cv2.imencode(".webp", bgr, [cv2.IMWRITE_WEBP_QUALITY, setting["quality"]])
+            if not ok:
+                raise RuntimeError("OpenCV could not encode WebP")
+            encoded = buf.tobytes()
+        else:
+            out = io.BytesIO()
+            img.save(out, "WEBP", quality=setting["quality"], method=setting["method"], lossless=setting["lossless"])
+            encoded = out.getvalue()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        decoded = Image.open(io.BytesIO(encoded))
+        if setting.get("encoder") == "opencv" and img.mode == "RGBA":
+            # Compare what the template actually keeps: the colour channels.
+            score = ssim(_luma(img.convert("RGB")), _luma(decoded))
+        else:
+            score = ssim(reference, _luma(decoded))
+        rows.append({"setting": setting["name"], "ms": elapsed_ms, "bytes": len(encoded), "source": len(data), "ssim": score})
+    return rows
+
+
+def _asset_classifier():
+    """path -> the mirror's variant class name ("other" outside any class)."""
+    try:
+        # Imported here: the mirror imports this module for its presets.
+        from mirror_images_to_public import variant_class
+    except ImportError:  # The mirror's own deps (requests) are not installed.
+        return lambda path: "other"
+    root = ASSETS_DIR.resolve()
+
+    def classify(path: Path) -> str:
+        resolved = path.resolve()
+        if not resolved.is_relative_to(root):
+            return "other"
+        image_class = variant_class(resolved.relative_to(root).as_posix())
+        return image_class[0] if image_class else "other"
+
+    return classify
+
+
+def _int_list(value: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in value.split(",") if part.strip())
+
+
+def benchmark(args: argparse.Namespace) -> int:
+    if np is None:
+        print("numpy is required for --benchmark (pip install numpy)")
+        return 1
+    # The mirror's --variants output is derived from the files sampled anyway.
+    variant_dirs = {(ASSETS_DIR / "variants").resolve(), (args.root / "variants").resolve()}
+    paths = sorted(
+        path
+        for path in args.root.rglob("*.webp")
+        if not path.name.startswith(".")
+        and not any(path.resolve().is_relative_to(directory) for directory in variant_dirs)
+    )
+    if args.sample and len(paths) > args.sample:
+        paths = sorted(random.Random(args.seed).sample(paths, args.sample))
+    if not paths:
+        print(f"No WebP files under {args.root}")
+        return 1
+    settings = bench_settings(args.methods, args.qualities, args.lossless)
+    print(f"Benchmarking {len(settings)} settings over {len(paths)} images with {args.workers} processes")
+
+    asset_class = _asset_classifier()
+    results: dict[tuple[str, str], list[dict]] = {}
+    failed = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [(path, pool.submit(bench_image, path, settings)) for path in paths]
+        for path, future in futures:
+            try:
+                rows = future.result()
+            except Exception as error:
+                failed += 1
+                print(f"  FAIL {path} ({error})")
+                continue
+            for row in rows:
+                for group in (asset_class(path), "all"):
+                    results.setdefault((group, row["setting"]), []).append(row)
+    print(f"Done in {time.perf_counter() - started:.1f}s ({failed} failed)\n")
+
+    presets = {f"m{s['method']} q": name for name, s in ENCODER_PRESETS.items() if not s["lossless"]}
+    summary = []
+    for (group, setting), rows in results.items():
+        summary.append({
+            "class": group,
+            "setting": setting,
+            "images": len(rows),
+            "medianMs": statistics.median(row["ms"] for row in rows),
+            "bytes": sum(row["bytes"] for row in rows),
+            "sizeRatio": sum(row["bytes"] for row in rows) / sum(row["source"] for row in rows),
+            "meanSsim": statistics.fmean(row["ssim"] for row in rows),
+        })
+    order = {setting["name"]: index for index, setting in enumerate(settings)}
+    summary.sort(key=lambda row: (row["class"] != "all", row["class"], order[row["setting"]]))
+
+    current_class = None
+    for row in summary:
+        if row["class"] != current_class:
+            current_class = row["class"]
+            print(f"[{current_class}] {row['images']} images")
+            print(f"  {'setting':<16} {'median ms':>10} {'size vs now':>12} {'mean SSIM':>10}")
+        preset = next((name for prefix, name in presets.items() if row["setting"].startswith(prefix)), "")
+        print(
+            f"  {row['setting']:<16} {row['medianMs']:>10.1f} {row['sizeRatio']:>11.1%} {row['meanSsim']:>10.4f}"
+            + (f"  ({preset})" if preset else "")
+        )
+
+    if args.report:
+        write_json_atomic(args.report, {"images": len(paths), "failed": failed, "results": summary}, indent=2)
+        print(f"\nReport: {args.report}")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="WebP encoder presets and settings benchmark")
+    parser.add_argument("--benchmark", action="store_true", help="Sweep encoder settings over the mirrored corpus")
+    parser.add_argument("--root", type=Path, default=ASSETS_DIR, help="Corpus directory (default public/assets)")
+    parser.add_argument("--sample", type=int, default=BENCH_SAMPLE, help=f"Images to sample, 0 = all (default {BENCH_SAMPLE})")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--methods", type=_int_list, default=BENCH_METHODS, help="Comma-separated WebP methods (0-6)")
+    parser.add_argument("--qualities", type=_int_list, default=BENCH_QUALITIES, help="Comma-separated qualities")
+    parser.add_argument("--lossless", action="store_true", help="Also benchmark lossless encoding")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Benchmark processes (default: CPU count)")
+    parser.add_argument("--report", type=Path, default=None, help="Write the summary as JSON")
+    args = parser.parse_args()
+    if not args.benchmark:
+        for name, settings in ENCODER_PRESETS.items():
+            print(f"{name:<16} {settings}{'  (default)' if name == DEFAULT_PRESET else ''}")
+        return 0
+    return benchmark(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())